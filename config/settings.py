@@ -19,6 +19,69 @@ class Settings:
     TEMPERATURE = 0.5
     CONFIDENCE_THRESHOLD = 0.65
     
+    # Classifier Configuration
+    FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "True").lower() == "true"
+    CLASSIFIER_CACHE_MAX_ENTRIES = int(os.getenv("CLASSIFIER_CACHE_MAX_ENTRIES", "10000"))
+    CLASSIFIER_CACHE_TTL_SECONDS = int(os.getenv("CLASSIFIER_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    CLASSIFIER_CACHE_DB_PATH = os.getenv("CLASSIFIER_CACHE_DB_PATH") or None
+    CLASSIFIER_CACHE_FLUSH_INTERVAL_SECONDS = float(os.getenv("CLASSIFIER_CACHE_FLUSH_INTERVAL_SECONDS", "1"))
+    CLASSIFIER_CACHE_MAX_DISK_ENTRIES = int(os.getenv("CLASSIFIER_CACHE_MAX_DISK_ENTRIES", "1000000"))
+    SIMILARITY_CACHE_ENABLED = os.getenv("SIMILARITY_CACHE_ENABLED", "True").lower() == "true"
+    SIMILARITY_CACHE_THRESHOLD = float(os.getenv("SIMILARITY_CACHE_THRESHOLD", "0.6"))
+    SIMILARITY_CACHE_MIN_CONFIDENCE = float(os.getenv("SIMILARITY_CACHE_MIN_CONFIDENCE", "0.85"))
+    SIMILARITY_CACHE_MAX_ENTRIES = int(os.getenv("SIMILARITY_CACHE_MAX_ENTRIES", "5000"))
+    CLASSIFIER_MAX_TOKENS = int(os.getenv("CLASSIFIER_MAX_TOKENS", "512"))
+    CLASSIFIER_STREAMING_ENABLED = os.getenv("CLASSIFIER_STREAMING_ENABLED", "True").lower() == "true"
+    CLASSIFIER_DECISION_LOG_PATH = os.getenv("CLASSIFIER_DECISION_LOG_PATH") or None
+    DISTILLED_MODEL_PATH = os.getenv("DISTILLED_MODEL_PATH") or None
+    CLASSIFIER_BATCHING_ENABLED = os.getenv("CLASSIFIER_BATCHING_ENABLED", "False").lower() == "true"
+    CLASSIFIER_BATCH_MAX_SIZE = int(os.getenv("CLASSIFIER_BATCH_MAX_SIZE", "16"))
+    CLASSIFIER_BATCH_MAX_WAIT_MS = float(os.getenv("CLASSIFIER_BATCH_MAX_WAIT_MS", "10"))
+    
+    # Slot Filling (one LLM call extracts every answer a longer message contains; answered questions are skipped)
+    SLOT_FILLING_ENABLED = os.getenv("SLOT_FILLING_ENABLED", "False").lower() == "true"
+    SLOT_FILLING_MIN_WORDS = int(os.getenv("SLOT_FILLING_MIN_WORDS", "4"))
+    SLOT_FILLING_MAX_TOKENS = int(os.getenv("SLOT_FILLING_MAX_TOKENS", "400"))
+    
+    # Answer Enrichment (completed candidates' free-text answers normalized in background batches)
+    ENRICHMENT_ENABLED = os.getenv("ENRICHMENT_ENABLED", "False").lower() == "true"
+    ENRICHMENT_BATCH_SIZE = int(os.getenv("ENRICHMENT_BATCH_SIZE", "20"))
+    ENRICHMENT_MAX_WAIT_SECONDS = float(os.getenv("ENRICHMENT_MAX_WAIT_SECONDS", "30"))
+    ENRICHMENT_MAX_ATTEMPTS = int(os.getenv("ENRICHMENT_MAX_ATTEMPTS", "3"))
+    ENRICHMENT_RETRY_SECONDS = float(os.getenv("ENRICHMENT_RETRY_SECONDS", "60"))
+    ENRICHMENT_MAX_TOKENS = int(os.getenv("ENRICHMENT_MAX_TOKENS", "4096"))
+    
+    # Token Budget Configuration (o200k_harmony is the gpt-oss encoding)
+    TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "o200k_harmony")
+    CLASSIFIER_MAX_INPUT_TOKENS = int(os.getenv("CLASSIFIER_MAX_INPUT_TOKENS", "256"))
+    TOKEN_LEDGER_MAX_SESSIONS = int(os.getenv("TOKEN_LEDGER_MAX_SESSIONS", "10000"))
+    
+    # Admission Control (rate limit and circuit breaker in front of DeepInfra)
+    LLM_RATE_LIMIT_PER_SECOND = float(os.getenv("LLM_RATE_LIMIT_PER_SECOND", "20"))
+    LLM_RATE_LIMIT_BURST = int(os.getenv("LLM_RATE_LIMIT_BURST", "20"))
+    LLM_MAX_CONCURRENT_REQUESTS = int(os.getenv("LLM_MAX_CONCURRENT_REQUESTS", "32"))
+    LLM_ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("LLM_ADMISSION_MAX_WAIT_SECONDS", "2"))
+    LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+    LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+    
+    # Per-turn latency budget (Twilio drops webhook replies after 15 seconds)
+    TURN_BUDGET_SECONDS = float(os.getenv("TURN_BUDGET_SECONDS", "10"))
+    HEDGE_AFTER_SECONDS = float(os.getenv("HEDGE_AFTER_SECONDS", "3"))
+    HEDGE_MAX_IN_FLIGHT = int(os.getenv("HEDGE_MAX_IN_FLIGHT", "16"))
+    
+    # HTTP Transport Configuration
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+    HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+    HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+    HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "True").lower() == "true"
+    
+    # Cassette Configuration (record/replay of LLM and Twilio calls: off | record | replay)
+    CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off").lower()
+    CASSETTE_DIR = os.getenv("CASSETTE_DIR", "cassettes")
+    CASSETTE_LATENCY_SCALE = float(os.getenv("CASSETTE_LATENCY_SCALE", "0"))
+    
     # Twilio Configuration
     TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
     TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
@@ -32,6 +95,39 @@ class Settings:
     
     # Session Configuration
     SESSION_TIMEOUT_MINUTES = 60
+    SESSION_SWEEP_INTERVAL_SECONDS = float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "5"))
+    SESSION_SWEEP_BATCH = int(os.getenv("SESSION_SWEEP_BATCH", "1000"))
+    SESSION_LOCK_STRIPES = int(os.getenv("SESSION_LOCK_STRIPES", "1024"))
+    # Sessions kept in memory (0 = unbounded); least recently used idle ones are evicted to the cold tier
+    SESSION_MAX_RESIDENT = int(os.getenv("SESSION_MAX_RESIDENT", "50000"))
+    DEFAULT_FIRST_NAME = os.getenv("DEFAULT_FIRST_NAME", "Candidate")
+    # Messages/log entries kept in memory per session (0 keeps everything); the rest lives in transcripts
+    SESSION_HISTORY_MESSAGES = int(os.getenv("SESSION_HISTORY_MESSAGES", "4"))
+    SESSION_HISTORY_LOG = int(os.getenv("SESSION_HISTORY_LOG", "8"))
+    
+    # Transcript Configuration (empty directory disables transcripts)
+    TRANSCRIPT_DIR = os.getenv("TRANSCRIPT_DIR", "transcripts")
+    TRANSCRIPT_FLUSH_INTERVAL_SECONDS = float(os.getenv("TRANSCRIPT_FLUSH_INTERVAL_SECONDS", "1"))
+    
+    # Session Store Configuration (empty URL keeps sessions in memory only)
+    SESSION_STORE_URL = os.getenv("SESSION_STORE_URL", "")  # e.g. sqlite:///sessions.db
+    SESSION_STORE_FLUSH_INTERVAL_SECONDS = float(os.getenv("SESSION_STORE_FLUSH_INTERVAL_SECONDS", "0.5"))
+    SESSION_STORE_BATCH_SIZE = int(os.getenv("SESSION_STORE_BATCH_SIZE", "500"))
+    
+    # Conversation Graph Configuration (checkpointer graph threads resume from: "", "memory" or sqlite:///path)
+    GRAPH_CHECKPOINTER = os.getenv("GRAPH_CHECKPOINTER", "memory")
+    # Webhook turns run as graph steps on the phone number's thread instead of SessionManager sessions
+    GRAPH_WEBHOOKS_ENABLED = os.getenv("GRAPH_WEBHOOKS_ENABLED", "False").lower() == "true"
+    
+    # Snapshot Configuration (sessions saved on shutdown and restored at startup; empty path disables)
+    SESSION_SNAPSHOT_PATH = os.getenv("SESSION_SNAPSHOT_PATH", "sessions.snapshot")
+    SESSION_SNAPSHOT_COMPRESSION_LEVEL = int(os.getenv("SESSION_SNAPSHOT_COMPRESSION_LEVEL", "3"))
+    
+    # Multi-worker Configuration (workers share SESSION_STORE_URL and coordinate with leases)
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
+    SESSION_STORE_SHARED = os.getenv("SESSION_STORE_SHARED", "False").lower() == "true"
+    SESSION_LEASE_SECONDS = float(os.getenv("SESSION_LEASE_SECONDS", "60"))
+    SESSION_LEASE_WAIT_SECONDS = float(os.getenv("SESSION_LEASE_WAIT_SECONDS", "15"))
     
     # URLs
     BOOKING_LINK = "https://linkrsmarokko.com/book-meeting"
@@ -41,6 +137,18 @@ class Settings:
         "Thank you {first_name} for your application via the Linkrsmarokko website. "
         "Have you been able to book a meeting via the website with one of our recruiters?"
     )
+    MEETING_UNCLEAR_MESSAGE = "Sorry, I didn't fully catch that — have you already booked a meeting? (yes/no)"
+    BOOKING_LINK_MESSAGE_TEMPLATE = (
+        "No problem! Please book a meeting using this link:\n"
+        "{booking_link}\n\n"
+        "After booking, I'll ask you a couple of quick questions to prepare for the meeting."
+    )
+    PERMISSION_QUESTION = "Is it okay if we ask you a couple of questions to prepare ourselves for the upcoming meeting?"
+    PERMISSION_UNCLEAR_MESSAGE = "Just to confirm — is it okay if we ask you a few questions? (yes/no)"
+    PERSUASION_MESSAGE = (
+        "No worries — these questions help our recruiter prepare and make the meeting more effective. "
+        "It takes only about 2 minutes."
+    )
     
     # Question Messages
     QUESTIONS = {
@@ -55,6 +163,31 @@ class Settings:
         "previous_applications": "Which call centers have you already applied to in Morocco?",
     }
     
+    # Questionnaire Flow: per question in QUESTIONS, the state field its answer is stored in,
+    # how the answer is read ("yes_no" is classified, "text" is stored as typed) and the next
+    # question ("next", or "yes"/"no" for yes_no questions; None sends FINAL_MESSAGE).
+    # Unclear yes/no answers take the "no" branch. Question ids are persisted in the order
+    # questions appear here, so add new questions at the end. A text answer with "normalize"
+    # ("city" or "cities") is also stored as gazetteer city names in <field>_normalized.
+    FIRST_QUESTION = "location"
+    QUESTION_FLOW = {
+        "location": {"field": "in_morocco", "kind": "yes_no", "yes": "city", "no": "plan_to_move", "log": "Location (in Morocco?)"},
+        "city": {"field": "current_city", "kind": "text", "next": "preferred_cities", "log": "Current city", "normalize": "city"},
+        "plan_to_move": {"field": "plan_to_move", "kind": "text", "next": "preferred_cities", "log": "Plan to move to Morocco"},
+        "preferred_cities": {"field": "preferred_cities", "kind": "text", "next": "call_center_experience", "log": "Preferred work cities", "normalize": "cities"},
+        "call_center_experience": {
+            "field": "has_call_center_experience",
+            "kind": "yes_no",
+            "yes": "experience_details",
+            "no": "why_call_center",
+            "log": "Call center experience"
+        },
+        "experience_details": {"field": "experience_details", "kind": "text", "next": "salary_expectation", "log": "Experience details"},
+        "why_call_center": {"field": "why_call_center", "kind": "text", "next": "salary_expectation", "log": "Why call center"},
+        "salary_expectation": {"field": "salary_expectation", "kind": "text", "next": "previous_applications", "log": "Salary expectation"},
+        "previous_applications": {"field": "previous_applications", "kind": "text", "next": None, "log": "Previous applications"},
+    }
+    
     FINAL_MESSAGE = (
         "Thank you for answering our questions. Please let us know if you have any additional questions. "
         "Otherwise, we look forward to meeting you."
@@ -63,6 +196,11 @@ class Settings:
     @classmethod
     def validate(cls):
         """Validate required settings."""
+        if cls.GRAPH_WEBHOOKS_ENABLED and not cls.GRAPH_CHECKPOINTER:
+            raise ValueError("GRAPH_WEBHOOKS_ENABLED requires GRAPH_CHECKPOINTER")
+        if cls.CASSETTE_MODE == "replay":
+            # Replayed runs never reach DeepInfra or Twilio
+            return
         if not cls.DEEPINFRA_API_KEY:
             raise ValueError("DEEPINFRA_API_KEY is not set in environment variables")
         if not cls.TWILIO_ACCOUNT_SID:
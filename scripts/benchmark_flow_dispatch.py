@@ -0,0 +1,210 @@
+"""
+Benchmark per-turn flow dispatch: if/elif route chains vs the compiled flow table.
+
+Usage:
+  python scripts/benchmark_flow_dispatch.py [--conversations 20000] [--rounds 5]
+
+Both sides replay the same conversations with answers already classified,
+so only routing, answer storage and node execution are measured (no LLM).
+The legacy side is a copy of the previous route_* functions and
+RecruiterAssistant._apply_*_route chains, kept here for comparison (with nodes returning updates, as they now do).
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.graph.flow_table import MEETING, PERMISSION, QUESTIONS, flow_table
+from src.main import RecruiterAssistant
+from src.models.state import merge_update
+from src.nodes.meeting import meeting_unclear, send_booking_link
+from src.nodes.permission import end_success, permission_question, permission_unclear, persuasion_then_end
+from src.nodes.questions import QUESTION_NODES, final_message
+
+question_location = QUESTION_NODES["location"]
+question_city = QUESTION_NODES["city"]
+question_plan_to_move = QUESTION_NODES["plan_to_move"]
+question_preferred_cities = QUESTION_NODES["preferred_cities"]
+question_call_center_experience = QUESTION_NODES["call_center_experience"]
+question_experience_details = QUESTION_NODES["experience_details"]
+question_why_call_center = QUESTION_NODES["why_call_center"]
+question_salary_expectation = QUESTION_NODES["salary_expectation"]
+question_previous_applications = QUESTION_NODES["previous_applications"]
+
+# (phase, answer) per turn; yes/no answers are pre-classified
+CONVERSATIONS = [
+    [(MEETING, True), (PERMISSION, True), (QUESTIONS, True), (QUESTIONS, "Rabat"), (QUESTIONS, "Casablanca"),
+     (QUESTIONS, True), (QUESTIONS, "3 years of inbound sales"), (QUESTIONS, "6000 MAD"), (QUESTIONS, "none")],
+    [(MEETING, None), (MEETING, False), (PERMISSION, False), (QUESTIONS, False), (QUESTIONS, "next spring"),
+     (QUESTIONS, "Marrakech"), (QUESTIONS, False), (QUESTIONS, "I like helping people"), (QUESTIONS, "5000 MAD"),
+     (QUESTIONS, "Webhelp")]
+]
+
+
+def _route_meeting(state: dict, answer):
+    if answer is None:
+        return "meeting_unclear"
+    state["meeting_booked"] = answer
+    if answer:
+        return "permission_question"
+    else:
+        return "send_booking_link"
+
+
+def _route_permission(state: dict, answer):
+    if answer is None:
+        return "permission_unclear"
+    state["permission_given"] = answer
+    if answer:
+        return "end_success"
+    else:
+        return "persuasion_then_end"
+
+
+def _route_question(state: dict, answer):
+    current = state.get("current_question")
+    if current == "location":
+        state["in_morocco"] = answer
+        if answer:
+            return "question_city"
+        else:
+            return "question_plan_to_move"
+    elif current == "city":
+        state["current_city"] = answer
+        return "question_preferred_cities"
+    elif current == "plan_to_move":
+        state["plan_to_move"] = answer
+        return "question_preferred_cities"
+    elif current == "preferred_cities":
+        state["preferred_cities"] = answer
+        return "question_call_center_experience"
+    elif current == "call_center_experience":
+        state["has_call_center_experience"] = answer
+        if answer:
+            return "question_experience_details"
+        else:
+            return "question_why_call_center"
+    elif current == "experience_details":
+        state["experience_details"] = answer
+        return "question_salary_expectation"
+    elif current == "why_call_center":
+        state["why_call_center"] = answer
+        return "question_salary_expectation"
+    elif current == "salary_expectation":
+        state["salary_expectation"] = answer
+        return "question_previous_applications"
+    elif current == "previous_applications":
+        state["previous_applications"] = answer
+        return "final_message"
+    return "question_preferred_cities"
+
+
+def _apply_meeting_route(assistant: RecruiterAssistant, route: str):
+    if route == "meeting_unclear":
+        merge_update(assistant.state, meeting_unclear(assistant.state))
+    elif route == "send_booking_link":
+        merge_update(assistant.state, send_booking_link(assistant.state))
+        merge_update(assistant.state, permission_question(assistant.state))
+    elif route == "permission_question":
+        merge_update(assistant.state, permission_question(assistant.state))
+
+
+def _apply_permission_route(assistant: RecruiterAssistant, route: str):
+    if route == "permission_unclear":
+        merge_update(assistant.state, permission_unclear(assistant.state))
+    elif route == "persuasion_then_end":
+        merge_update(assistant.state, persuasion_then_end(assistant.state))
+        assistant.questions_started = True
+        merge_update(assistant.state, question_location(assistant.state))
+    elif route == "end_success":
+        merge_update(assistant.state, end_success(assistant.state))
+        assistant.questions_started = True
+        merge_update(assistant.state, question_location(assistant.state))
+
+
+def _apply_question_route(assistant: RecruiterAssistant, route: str):
+    if route == "question_city":
+        merge_update(assistant.state, question_city(assistant.state))
+    elif route == "question_plan_to_move":
+        merge_update(assistant.state, question_plan_to_move(assistant.state))
+    elif route == "question_preferred_cities":
+        merge_update(assistant.state, question_preferred_cities(assistant.state))
+    elif route == "question_call_center_experience":
+        merge_update(assistant.state, question_call_center_experience(assistant.state))
+    elif route == "question_experience_details":
+        merge_update(assistant.state, question_experience_details(assistant.state))
+    elif route == "question_why_call_center":
+        merge_update(assistant.state, question_why_call_center(assistant.state))
+    elif route == "question_salary_expectation":
+        merge_update(assistant.state, question_salary_expectation(assistant.state))
+    elif route == "question_previous_applications":
+        merge_update(assistant.state, question_previous_applications(assistant.state))
+    elif route == "final_message":
+        merge_update(assistant.state, final_message(assistant.state))
+
+
+def _legacy_turn(assistant: RecruiterAssistant, phase: str, answer):
+    """One turn through the previous routers and apply chains (route_* then _apply_*_route)."""
+    if phase == MEETING:
+        _apply_meeting_route(assistant, _route_meeting(assistant.state, answer))
+    elif phase == PERMISSION:
+        _apply_permission_route(assistant, _route_permission(assistant.state, answer))
+    elif phase == QUESTIONS:
+        _apply_question_route(assistant, _route_question(assistant.state, answer))
+
+
+def _table_turn(assistant: RecruiterAssistant, phase: str, answer):
+    """One turn through the flow table, as RecruiterAssistant._apply runs it."""
+    transition = flow_table.decide(assistant.state, phase, answer)
+    assistant._apply(transition, transition.update(answer))
+
+
+def measure(turn, conversations: int) -> float:
+    """Replay the conversations and return µs per turn."""
+    turns = 0
+    elapsed = 0.0
+    for i in range(conversations):
+        script = CONVERSATIONS[i % len(CONVERSATIONS)]
+        assistant = RecruiterAssistant("Candidate")
+        assistant.state["messages"].append({"role": "assistant", "content": "welcome"})
+        started = time.perf_counter()
+        for phase, answer in script:
+            turn(assistant, phase, answer)
+        elapsed += time.perf_counter() - started
+        turns += len(script)
+    return elapsed / turns * 1e6
+
+
+def main():
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"🔀 Flow dispatch benchmark ({args.conversations} conversations)")
+    print("=" * 60)
+
+    # Both must end in the same state
+    legacy, table = RecruiterAssistant("Candidate"), RecruiterAssistant("Candidate")
+    for phase, answer in CONVERSATIONS[1]:
+        _legacy_turn(legacy, phase, answer)
+        _table_turn(table, phase, answer)
+    assert legacy.state == table.state and legacy.questions_started == table.questions_started
+
+    # Alternate the two and keep each one's best round, to damp machine noise
+    legacy_us = table_us = float("inf")
+    for _ in range(args.rounds):
+        legacy_us = min(legacy_us, measure(_legacy_turn, args.conversations))
+        table_us = min(table_us, measure(_table_turn, args.conversations))
+
+    print(f"if/elif dispatch: {legacy_us:>8.3f} µs/turn")
+    print(f"Flow table:       {table_us:>8.3f} µs/turn ({legacy_us / table_us:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark per-message session bookkeeping cost as the number of sessions grows.
+
+Usage:
+  python scripts/benchmark_session_expiry.py [--sizes 1000 10000 100000 1000000] [--legacy]
+
+Sessions are filled with empty records, so only the expiry bookkeeping is
+measured, not the conversation graph.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import settings
+
+# The benchmark drives sweeps itself
+settings.SESSION_SWEEP_INTERVAL_SECONDS = 0
+
+from src.models.session_record import SessionRecord
+from src.services.session_manager import SessionManager
+
+
+def _phone(i: int) -> str:
+    return f"whatsapp:+2126{i:08d}"
+
+
+def _fill(manager: SessionManager, size: int):
+    """Register empty session records directly."""
+    now = time.time()
+    with manager._lock:
+        for i in range(size):
+            manager._add_session(_phone(i), SessionRecord(now))
+
+
+def _legacy_scan(sessions: dict):
+    """The previous per-message cleanup: compare every session's last activity."""
+    now = time.time()
+    timeout = settings.SESSION_TIMEOUT_MINUTES * 60
+    return [phone for phone, record in sessions.items() if now - record.last_activity > timeout]
+
+
+def bench(size: int, messages: int, legacy: bool) -> dict:
+    """Measure message and sweep costs for one session count."""
+    manager = SessionManager()
+    # Keep every session resident: this measures expiry, not eviction
+    manager.max_resident = 0
+    _fill(manager, size)
+
+    # Existing session receiving a message: expiry check + touch, checkout and save
+    started = time.perf_counter()
+    for i in range(messages):
+        phone = _phone((i * 7919) % size)
+        manager.get_or_create_session(phone)
+        manager.save_session(phone)
+    message_us = (time.perf_counter() - started) / messages * 1e6
+
+    # Sweeper tick with 10% of sessions overdue, bounded to SESSION_SWEEP_BATCH
+    overdue = max(1, size // 10)
+    with manager._lock:
+        for i in range(overdue):
+            manager.expiry.touch(_phone(i), time.monotonic() - 1)
+    started = time.perf_counter()
+    removed = manager._cleanup_expired_sessions()
+    sweep_ms = (time.perf_counter() - started) * 1e3
+
+    result = {
+        "sessions": size,
+        "message_us": round(message_us, 2),
+        "sweep_tick_ms": round(sweep_ms, 2),
+        "swept": removed
+    }
+
+    if legacy:
+        rounds = max(1, min(messages, 2_000_000 // size))
+        started = time.perf_counter()
+        for _ in range(rounds):
+            _legacy_scan(manager.sessions)
+        result["legacy_message_us"] = round((time.perf_counter() - started) / rounds * 1e6, 2)
+    return result
+
+
+def main():
+    """Run the benchmark for each size and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--messages", type=int, default=50_000, help="Messages timed per size")
+    parser.add_argument("--legacy", action="store_true", help="Also time the previous full scan")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"⏱️  Session expiry benchmark (sweep batch: {settings.SESSION_SWEEP_BATCH})")
+    print("=" * 60)
+    header = f"{'sessions':>10} {'message µs':>11} {'sweep tick ms':>14} {'swept':>6}"
+    if args.legacy:
+        header += f" {'legacy scan µs':>15}"
+    print(header)
+
+    for size in args.sizes:
+        result = bench(size, args.messages, args.legacy)
+        line = f"{result['sessions']:>10} {result['message_us']:>11} {result['sweep_tick_ms']:>14} {result['swept']:>6}"
+        if args.legacy:
+            line += f" {result['legacy_message_us']:>15}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark memory per idle session: full RecruiterAssistant objects vs compact SessionRecords.
+
+Usage:
+  python scripts/benchmark_session_memory.py [--sessions 100000]
+
+Every session is a conversation stopped halfway through the questionnaire,
+with candidate answers unique to the session. The nodes are applied
+directly, so no LLM is called.
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.main import RecruiterAssistant
+from src.models.session_record import SessionRecord
+from src.models.state import merge_update
+from src.nodes.permission import end_success, permission_question
+from src.nodes.questions import QUESTION_NODES
+from src.nodes.welcome import welcome_and_meeting_question
+
+question_location = QUESTION_NODES["location"]
+question_city = QUESTION_NODES["city"]
+question_plan_to_move = QUESTION_NODES["plan_to_move"]
+
+
+def _conversation(i: int) -> RecruiterAssistant:
+    """Build a mid-questionnaire conversation for session i."""
+    assistant = RecruiterAssistant(f"Candidate{i}")
+    state = assistant.state
+    merge_update(state, welcome_and_meeting_question(state))
+
+    def user(text: str):
+        state["messages"].append({"role": "user", "content": text})
+
+    user(f"yes I booked it ({i})")
+    state["meeting_booked"] = True
+    merge_update(state, permission_question(state))
+    user(f"sure, go ahead {i}")
+    state["permission_given"] = True
+    merge_update(state, end_success(state))
+    assistant.questions_started = True
+    merge_update(state, question_location(state))
+    user(f"yes I am ({i})")
+    state["in_morocco"] = True
+    merge_update(state, question_city(state))
+    city = f"Casablanca, Maarif {i}"
+    user(city)
+    state["current_city"] = city
+    merge_update(state, question_plan_to_move(state))
+    return assistant
+
+
+def _legacy(i: int) -> dict:
+    """The previous session entry: a live assistant plus datetimes."""
+    now = datetime.now()
+    return {"assistant": _conversation(i), "created_at": now, "last_activity": now, "phone_number": f"+2126{i:08d}"}
+
+
+def _compact(i: int) -> SessionRecord:
+    """The compact session entry."""
+    record = SessionRecord(time.time())
+    record.pack(_conversation(i).to_snapshot())
+    return record
+
+
+def measure(factory, count: int) -> tuple:
+    """Build count entries and return (bytes per session, entries)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entries = {i: factory(i) for i in range(count)}
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / count, entries
+
+
+def main():
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"🧮 Session memory benchmark ({args.sessions} sessions)")
+    print("=" * 60)
+
+    legacy_bytes, legacy = measure(_legacy, args.sessions)
+    del legacy
+    compact_bytes, records = measure(_compact, args.sessions)
+
+    record = records[0]
+    rounds = min(args.sessions, 20_000)
+    started = time.perf_counter()
+    for i in range(rounds):
+        RecruiterAssistant.from_snapshot(records[i].unpack())
+    rebuild_us = (time.perf_counter() - started) / rounds * 1e6
+
+    assistant = RecruiterAssistant.from_snapshot(record.unpack())
+    started = time.perf_counter()
+    for _ in range(rounds):
+        record.pack(assistant.to_snapshot())
+    pack_us = (time.perf_counter() - started) / rounds * 1e6
+
+    print(f"RecruiterAssistant entry: {legacy_bytes:>8.0f} bytes/session")
+    print(f"SessionRecord:            {compact_bytes:>8.0f} bytes/session ({legacy_bytes / compact_bytes:.1f}x smaller)")
+    print(f"Rebuild assistant:        {rebuild_us:>8.2f} µs")
+    print(f"Pack assistant:           {pack_us:>8.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
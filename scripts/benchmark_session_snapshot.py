@@ -0,0 +1,81 @@
+"""
+Benchmark saving and restoring all sessions through a binary snapshot.
+
+Usage:
+  python scripts/benchmark_session_snapshot.py [--sessions 200000]
+
+Sessions are mid-questionnaire conversations with answers unique to each
+session. Restoring is timed the way a restarted server sees it: until the
+snapshot is open and every session is scheduled for expiry, then per
+session on first access.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.benchmark_session_memory import _conversation
+from src.models.session_record import SessionRecord
+from src.services.session_manager import SessionManager
+
+
+def _populate(manager: SessionManager, count: int):
+    """Fill a manager with count packed sessions."""
+    template = SessionRecord(time.time())
+    template.pack(_conversation(0).to_snapshot())
+    snapshot = template.to_snapshot()
+    now = time.time()
+    for i in range(count):
+        snapshot["first_name"] = f"Candidate{i}"
+        snapshot["answers"] = (f"Casablanca, Maarif {i}",) + tuple(snapshot["answers"][1:])
+        snapshot["messages"][-2] = f"Casablanca, Maarif {i}"
+        record = SessionRecord.from_snapshot(snapshot, now, now)
+        manager._add_session(f"whatsapp:+2126{i:08d}", record)
+
+
+def main():
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"💾 Session snapshot benchmark ({args.sessions} sessions)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.snapshot")
+
+        manager = SessionManager()
+        manager.max_resident = 0
+        _populate(manager, args.sessions)
+        saved = manager.save_snapshot(path)
+
+        restarted = SessionManager()
+        restarted.max_resident = 0
+        started = time.perf_counter()
+        restored = restarted.restore_snapshot(path)
+        restore_s = time.perf_counter() - started
+
+        touches = min(args.sessions, 20_000)
+        started = time.perf_counter()
+        for i in range(touches):
+            restarted.get_session(f"whatsapp:+2126{i:08d}")
+        touch_us = (time.perf_counter() - started) / touches * 1e6
+
+        # The next shutdown copies untouched sessions without decoding them
+        resaved = restarted.save_snapshot(path)
+
+    print(f"Save:              {saved['seconds']:>8.3f} s ({saved['bytes'] / saved['sessions']:.0f} bytes/session)")
+    print(f"Restore (ready):   {restore_s:>8.3f} s ({restored} sessions)")
+    print(f"First access:      {touch_us:>8.2f} µs/session")
+    print(f"Save after touch:  {resaved['seconds']:>8.3f} s ({touches} re-encoded)")
+
+
+if __name__ == "__main__":
+    main()
@@ -50,19 +50,21 @@ def initiate_conversation(first_name: str, phone_number: str, restart: bool = Fa
 
     formatted_phone = validate_phone_number(phone_number)
 
-    # Optionally restart session (useful for testing)
-    if restart:
-        session_manager.delete_session(formatted_phone)
+    with session_manager.lease(formatted_phone):
+        # Optionally restart session (useful for testing)
+        if restart:
+            session_manager.delete_session(formatted_phone)
 
-    # Create or get session
-    assistant = session_manager.get_or_create_session(formatted_phone, first_name)
+        # Create or get session
+        assistant = session_manager.get_or_create_session(formatted_phone, first_name)
 
-    # Safety: if for any reason the assistant hasn't produced messages yet, start it.
-    if not assistant.state.get("messages"):
-        assistant.start()
+        # Safety: if for any reason the assistant hasn't produced messages yet, start it.
+        if not assistant.state.get("messages"):
+            assistant.start()
 
-    # Welcome message (last assistant message from start flow)
-    welcome_message = assistant.get_last_message() or "Hi! 👋"
+        # Welcome message (last assistant message from start flow)
+        welcome_message = assistant.get_last_message() or "Hi! 👋"
+        session_manager.save_session(formatted_phone)
 
     # Send message via Twilio
     result = twilio_service.send_message(formatted_phone, welcome_message)
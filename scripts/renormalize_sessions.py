@@ -0,0 +1,92 @@
+"""
+Re-normalize the city answers of every session in the durable store.
+
+Usage:
+  python scripts/renormalize_sessions.py [--url sqlite:///sessions.db] [--batch-size 1000] [--dry-run]
+
+Run it after the gazetteer or the flow spec's "normalize" keys change, or
+once for sessions saved before answers were normalized. Only sessions
+whose normalized fields change are rewritten. Each gets a new version, so
+workers sharing the store reload it at their next lease. Without shared
+leases, stop the server first: it would overwrite a session it holds in
+memory on its next save.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import settings
+from src.graph.flow_table import flow_table
+from src.models.session_record import SessionRecord
+from src.services.gazetteer import gazetteer
+from src.services.session_store import SQLAlchemySessionStore
+
+
+def renormalize(row: dict) -> bool:
+    """
+    Recompute a stored session's normalized fields in place.
+
+    Args:
+        row: Stored record (see SessionStore)
+
+    Returns:
+        Whether the snapshot changed
+    """
+    record = SessionRecord.from_snapshot(json.loads(row["snapshot"]), row["created_at"], row["last_activity"])
+    before = record.normalized
+    snapshot = record.unpack()
+    snapshot["state"].update(flow_table.normalize(snapshot["state"]))
+    record.pack(snapshot)
+    if record.normalized == before:
+        return False
+    row["snapshot"] = json.dumps(record.to_snapshot())
+    row["version"] = time.time_ns()
+    return True
+
+
+def main():
+    """Re-normalize the store and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=settings.SESSION_STORE_URL, help="Session store URL (defaults to SESSION_STORE_URL)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Sessions read and written per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Count changes without writing them")
+    args = parser.parse_args()
+
+    if not args.url:
+        print("❌ --url is required (or set SESSION_STORE_URL)")
+        return
+
+    stats = gazetteer.get_stats()
+    print(f"🗺️  Gazetteer: {stats['cities']} cities, {stats['aliases']} aliases")
+
+    store = SQLAlchemySessionStore(args.url)
+    scanned = changed = 0
+    started = time.perf_counter()
+    after = None
+    try:
+        while True:
+            rows = store.scan(after, args.batch_size)
+            if not rows:
+                break
+            after = rows[-1]["phone_number"]
+            upserts = [row for row in rows if renormalize(row)]
+            scanned += len(rows)
+            changed += len(upserts)
+            if upserts and not args.dry_run:
+                store.write(upserts, [])
+            print(f"   {scanned} sessions scanned, {changed} changed")
+    finally:
+        store.close()
+
+    elapsed = time.perf_counter() - started
+    action = "would change" if args.dry_run else "updated"
+    print(f"✅ {scanned} sessions scanned in {elapsed:.2f}s, {changed} {action}")
+
+
+if __name__ == "__main__":
+    main()
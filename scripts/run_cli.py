@@ -1,6 +1,14 @@
 """
 CLI runner for the Recruiter Assistant.
+
+Usage:
+  python scripts/run_cli.py [--thread ID]
+
+With --thread the conversation runs through the checkpointed graph and is
+resumed when the same thread is opened again (use GRAPH_CHECKPOINTER=
+sqlite:///path to keep threads across runs).
 """
+import argparse
 import sys
 from pathlib import Path
 
@@ -11,8 +19,13 @@ from src.main import RecruiterAssistant
 from config.settings import settings
 
 
-def run_cli():
-    """Run the conversational assistant in CLI mode."""
+def run_cli(thread_id: str = None):
+    """
+    Run the conversational assistant in CLI mode.
+    
+    Args:
+        thread_id: Graph thread to run or resume (None runs a RecruiterAssistant)
+    """
     # Validate settings
     try:
         settings.validate()
@@ -23,13 +36,26 @@ def run_cli():
     print("=" * 60)
     print("🤖 Recruiter Assistant CLI")
     print("=" * 60)
+    if settings.CASSETTE_MODE != "off":
+        print(f"📼 Cassette mode: {settings.CASSETTE_MODE} ({settings.CASSETTE_DIR})")
     
-    # Get user's first name
-    first_name = input("\nEnter your first name: ").strip() or "John"
+    if thread_id:
+        from src.graph.workflow import GraphConversation
+        
+        assistant = GraphConversation(thread_id, "John")
+        if assistant.resumed:
+            print(f"🧵 Resuming thread {thread_id}")
     
-    # Initialize assistant
-    assistant = RecruiterAssistant(first_name)
-    assistant.start()
+    if not thread_id or not assistant.resumed:
+        # Get user's first name
+        first_name = input("\nEnter your first name: ").strip() or "John"
+        
+        # Initialize assistant
+        if thread_id:
+            assistant.first_name = first_name
+        else:
+            assistant = RecruiterAssistant(first_name)
+        assistant.start()
     
     print(f"\n🤖 AI: {assistant.get_last_message()}")
     
@@ -93,6 +119,14 @@ def run_cli():
 
     print(state)
 
+    if settings.CASSETTE_MODE != "off":
+        from src.services.cassette import llm_cassette
+
+        print(f"\n📼 LLM cassette: {llm_cassette.get_stats()}")
+
 
 if __name__ == "__main__":
-    run_cli()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--thread", help="Run the conversation as this graph thread")
+    args = parser.parse_args()
+    run_cli(args.thread)
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+Run the WhatsApp server as several pre-forked worker processes sharing one port.
+
+Usage:
+  python scripts/run_prefork_server.py [--workers N] [--asgi]
+
+The parent binds the listening socket and forks the workers, which accept
+connections from it directly; dead workers are replaced. Sessions are
+shared through SESSION_STORE_URL (defaults to sqlite:///sessions.db), with
+per-phone leases so every worker sees a consistent conversation.
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import settings
+
+DEFAULT_STORE_URL = "sqlite:///sessions.db"
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    """Create the listening socket shared by all workers."""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _serve(sock: socket.socket, asgi: bool):
+    """Worker body: build the app after the fork and serve until terminated."""
+    if asgi:
+        import uvicorn
+        from src.api.asgi import create_asgi_app
+
+        uvicorn.run(create_asgi_app(), fd=sock.fileno(), log_level="debug" if settings.FLASK_DEBUG else "info")
+        return
+
+    from werkzeug.serving import make_server
+    from src.api.app import create_app
+
+    # Exit through SystemExit so atexit hooks flush pending session writes
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    server = make_server(settings.FLASK_HOST, settings.FLASK_PORT, create_app(), threaded=True, fd=sock.fileno())
+    server.serve_forever()
+
+
+def _spawn(sock: socket.socket, asgi: bool) -> int:
+    """Fork one worker and return its pid."""
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        code = 0
+        try:
+            _serve(sock, asgi)
+        except SystemExit:
+            pass
+        except Exception as e:
+            print(f"❌ Worker {os.getpid()} crashed: {e}")
+            code = 1
+        finally:
+            sys.stdout.flush()
+        # Run atexit hooks (session store flush) without returning into the parent's loop
+        sys.exit(code)
+    return pid
+
+
+def main():
+    """Fork the workers and supervise them."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS if settings.SERVER_WORKERS > 1 else os.cpu_count())
+    parser.add_argument("--asgi", action="store_true", help="Serve the FastAPI app with uvicorn instead of Flask")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        print("❌ Prefork mode needs os.fork; use scripts/run_server.py on this platform")
+        return
+
+    # Validate settings
+    try:
+        settings.validate()
+    except ValueError as e:
+        print(f"❌ Configuration Error: {e}")
+        return
+
+    if not settings.SESSION_STORE_URL:
+        settings.SESSION_STORE_URL = DEFAULT_STORE_URL
+    settings.SESSION_STORE_SHARED = True
+
+    # Create the schema once here; workers racing on CREATE TABLE would crash
+    from src.services.session_store import SQLAlchemySessionStore
+    SQLAlchemySessionStore(settings.SESSION_STORE_URL).close()
+
+    sock = _bind(settings.FLASK_HOST, settings.FLASK_PORT)
+
+    print("=" * 60)
+    print(f"🚀 Starting Recruiter Assistant WhatsApp Server ({args.workers} workers, {'ASGI' if args.asgi else 'Flask'})")
+    print("=" * 60)
+    print(f"🌐 Listening on {settings.FLASK_HOST}:{settings.FLASK_PORT}")
+    print(f"🗄️  Shared session store: {settings.SESSION_STORE_URL}")
+    print("=" * 60 + "\n")
+
+    workers = {_spawn(sock, args.asgi) for _ in range(args.workers)}
+    stopping = False
+
+    def _stop(*_):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            print(f"⚠️ Worker {pid} exited with status {status}, restarting")
+            time.sleep(1)
+            workers.add(_spawn(sock, args.asgi))
+
+    print("👋 All workers stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 """
 Run the Flask server for WhatsApp integration.
 """
+import os
+import signal
 import sys
 from pathlib import Path
 
@@ -8,6 +10,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.api.app import create_app
+from src.services.session_manager import session_manager
 from config.settings import settings
 
 
@@ -40,6 +43,12 @@ def main():
     print("✅ Server is ready to receive WhatsApp messages!")
     print("=" * 60 + "\n")
     
+    # Restore sessions from the last shutdown; the debug reloader's parent process doesn't serve
+    if not settings.FLASK_DEBUG or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        session_manager.enable_snapshots()
+    # Exit through SystemExit so atexit hooks save the snapshot and flush pending writes
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    
     # Create and run app
     app = create_app()
     app.run(
@@ -0,0 +1,159 @@
+"""
+Train the distilled yes/no classifier from logged LLM decisions.
+
+Usage:
+  python scripts/train_distilled_classifier.py --log decisions.jsonl --out models/yes_no.npz
+
+Writes the model and an evaluation report (<out>.report.json) comparing the
+model with the LLM on a held-out set.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from config.settings import settings
+from src.services.distilled_classifier import (
+    DEFAULT_DIM,
+    LABELS,
+    DistilledClassifier,
+    label_index,
+    read_decision_log
+)
+from src.services.llm_service import normalize_text
+
+
+def _percentiles(values) -> dict:
+    """p50/p95 of a list of numbers, or empty when there are none."""
+    if len(values) == 0:
+        return {}
+    return {
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3)
+    }
+
+
+def evaluate(model: DistilledClassifier, texts, labels, llm_latencies_ms) -> dict:
+    """
+    Compare the model with the LLM on held-out data.
+
+    Args:
+        model: Calibrated classifier
+        texts: Held-out texts
+        labels: LLM class indices for those texts
+        llm_latencies_ms: Logged LLM latencies for those texts
+
+    Returns:
+        Report dictionary
+    """
+    labels = np.asarray(labels)
+    probs = model.predict_proba(texts)
+    predicted = probs.argmax(axis=1)
+    confidence = probs.max(axis=1)
+    covered = confidence >= model.threshold
+
+    local_latencies_us = []
+    for text in texts:
+        started = time.perf_counter()
+        model.predict(text)
+        local_latencies_us.append((time.perf_counter() - started) * 1e6)
+
+    coverage = float(covered.mean()) if len(labels) else 0.0
+    covered_agreement = float((predicted[covered] == labels[covered]).mean()) if covered.any() else None
+    return {
+        "held_out": int(len(labels)),
+        "agreement_all": round(float((predicted == labels).mean()), 4) if len(labels) else None,
+        # None when no threshold reached the target agreement: the model never answers
+        "threshold": round(model.threshold, 4) if np.isfinite(model.threshold) else None,
+        "temperature": round(model.temperature, 3),
+        "coverage": round(coverage, 4),
+        "agreement_covered": None if covered_agreement is None else round(covered_agreement, 4),
+        # Escalated items are answered by the LLM itself
+        "agreement_with_escalation": (
+            None if covered_agreement is None
+            else round(covered_agreement * coverage + (1 - coverage), 4)
+        ),
+        "llm_calls_saved": round(coverage, 4),
+        "latency_local_us": _percentiles(local_latencies_us),
+        "latency_llm_ms": _percentiles(llm_latencies_ms)
+    }
+
+
+def main():
+    """Train, calibrate, evaluate and save the distilled classifier."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default=settings.CLASSIFIER_DECISION_LOG_PATH, help="JSONL decision log")
+    parser.add_argument("--out", default=settings.DISTILLED_MODEL_PATH, help="Output .npz model path")
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM, help="Number of hash buckets")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--holdout", type=float, default=0.15, help="Share of records for calibration and for test")
+    parser.add_argument("--target-agreement", type=float, default=0.98)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    if not args.log or not args.out:
+        print("❌ --log and --out are required (or set CLASSIFIER_DECISION_LOG_PATH / DISTILLED_MODEL_PATH)")
+        return
+
+    records = list(read_decision_log(args.log))
+    if len(records) < 50:
+        print(f"❌ Only {len(records)} usable records in {args.log}; need at least 50")
+        return
+
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(records))
+    texts = [records[i]["text"] for i in order]
+    labels = [
+        label_index(records[i].get("answer"), float(records[i]["confidence"]), settings.CONFIDENCE_THRESHOLD)
+        for i in order
+    ]
+    latencies = [records[i].get("latency_ms") for i in order]
+
+    n_holdout = max(1, int(len(records) * args.holdout))
+    test = slice(0, n_holdout)
+    calibration = slice(n_holdout, 2 * n_holdout)
+    train = slice(2 * n_holdout, None)
+
+    print(f"📚 Training on {len(texts[train])} records ({args.epochs} epochs, {args.dim} buckets)...")
+    started = time.perf_counter()
+    model = DistilledClassifier.train(texts[train], labels[train], normalize_text, dim=args.dim, epochs=args.epochs)
+    model.calibrate(texts[calibration], labels[calibration], target_agreement=args.target_agreement)
+    train_seconds = time.perf_counter() - started
+
+    report = evaluate(
+        model,
+        texts[test],
+        labels[test],
+        [latency for latency in latencies[test] if latency is not None]
+    )
+    report["train_records"] = len(texts[train])
+    report["calibration_records"] = len(texts[calibration])
+    report["train_seconds"] = round(train_seconds, 2)
+    report["label_distribution"] = {
+        str(label): labels.count(index) for index, label in enumerate(LABELS)
+    }
+
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    model.save(args.out)
+    report_path = str(Path(args.out).with_suffix(".report.json"))
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 60)
+    print("📊 Held-out evaluation vs LLM")
+    print("=" * 60)
+    for key, value in report.items():
+        print(f"  {key}: {value}")
+    if not np.isfinite(model.threshold):
+        print(f"\n⚠️ No threshold reached {args.target_agreement} agreement; the model will escalate every text")
+    print(f"\n✅ Model saved to {args.out}")
+    print(f"📝 Report saved to {report_path}")
+
+
+if __name__ == "__main__":
+    main()
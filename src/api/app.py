@@ -17,6 +17,10 @@ def create_app():
     app = Flask(__name__)
     app.config['SECRET_KEY'] = settings.FLASK_SECRET_KEY
     
+    # Load the tokenizer before the first turn needs it
+    from src.services.llm_service import llm_service
+    llm_service.prompts.load()
+    
     @app.route('/health', methods=['GET'])
     def health_check():
         """Health check endpoint."""
@@ -35,7 +39,7 @@ def create_app():
             # Get incoming message data
             incoming_msg = request.form.get('Body', '').strip()
             from_number = request.form.get('From', '')
-            profile_name = request.form.get('ProfileName', 'User')
+            profile_name = request.form.get('ProfileName', '')
             
             print(f"Received message from {from_number} / Name: ({profile_name}) / Message: {incoming_msg}")
             
@@ -90,15 +94,99 @@ def create_app():
                 "error": "Session not found"
             }), 404
     
+    @app.route('/transcript/<phone_number>', methods=['GET'])
+    def get_transcript(phone_number):
+        """
+        Get the full transcript of a user's conversations.
+        Optional ?limit=<n> returns only the last n entries.
+        """
+        from src.services.transcripts import transcript_log
+        
+        # Add whatsapp: prefix if not present
+        if not phone_number.startswith('whatsapp:'):
+            phone_number = f'whatsapp:{phone_number}'
+        
+        entries = transcript_log.read(phone_number, limit=request.args.get('limit', type=int))
+        if entries is None:
+            return jsonify({
+                "success": False,
+                "error": "Transcript not found"
+            }), 404
+        return jsonify({
+            "success": True,
+            "phone_number": phone_number,
+            "entries": entries
+        }), 200
+    
     @app.route('/sessions', methods=['GET'])
     def get_all_sessions():
         """Get count of active sessions."""
         from src.services.session_manager import session_manager
+        from src.services.transcripts import transcript_log
         
         return jsonify({
-            "active_sessions": session_manager.get_active_sessions_count()
+            "active_sessions": session_manager.get_active_sessions_count(),
+            "registry": session_manager.get_registry_stats(),
+            "expiry": session_manager.get_expiry_stats(),
+            "store": session_manager.get_store_stats(),
+            "locks": session_manager.get_lock_stats(),
+            "snapshot": session_manager.get_snapshot_stats(),
+            "enrichment": session_manager.get_enrichment_stats(),
+            "transcripts": transcript_log.get_stats()
         }), 200
     
+    @app.route('/metrics/classifier', methods=['GET'])
+    def get_classifier_metrics():
+        """Get yes/no classification counters per path."""
+        from src.services.llm_service import llm_service
+        
+        return jsonify(llm_service.get_stats()), 200
+    
+    @app.route('/metrics/cache', methods=['GET'])
+    def get_cache_metrics():
+        """Get exact, similarity and extraction cache hit/miss/eviction statistics."""
+        from src.services.llm_service import llm_service
+        
+        stats = llm_service.cache.get_stats()
+        if llm_service.similarity_cache is not None:
+            stats["similarity"] = llm_service.similarity_cache.get_stats()
+        stats["extraction"] = llm_service.slot_cache.get_stats()
+        return jsonify(stats), 200
+    
+    @app.route('/metrics/transport', methods=['GET'])
+    def get_transport_metrics():
+        """Get HTTP connection pool utilization for outbound clients."""
+        from src.services.http_transport import http_transport
+        
+        return jsonify(http_transport.get_stats()), 200
+    
+    @app.route('/metrics/admission', methods=['GET'])
+    def get_admission_metrics():
+        """Get LLM rate limiter queue depth, wait times and circuit breaker state."""
+        from src.services.admission import admission_controller
+        
+        return jsonify(admission_controller.get_stats()), 200
+    
+    @app.route('/metrics/tokens', methods=['GET'])
+    def get_token_metrics():
+        """
+        Get LLM token usage per route and session.
+        Pass ?session=<phone number> for a single session.
+        """
+        from src.services.llm_service import llm_service
+        from src.services.token_budget import token_ledger
+        
+        session = request.args.get('session')
+        if session:
+            if not session.startswith('whatsapp:'):
+                session = f'whatsapp:{session}'
+            usage = token_ledger.get_session(session)
+            if usage is None:
+                return jsonify({"success": False, "error": "Session not found"}), 404
+            return jsonify({"session": session, **usage}), 200
+        
+        return jsonify({**token_ledger.get_stats(), "prompts": llm_service.prompts.get_stats()}), 200
+    
     @app.errorhandler(404)
     def not_found(e):
         """Handle 404 errors."""
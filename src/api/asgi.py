@@ -0,0 +1,205 @@
+"""
+FastAPI (ASGI) application for Twilio WhatsApp webhook.
+
+Mirrors the Flask app in src/api/app.py, but awaits the LLM and Twilio
+round trips so a single process can hold many conversations in flight.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from twilio.twiml.messaging_response import MessagingResponse
+from src.api.webhooks import ahandle_whatsapp_message
+
+
+def _twiml(resp: MessagingResponse, status_code: int = 200) -> Response:
+    """Wrap a TwiML response."""
+    return Response(content=str(resp), status_code=status_code, media_type="application/xml")
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Let background writers (enrichment) join the async turns' session leases."""
+    from src.services.session_manager import session_manager
+    session_manager.bind_event_loop(asyncio.get_running_loop())
+    try:
+        yield
+    finally:
+        session_manager.bind_event_loop(None)
+
+
+def create_asgi_app() -> FastAPI:
+    """
+    Create and configure FastAPI application.
+
+    Returns:
+        Configured FastAPI app
+    """
+    app = FastAPI(title="recruiter-assistant-whatsapp", lifespan=_lifespan)
+
+    # Load the tokenizer before the first turn needs it
+    from src.services.llm_service import llm_service
+    llm_service.prompts.load()
+
+    @app.get('/health')
+    async def health_check():
+        """Health check endpoint."""
+        return {
+            "status": "healthy",
+            "service": "recruiter-assistant-whatsapp"
+        }
+
+    @app.post('/webhook/whatsapp')
+    async def whatsapp_webhook(request: Request):
+        """
+        Twilio WhatsApp webhook endpoint.
+        Receives incoming messages from WhatsApp users.
+        """
+        try:
+            # Get incoming message data
+            form = await request.form()
+            incoming_msg = str(form.get('Body', '')).strip()
+            from_number = str(form.get('From', ''))
+            profile_name = str(form.get('ProfileName', ''))
+
+            print(f"Received message from {from_number} / Name: ({profile_name}) / Message: {incoming_msg}")
+
+            response_messages = await ahandle_whatsapp_message(
+                from_number=from_number,
+                message=incoming_msg,
+                profile_name=profile_name
+            )
+
+            # Create Twilio response (only for the first message, others sent via API)
+            resp = MessagingResponse()
+            if response_messages:
+                resp.message(response_messages[0])
+
+            return _twiml(resp)
+
+        except Exception as e:
+            print(f"Error in webhook: {e}")
+            resp = MessagingResponse()
+            resp.message("Sorry, I encountered an error. Please try again.")
+            return _twiml(resp, 500)
+
+    @app.post('/')
+    async def root_webhook(request: Request):
+        # Twilio is currently POSTing to '/'
+        return await whatsapp_webhook(request)
+
+    @app.get('/session/{phone_number}')
+    async def get_session_info(phone_number: str):
+        """
+        Get information about a user's session.
+        For debugging and monitoring purposes.
+        """
+        from src.services.session_manager import session_manager
+
+        # Add whatsapp: prefix if not present
+        if not phone_number.startswith('whatsapp:'):
+            phone_number = f'whatsapp:{phone_number}'
+
+        info = session_manager.get_session_info(phone_number)
+
+        if not info:
+            return JSONResponse({"success": False, "error": "Session not found"}, status_code=404)
+
+        return {
+            "success": True,
+            "session": {
+                "phone_number": info["phone_number"],
+                "created_at": info["created_at"].isoformat(),
+                "last_activity": info["last_activity"].isoformat(),
+                "is_completed": info["is_completed"],
+                "collected_data": info["collected_data"]
+            }
+        }
+
+    @app.get('/transcript/{phone_number}')
+    def get_transcript(phone_number: str, limit: Optional[int] = None):
+        """
+        Get the full transcript of a user's conversations.
+        Optional ?limit=<n> returns only the last n entries.
+        """
+        from src.services.transcripts import transcript_log
+
+        # Add whatsapp: prefix if not present
+        if not phone_number.startswith('whatsapp:'):
+            phone_number = f'whatsapp:{phone_number}'
+
+        entries = transcript_log.read(phone_number, limit=limit)
+        if entries is None:
+            return JSONResponse({"success": False, "error": "Transcript not found"}, status_code=404)
+        return {"success": True, "phone_number": phone_number, "entries": entries}
+
+    @app.get('/sessions')
+    async def get_all_sessions():
+        """Get count of active sessions."""
+        from src.services.session_manager import session_manager
+        from src.services.transcripts import transcript_log
+
+        return {
+            "active_sessions": session_manager.get_active_sessions_count(),
+            "registry": session_manager.get_registry_stats(),
+            "expiry": session_manager.get_expiry_stats(),
+            "store": session_manager.get_store_stats(),
+            "locks": session_manager.get_lock_stats(),
+            "snapshot": session_manager.get_snapshot_stats(),
+            "enrichment": session_manager.get_enrichment_stats(),
+            "transcripts": transcript_log.get_stats()
+        }
+
+    @app.get('/metrics/classifier')
+    async def get_classifier_metrics():
+        """Get yes/no classification counters per path."""
+        from src.services.llm_service import llm_service
+
+        return llm_service.get_stats()
+
+    @app.get('/metrics/cache')
+    async def get_cache_metrics():
+        """Get exact, similarity and extraction cache hit/miss/eviction statistics."""
+        from src.services.llm_service import llm_service
+
+        stats = llm_service.cache.get_stats()
+        if llm_service.similarity_cache is not None:
+            stats["similarity"] = llm_service.similarity_cache.get_stats()
+        stats["extraction"] = llm_service.slot_cache.get_stats()
+        return stats
+
+    @app.get('/metrics/transport')
+    async def get_transport_metrics():
+        """Get HTTP connection pool utilization for outbound clients."""
+        from src.services.http_transport import http_transport
+
+        return http_transport.get_stats()
+
+    @app.get('/metrics/admission')
+    async def get_admission_metrics():
+        """Get LLM rate limiter queue depth, wait times and circuit breaker state."""
+        from src.services.admission import admission_controller
+
+        return admission_controller.get_stats()
+
+    @app.get('/metrics/tokens')
+    async def get_token_metrics(session: Optional[str] = None):
+        """
+        Get LLM token usage per route and session.
+        Pass ?session=<phone number> for a single session.
+        """
+        from src.services.llm_service import llm_service
+        from src.services.token_budget import token_ledger
+
+        if session:
+            if not session.startswith('whatsapp:'):
+                session = f'whatsapp:{session}'
+            usage = token_ledger.get_session(session)
+            if usage is None:
+                return JSONResponse({"success": False, "error": "Session not found"}, status_code=404)
+            return {"session": session, **usage}
+
+        return {**token_ledger.get_stats(), "prompts": llm_service.prompts.get_stats()}
+
+    return app
@@ -1,8 +1,10 @@
 """
 Webhook handlers for processing incoming WhatsApp messages.
 """
-from typing import List
+from typing import List, Optional
+from config.settings import settings
 from src.services.session_manager import session_manager
+from src.services.turn_context import turn_labels
 from src.services.twilio_service import twilio_service
 
 
@@ -10,6 +12,10 @@ def handle_whatsapp_message(from_number: str, message: str, profile_name: str) -
     """
     Handle incoming WhatsApp message and generate response.
     
+    With GRAPH_WEBHOOKS_ENABLED the turn is a step of the checkpointed
+    graph on the sender's thread; otherwise it runs on the sender's
+    SessionManager session.
+    
     Args:
         from_number: Sender's WhatsApp number
         message: Message content
@@ -18,8 +24,127 @@ def handle_whatsapp_message(from_number: str, message: str, profile_name: str) -
     Returns:
         List of response messages
     """
-    # Handle special commands
+    # Exclusive across worker processes until this turn's state is committed
+    with session_manager.lease(from_number):
+        command_response = _handle_command(from_number, message, profile_name)
+        if command_response is not None:
+            return command_response
+        
+        if settings.GRAPH_WEBHOOKS_ENABLED:
+            conversation = _conversation(from_number, profile_name)
+            if not conversation.resumed:
+                conversation.start()
+                return [conversation.get_last_message()]
+            response_messages = conversation.process_user_input(message)
+            return _reply(from_number, response_messages)
+        
+        # Check if this is the first message (welcome message not sent yet)
+        is_new_session = session_manager.get_session(from_number) is None
+        
+        # Get or create session
+        assistant = session_manager.get_or_create_session(from_number, profile_name)
+        
+        if is_new_session:
+            # This is a new session, return welcome message
+            return [assistant.get_last_message()]
+        
+        # Process user input
+        with turn_labels(session=from_number):
+            response_messages = assistant.process_user_input(message)
+        session_manager.save_session(from_number)
+    
+    return _reply(from_number, response_messages)
+
+
+async def ahandle_whatsapp_message(from_number: str, message: str, profile_name: str) -> List[str]:
+    """
+    Async variant of handle_whatsapp_message used by the ASGI app.
+    
+    Args:
+        from_number: Sender's WhatsApp number
+        message: Message content
+        profile_name: Sender's profile name
+        
+    Returns:
+        List of response messages
+    """
+    async with session_manager.alease(from_number):
+        command_response = _handle_command(from_number, message, profile_name)
+        if command_response is not None:
+            return command_response
+        
+        if settings.GRAPH_WEBHOOKS_ENABLED:
+            conversation = _conversation(from_number, profile_name)
+            if not conversation.resumed:
+                conversation.start()
+                return [conversation.get_last_message()]
+            response_messages = await conversation.aprocess_user_input(message)
+            return await _areply(from_number, response_messages)
+        
+        is_new_session = session_manager.get_session(from_number) is None
+        assistant = session_manager.get_or_create_session(from_number, profile_name)
+        
+        if is_new_session:
+            return [assistant.get_last_message()]
+        
+        with turn_labels(session=from_number):
+            response_messages = await assistant.aprocess_user_input(message)
+        session_manager.save_session(from_number)
+    
+    return await _areply(from_number, response_messages)
+
+
+def _reply(from_number: str, response_messages: List[str]) -> List[str]:
+    """
+    Send all but the first response message via Twilio.
+    
+    Args:
+        from_number: Sender's WhatsApp number
+        response_messages: Messages the turn produced
+        
+    Returns:
+        The first message, returned as the webhook's reply
+    """
+    # Send additional messages (skip the first one as it will be returned)
+    for msg in response_messages[1:]:
+        twilio_service.send_message(from_number, msg)
+    
+    # Return the first message (or a fallback if there are no messages)
+    return response_messages[:1] if response_messages else ["Thank you for your message."]
+
+
+async def _areply(from_number: str, response_messages: List[str]) -> List[str]:
+    """Async variant of _reply."""
+    for msg in response_messages[1:]:
+        await twilio_service.asend_message(from_number, msg)
+    
+    return response_messages[:1] if response_messages else ["Thank you for your message."]
+
+
+def _conversation(from_number: str, profile_name: str):
+    """Open the sender's graph thread (GRAPH_WEBHOOKS_ENABLED)."""
+    from src.graph.workflow import GraphConversation
+    
+    return GraphConversation(from_number, profile_name)
+
+
+def _handle_command(from_number: str, message: str, profile_name: str) -> Optional[List[str]]:
+    """
+    Handle special commands (reset, help, status).
+    
+    Args:
+        from_number: Sender's WhatsApp number
+        message: Message content
+        profile_name: Sender's profile name
+        
+    Returns:
+        List of response messages, or None if the message is not a command
+    """
     if message.lower() in ['reset', 'restart', 'start over']:
+        if settings.GRAPH_WEBHOOKS_ENABLED:
+            conversation = _conversation(from_number, profile_name)
+            conversation.reset()
+            return [conversation.get_last_message()]
         session_manager.delete_session(from_number)
         assistant = session_manager.get_or_create_session(from_number, profile_name)
         return [assistant.get_last_message()]
@@ -33,7 +158,12 @@ def handle_whatsapp_message(from_number: str, message: str, profile_name: str) -
         ]
     
     if message.lower() == 'status':
-        assistant = session_manager.get_session(from_number)
+        if settings.GRAPH_WEBHOOKS_ENABLED:
+            conversation = _conversation(from_number, profile_name)
+            assistant = conversation.assistant() if conversation.resumed else None
+        else:
+            # Read-only: a checked-out session would stay pinned until the next turn
+            assistant = session_manager.peek_session(from_number)
         if assistant:
             data = assistant.get_collected_data()
             status = "✅ Completed" if assistant.is_completed() else "📝 In Progress"
@@ -45,25 +175,7 @@ def handle_whatsapp_message(from_number: str, message: str, profile_name: str) -
         else:
             return ["No active session. Send any message to start!"]
     
-    # Get or create session
-    assistant = session_manager.get_or_create_session(from_number, profile_name)
-    
-    # Check if this is the first message (welcome message not sent yet)
-    if len(assistant.state["messages"]) == 1:
-        # This is a new session, return welcome message
-        return [assistant.get_last_message()]
-    
-    # Process user input
-    response_messages = assistant.process_user_input(message)
-    
-    # If we got multiple messages, send additional ones via Twilio API
-    if len(response_messages) > 1:
-        # Send additional messages (skip the first one as it will be returned)
-        for msg in response_messages[1:]:
-            twilio_service.send_message(from_number, msg)
-    
-    # Return the first message (or empty list if no messages)
-    return response_messages[:1] if response_messages else ["Thank you for your message."]
+    return None
 
 
 def handle_status_callback(message_sid: str, message_status: str):
@@ -0,0 +1,291 @@
+"""
+Compiled transition table for the conversation flow.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from config.settings import settings
+from src.models.state import RecruiterState, StateUpdate, normalized_field
+from src.nodes.meeting import meeting_unclear, send_booking_link
+from src.nodes.permission import (
+    permission_question,
+    permission_unclear,
+    persuasion_then_end,
+    end_success
+)
+from src.nodes.questions import QUESTION_NODES, Node, final_message
+from src.services.gazetteer import gazetteer
+
+
+# Conversation phases a user message can belong to
+MEETING = "meeting"
+PERMISSION = "permission"
+QUESTIONS = "questions"
+
+# Classified yes/no answers; other answers are free text stored as typed
+YES = True
+NO = False
+UNCLEAR = None
+
+# Question behind the answer field of each fixed phase, for slot extraction
+_PHASE_QUESTIONS = {
+    MEETING: "Have you already booked your meeting with us?",
+    PERMISSION: settings.PERMISSION_QUESTION
+}
+
+
+class Transition:
+    """What a user answer leads to."""
+
+    __slots__ = ("field", "route", "nodes", "starts_questions")
+
+    def __init__(self, field: Optional[str], route: str, nodes: Tuple[Node, ...], starts_questions: bool):
+        self.field = field  # state field the answer is stored in
+        self.route = route  # name of the first node, for logs and token attribution
+        self.nodes = nodes  # nodes to run, in order
+        self.starts_questions = starts_questions  # whether the questionnaire begins
+    
+    def update(self, answer: Any) -> StateUpdate:
+        """State fields the answer is stored in (empty when it is not stored)."""
+        return {self.field: answer} if self.field is not None else {}
+
+
+# A table entry: the transition, or transitions by classified answer
+_Entry = Union[Transition, Dict[Optional[bool], Transition]]
+
+
+def current_phase(state: RecruiterState, questions_started: bool) -> Optional[str]:
+    """
+    Get the conversation phase the next user message belongs to.
+    
+    Args:
+        state: Current conversation state
+        questions_started: Whether the questionnaire has begun
+        
+    Returns:
+        MEETING, PERMISSION, QUESTIONS or None when nothing is pending
+    """
+    if state["meeting_booked"] is None:
+        return MEETING
+    if state["permission_given"] is None:
+        return PERMISSION
+    if questions_started and state["current_question"] is not None:
+        return QUESTIONS
+    return None
+
+
+def phase_route(state: RecruiterState, questions_started: bool) -> Optional[str]:
+    """
+    Get the route name LLM usage of the next user message is attributed to.
+    
+    Args:
+        state: Current conversation state
+        questions_started: Whether the questionnaire has begun
+        
+    Returns:
+        The phase, with the pending question for the questions phase (e.g. "questions:location")
+    """
+    phase = current_phase(state, questions_started)
+    if phase == QUESTIONS:
+        return f"{QUESTIONS}:{state['current_question']}"
+    return phase
+
+
+class FlowTable:
+    """
+    Transition table from (phase, pending question, answer) to the next nodes.
+
+    The meeting and permission phases are fixed; the questionnaire is built
+    from settings.QUESTION_FLOW and settings.QUESTIONS, so adding a question
+    is a configuration change. The table is compiled once, keyed by phase
+    and, in the questions phase, by pending question. An entry is the
+    transition itself for free-text answers, or a dict from the classified
+    answer (True/False/None) to the transition, so a turn costs one lookup,
+    two for yes/no answers. Text answers whose spec has "normalize" are
+    also stored as gazetteer city names (see normalize).
+    """
+
+    def __init__(self, flow: Dict[str, dict], first_question: str):
+        """
+        Compile the table.
+
+        Args:
+            flow: Questionnaire spec (see settings.QUESTION_FLOW)
+            first_question: Question asked once permission is answered
+
+        Raises:
+            ValueError: If the spec refers to an unknown question, answer kind or normalizer
+        """
+        self.flow = flow
+        self.first_question = first_question
+        self.nodes: Dict[str, Node] = {
+            "meeting_unclear": meeting_unclear,
+            "send_booking_link": send_booking_link,
+            "permission_question": permission_question,
+            "permission_unclear": permission_unclear,
+            "persuasion_then_end": persuasion_then_end,
+            "end_success": end_success,
+            "final_message": final_message,
+            **{f"question_{key}": node for key, node in QUESTION_NODES.items()}
+        }
+        self._phases: Dict[str, _Entry] = {}
+        self._questions: Dict[str, _Entry] = {}
+        # Answer field to the gazetteer lookup its answers are normalized with
+        self._normalizers: Dict[str, Callable[[str], Any]] = {}
+        self._compile()
+
+    def _compile(self):
+        ask_first = self._ask(None, self.first_question)
+        self._phases[MEETING] = {
+            UNCLEAR: Transition(None, "meeting_unclear", (meeting_unclear,), False),
+            YES: Transition("meeting_booked", "permission_question", (permission_question,), False),
+            NO: Transition("meeting_booked", "send_booking_link", (send_booking_link, permission_question), False)
+        }
+        self._phases[PERMISSION] = {
+            UNCLEAR: Transition(None, "permission_unclear", (permission_unclear,), False),
+            YES: Transition("permission_given", "end_success", (end_success,) + ask_first.nodes, True),
+            # After persuasion, start questions anyway at the moment
+            NO: Transition("permission_given", "persuasion_then_end", (persuasion_then_end,) + ask_first.nodes, True)
+        }
+
+        for key, spec in self.flow.items():
+            if key not in settings.QUESTIONS:
+                raise ValueError(f"Question '{key}' has no message in settings.QUESTIONS")
+            if spec["kind"] == "yes_no":
+                self._questions[key] = {
+                    YES: self._ask(spec["field"], spec["yes"]),
+                    NO: self._ask(spec["field"], spec["no"]),
+                    UNCLEAR: self._ask(spec["field"], spec["no"])
+                }
+            elif spec["kind"] == "text":
+                self._questions[key] = self._ask(spec["field"], spec["next"])
+            else:
+                raise ValueError(f"Question '{key}' has unknown kind '{spec['kind']}'")
+            if "normalize" in spec:
+                if spec["kind"] != "text" or spec["normalize"] not in ("city", "cities"):
+                    raise ValueError(f"Question '{key}' has unknown normalizer '{spec['normalize']}'")
+                self._normalizers[spec["field"]] = gazetteer.match if spec["normalize"] == "city" else gazetteer.parse
+
+    def _ask(self, field: Optional[str], question: Optional[str]) -> Transition:
+        """Transition storing an answer and asking a question (None sends the final message)."""
+        route = f"question_{question}" if question is not None else "final_message"
+        if route not in self.nodes:
+            raise ValueError(f"Flow refers to unknown question '{question}'")
+        return Transition(field, route, (self.nodes[route],), False)
+
+    def classifies(self, phase: str, question: Optional[str]) -> bool:
+        """Whether an answer in this phase (and question) is classified as yes/no."""
+        entry = self._questions.get(question) if phase == QUESTIONS else self._phases.get(phase)
+        return type(entry) is dict
+    
+    def answer_field(self, phase: str, question: Optional[str]) -> Optional[str]:
+        """State field an answer in this phase (and question) is stored in."""
+        entry = self._questions.get(question) if phase == QUESTIONS else self._phases.get(phase)
+        if entry is None:
+            return None
+        return (entry[YES] if type(entry) is dict else entry).field
+    
+    def slot_fields(self, state: RecruiterState, phase: str) -> Dict[str, Tuple[str, str]]:
+        """
+        Get the fields a message can fill: the pending answer and every unanswered question.
+        
+        Args:
+            state: Current conversation state
+            phase: Phase the message belongs to
+            
+        Returns:
+            State field to (kind, question), kind being "yes_no" or "text"
+        """
+        fields: Dict[str, Tuple[str, str]] = {}
+        if phase != QUESTIONS:
+            fields[self.answer_field(phase, None)] = ("yes_no", _PHASE_QUESTIONS[phase])
+        for key, spec in self.flow.items():
+            if state.get(spec["field"]) is None:
+                fields.setdefault(spec["field"], (spec["kind"], settings.QUESTIONS[key]))
+        return fields
+    
+    def normalize(self, answers: Dict[str, Any]) -> StateUpdate:
+        """
+        Get the normalized form of every answer that has one, without an LLM call.
+        
+        Args:
+            answers: Answers by state field, e.g. a routed update
+            
+        Returns:
+            Update setting <field>_normalized: a city name (or None) for "city",
+            a list of city names for "cities"
+        """
+        return {
+            normalized_field(field): normalize(answers[field])
+            for field, normalize in self._normalizers.items()
+            if isinstance(answers.get(field), str)
+        }
+    
+    def skipped(self, state: RecruiterState) -> Optional[Transition]:
+        """
+        Get the transition past a pending question that is already answered.
+        
+        An answer extracted from an earlier message fills a question before
+        it is asked; its node then only logs the skip, and the flow continues
+        as if the stored answer had just been given.
+        
+        Args:
+            state: Current conversation state
+            
+        Returns:
+            Transition to apply, or None when the pending question still needs an answer
+        """
+        spec = self.flow.get(state["current_question"])
+        if spec is None or state.get(spec["field"]) is None:
+            return None
+        return self.decide(state, QUESTIONS, state[spec["field"]])
+
+    def successors(self) -> Dict[str, Optional[str]]:
+        """
+        Get the node each node hands over to within a turn, as graph edges.
+        
+        Returns:
+            Node name to the next node's name (None ends the turn)
+            
+        Raises:
+            ValueError: If a node is followed by different nodes in different transitions
+        """
+        transitions = []
+        for entry in list(self._phases.values()) + list(self._questions.values()):
+            transitions.extend(entry.values() if type(entry) is dict else [entry])
+        transitions.append(self._ask(None, self.first_question))
+        
+        successors: Dict[str, Optional[str]] = {}
+        for transition in transitions:
+            names = [node.__name__ for node in transition.nodes]
+            for name, following in zip(names, names[1:] + [None]):
+                if successors.setdefault(name, following) != following:
+                    raise ValueError(f"Node '{name}' is followed by both '{successors[name]}' and '{following}'")
+        return successors
+    
+    def decide(self, state: RecruiterState, phase: str, answer: Any) -> Transition:
+        """
+        Get the transition an answer leads to.
+        
+        The answer is not stored; apply transition.update(answer) to the state.
+
+        Args:
+            state: Current conversation state
+            phase: Phase the answer belongs to
+            answer: Classified answer (True/False/None) or the typed text
+
+        Returns:
+            Transition whose nodes continue the conversation
+        """
+        if phase == QUESTIONS:
+            transition = self._questions.get(state["current_question"])
+        else:
+            transition = self._phases[phase]
+        if transition is None:
+            # A question dropped from the flow: start the questionnaire over
+            transition = self._ask(None, self.first_question)
+        elif type(transition) is dict:
+            transition = transition[answer]
+        return transition
+
+
+# Global instance
+flow_table = FlowTable(settings.QUESTION_FLOW, settings.FIRST_QUESTION)
@@ -1,42 +1,260 @@
 """
 LangGraph workflow construction.
 """
-from langgraph.graph import StateGraph
-from src.models.state import RecruiterState
+import asyncio
+from typing import Any, Dict, Optional, TypedDict, get_type_hints
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END, START, StateGraph
+from config.settings import settings
+from src.graph.flow_table import FlowTable, flow_table, phase_route
+from src.models.state import RecruiterState, normalized_field
 from src.nodes.welcome import welcome_and_meeting_question
-from src.nodes.meeting import meeting_unclear, send_booking_link
-from src.nodes.permission import (
-    permission_question,
-    permission_unclear,
-    persuasion_then_end,
-    end_success
-)
+from src.routers.flow_routers import aroute_node, route_node
+from src.services.turn_context import turn_budget, turn_labels
 
 
-def build_workflow() -> StateGraph:
+def build_state_schema(table: FlowTable) -> type:
+    """
+    Build the graph's state schema.
+
+    A graph only keeps the fields its schema declares, so the schema is
+    RecruiterState plus the answer (and normalized) fields of questions
+    added in the flow spec and the two fields the router node writes.
+
+    Args:
+        table: Flow table the graph runs
+
+    Returns:
+        TypedDict class for StateGraph
+    """
+    fields: Dict[str, Any] = get_type_hints(RecruiterState, include_extras=True)
+    for spec in table.flow.values():
+        fields.setdefault(spec["field"], Optional[Any])
+        if "normalize" in spec:
+            fields.setdefault(normalized_field(spec["field"]), Optional[Any])
+    fields["questions_started"] = bool
+    fields["next_node"] = Optional[str]
+    return TypedDict("ConversationGraphState", fields, total=False)
+
+
+def _entry(state: dict) -> str:
+    """A new thread starts with the welcome; later invocations route the user's message."""
+    return "route" if state.get("messages") else "welcome_and_meeting_question"
+
+
+def _next_node(state: dict) -> str:
+    """Follow the node the router picked."""
+    return state["next_node"] or END
+
+
+def _skip_answered(table: FlowTable):
+    """Edge out of a question node: past the question when it was already answered, else end the turn."""
+    def next_node(state: dict) -> str:
+        transition = table.skipped(state)
+        return transition.route if transition is not None else END
+    return next_node
+
+
+def build_workflow(table: FlowTable = flow_table, checkpointer: Any = None):
     """
     Build and compile the conversation workflow graph.
-    
+
+    One invocation is one turn. A new thread is invoked with the initial
+    state and sends the welcome; every later invocation passes only the
+    user's message, {"messages": [{"role": "user", "content": text}]}. The
+    "route" node classifies it and writes next_node, a conditional edge
+    follows it, and the chain of nodes the flow table gives the answer runs
+    to the end of the turn. A question node whose answer was extracted
+    earlier only logs the skip, and its conditional edge moves on to the
+    next question. Nodes return only what they change, so with a
+    checkpointer each turn persists its delta per thread_id.
+
+    Args:
+        table: Flow table providing the nodes and transitions
+        checkpointer: LangGraph checkpointer (see create_checkpointer), or None
+
     Returns:
         Compiled StateGraph
     """
-    builder = StateGraph(RecruiterState)
+    schema = build_state_schema(table)
+    builder = StateGraph(schema)
+
+    # Add all nodes; nodes are annotated with RecruiterState, which would
+    # otherwise hide the other schema fields from them
+    builder.add_node("welcome_and_meeting_question", welcome_and_meeting_question, input_schema=schema)
+    builder.add_node("route", RunnableLambda(route_node, afunc=aroute_node, name="route"), input_schema=schema)
+    for name, node in table.nodes.items():
+        builder.add_node(name, node, input_schema=schema)
+
+    # Wire the edges
+    builder.add_conditional_edges(START, _entry, ["welcome_and_meeting_question", "route"])
+    builder.add_edge("welcome_and_meeting_question", END)
+    builder.add_conditional_edges("route", _next_node, [*table.nodes, END])
+    asks = {f"question_{key}" for key in table.flow}
+    for name, following in table.successors().items():
+        if name in asks:
+            builder.add_conditional_edges(name, _skip_answered(table), [*table.nodes, END])
+        else:
+            builder.add_edge(name, following or END)
+
+    # Compile and return
+    return builder.compile(checkpointer=checkpointer)
+
+
+def create_checkpointer(url: str) -> Any:
+    """
+    Create the checkpointer graph threads are persisted with.
+
+    Args:
+        url: "" for none, "memory", or "sqlite:///path/to/file.db"
+
+    Returns:
+        Checkpointer instance, or None
+
+    Raises:
+        ValueError: If the URL is not supported
+    """
+    if not url:
+        return None
+    if url == "memory":
+        from langgraph.checkpoint.memory import InMemorySaver
+        return InMemorySaver()
+    if url.startswith("sqlite:///"):
+        import sqlite3
+        from langgraph.checkpoint.sqlite import SqliteSaver
+        return SqliteSaver(sqlite3.connect(url[len("sqlite:///"):], check_same_thread=False))
+    raise ValueError(f"Unsupported GRAPH_CHECKPOINTER: {url}")
+
+
+def _supports_async(checkpointer: Any) -> bool:
+    """Whether a checkpointer implements the async API graph.ainvoke uses."""
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        return True
+    return not isinstance(checkpointer, SqliteSaver)
+
+
+def thread_config(thread_id: str) -> dict:
+    """
+    Get the config resuming a conversation thread.
+
+    Args:
+        thread_id: Conversation id, e.g. the phone number
+
+    Returns:
+        Config for graph.invoke / graph.get_state
+    """
+    return {"configurable": {"thread_id": thread_id}}
+
+
+class GraphConversation:
+    """
+    One conversation run through the graph, resumable by thread_id.
     
-    # Add all nodes
-    builder.add_node("welcome_and_meeting_question", welcome_and_meeting_question)
-    builder.add_node("meeting_unclear", meeting_unclear)
-    builder.add_node("send_booking_link", send_booking_link)
-    builder.add_node("permission_question", permission_question)
-    builder.add_node("permission_unclear", permission_unclear)
-    builder.add_node("persuasion_then_end", persuasion_then_end)
-    builder.add_node("end_success", end_success)
+    It offers the methods of RecruiterAssistant the CLI and the webhooks
+    use, so a conversation can be driven turn by turn through the
+    checkpointed graph and picked up again later, or in another process
+    with a sqlite checkpointer. The webhooks use it with
+    GRAPH_WEBHOOKS_ENABLED, one thread per phone number. Turns run under
+    the same TURN_BUDGET_SECONDS deadline and usage labels as
+    RecruiterAssistant turns.
+    """
     
-    # Set entry point
-    builder.set_entry_point("welcome_and_meeting_question")
+    def __init__(self, thread_id: str, first_name: str, workflow=None):
+        """
+        Open a conversation thread.
+        
+        Args:
+            thread_id: Conversation id, e.g. the phone number
+            first_name: User's first name, used if the thread is new
+            workflow: Compiled graph with a checkpointer (defaults to the global graph)
+        """
+        self.graph = workflow or graph
+        self.thread_id = thread_id
+        self.config = thread_config(thread_id)
+        self.first_name = first_name
+        self.values: Dict[str, Any] = self.graph.get_state(self.config).values
     
-    # Compile and return
-    return builder.compile()
+    @property
+    def resumed(self) -> bool:
+        """Whether the thread already had a conversation."""
+        return bool(self.values.get("messages"))
+    
+    def start(self):
+        """Send the welcome on a new thread; a resumed thread continues where it stopped."""
+        if not self.resumed:
+            from src.main import RecruiterAssistant
+            self.values = self.graph.invoke(dict(RecruiterAssistant(self.first_name).state), self.config)
+    
+    def get_last_message(self) -> str:
+        """Get the last assistant message."""
+        return self.assistant().get_last_message()
+    
+    def process_user_input(self, user_input: str) -> list:
+        """
+        Run one turn as one graph invocation.
+        
+        Args:
+            user_input: User's response
+            
+        Returns:
+            List of new assistant messages
+        """
+        message_count_before = len(self.values["messages"])
+        route = phase_route(self.values, self.values.get("questions_started", False))
+        with turn_budget(settings.TURN_BUDGET_SECONDS), turn_labels(session=self.thread_id, route=route):
+            self.values = self.graph.invoke({"messages": [{"role": "user", "content": user_input}]}, self.config)
+        return self.assistant().get_new_messages(message_count_before)
+    
+    async def aprocess_user_input(self, user_input: str) -> list:
+        """
+        Async variant of process_user_input built on graph.ainvoke.
+        
+        The sqlite checkpointer only has a sync API, so with it the turn runs
+        in a worker thread instead.
+        
+        Args:
+            user_input: User's response
+            
+        Returns:
+            List of new assistant messages
+        """
+        if not _supports_async(self.graph.checkpointer):
+            return await asyncio.to_thread(self.process_user_input, user_input)
+        message_count_before = len(self.values["messages"])
+        route = phase_route(self.values, self.values.get("questions_started", False))
+        with turn_budget(settings.TURN_BUDGET_SECONDS), turn_labels(session=self.thread_id, route=route):
+            self.values = await self.graph.ainvoke({"messages": [{"role": "user", "content": user_input}]}, self.config)
+        return self.assistant().get_new_messages(message_count_before)
+    
+    def reset(self):
+        """Delete the thread's checkpoints and start the conversation over."""
+        self.graph.checkpointer.delete_thread(self.thread_id)
+        self.values = {}
+        self.start()
+    
+    def assistant(self):
+        """Get the thread's state as a RecruiterAssistant."""
+        from src.main import RecruiterAssistant
+        state = {key: value for key, value in self.values.items() if key not in ("questions_started", "next_node")}
+        return RecruiterAssistant.from_snapshot({
+            "state": state,
+            "questions_started": self.values.get("questions_started", False)
+        })
+    
+    def is_completed(self) -> bool:
+        """Check if conversation is completed."""
+        return self.assistant().is_completed()
+    
+    def get_state(self) -> RecruiterState:
+        """Get current state."""
+        return self.assistant().get_state()
+    
+    def get_collected_data(self) -> dict:
+        """Get all collected candidate data."""
+        return self.assistant().get_collected_data()
 
 
 # Global graph instance
-graph = build_workflow()
\ No newline at end of file
+graph = build_workflow(checkpointer=create_checkpointer(settings.GRAPH_CHECKPOINTER))
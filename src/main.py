@@ -1,32 +1,27 @@
 """
 Main entry point for the Recruiter Assistant.
 """
-from src.models.state import RecruiterState
-from src.graph.workflow import graph
-from src.routers.flow_routers import meeting_router, permission_router, question_router
-from src.nodes.meeting import meeting_unclear, send_booking_link
-from src.nodes.permission import (
-    permission_question,
-    permission_unclear,
-    persuasion_then_end,
-    end_success
-)
-from src.nodes.questions import (
-    question_location,
-    question_city,
-    question_plan_to_move,
-    question_preferred_cities,
-    question_call_center_experience,
-    question_experience_details,
-    question_why_call_center,
-    question_salary_expectation,
-    question_previous_applications,
-    final_message
-)
+from typing import List, Optional, Tuple
+from config.settings import settings
+from src.models.state import RecruiterState, StateUpdate, merge_update, normalized_field
+from src.services.turn_context import turn_budget, turn_labels
+from src.graph.flow_table import Transition, current_phase, flow_table, phase_route
+from src.nodes.welcome import welcome_and_meeting_question
+from src.routers.flow_routers import flow_router, aflow_router
 
 
 class RecruiterAssistant:
-    """Main assistant class for managing conversation flow."""
+    """
+    Main assistant class for managing conversation flow.
+    
+    This is the default production turn path: the webhooks run every turn
+    here and persist sessions through the SessionManager. A turn is the
+    same step the conversation graph (src/graph/workflow.py) runs: the
+    router picks a flow table transition and its nodes' updates are merged
+    into the state in place. With GRAPH_WEBHOOKS_ENABLED the webhooks use
+    the graph's checkpointed threads instead; it shares the routers, nodes
+    and flow table, so the two paths only differ in how state is persisted.
+    """
     
     def __init__(self, first_name: str):
         """
@@ -50,13 +45,24 @@ class RecruiterAssistant:
             "why_call_center": None,
             "salary_expectation": None,
             "previous_applications": None,
-            "current_question": None
+            "current_city_normalized": None,
+            "preferred_cities_normalized": None,
+            "current_question": None,
+            "enrichment": None
         }
+        # Answer fields of questions added in settings.QUESTION_FLOW
+        for spec in settings.QUESTION_FLOW.values():
+            self.state.setdefault(spec["field"], None)
+            if "normalize" in spec:
+                self.state.setdefault(normalized_field(spec["field"]), None)
         self.questions_started = False
+        # Messages and log entries already handed to spill_history
+        self._spilled_messages = 0
+        self._spilled_log = 0
     
     def start(self):
         """Start the conversation flow."""
-        self.state = graph.invoke(self.state)
+        merge_update(self.state, welcome_and_meeting_question(self.state))
     
     def get_last_message(self) -> str:
         """Get the last assistant message."""
@@ -87,61 +93,72 @@ class RecruiterAssistant:
         
         self.state["messages"].append({"role": "user", "content": user_input})
         
-        # Phase 1: Meeting booking
-        if self.state["meeting_booked"] is None:
-            route = meeting_router(self.state)
-            
-            if route == "meeting_unclear":
-                self.state = meeting_unclear(self.state)
-            elif route == "send_booking_link":
-                self.state = send_booking_link(self.state)
-                self.state = permission_question(self.state)
-            elif route == "permission_question":
-                self.state = permission_question(self.state)
-        
-        # Phase 2: Permission
-        elif self.state["permission_given"] is None:
-            route = permission_router(self.state)
-            
-            if route == "permission_unclear":
-                self.state = permission_unclear(self.state)
-            elif route == "persuasion_then_end":
-                self.state = persuasion_then_end(self.state)
-                # After persuasion, start questions anyway at the moment
-                self.questions_started = True
-                self.state = question_location(self.state)
-            elif route == "end_success":
-                self.state = end_success(self.state)
-                self.questions_started = True
-                self.state = question_location(self.state)
+        # Routers degrade to their unclear answer when the budget runs out
+        with turn_budget(settings.TURN_BUDGET_SECONDS), turn_labels(route=self._current_route()):
+            phase = self._current_phase()
+            if phase is not None:
+                self._apply(*flow_router(self.state, phase))
+        
+        # Return new assistant messages
+        return self.get_new_messages(message_count_before)
+    
+    async def aprocess_user_input(self, user_input: str) -> list:
+        """
+        Async variant of process_user_input.
+        
+        The LLM round trip is awaited instead of blocking a worker thread, so
+        one event loop can keep many conversations in flight.
         
-        # Phase 3: Questions
-        elif self.questions_started and self.state["current_question"] is not None:
-            route = question_router(self.state)
+        Args:
+            user_input: User's response
             
-            # Execute the next question based on routing
-            if route == "question_city":
-                self.state = question_city(self.state)
-            elif route == "question_plan_to_move":
-                self.state = question_plan_to_move(self.state)
-            elif route == "question_preferred_cities":
-                self.state = question_preferred_cities(self.state)
-            elif route == "question_call_center_experience":
-                self.state = question_call_center_experience(self.state)
-            elif route == "question_experience_details":
-                self.state = question_experience_details(self.state)
-            elif route == "question_why_call_center":
-                self.state = question_why_call_center(self.state)
-            elif route == "question_salary_expectation":
-                self.state = question_salary_expectation(self.state)
-            elif route == "question_previous_applications":
-                self.state = question_previous_applications(self.state)
-            elif route == "final_message":
-                self.state = final_message(self.state)
+        Returns:
+            List of new assistant messages
+        """
+        message_count_before = len(self.state["messages"])
+        
+        self.state["messages"].append({"role": "user", "content": user_input})
+        
+        with turn_budget(settings.TURN_BUDGET_SECONDS), turn_labels(route=self._current_route()):
+            phase = self._current_phase()
+            if phase is not None:
+                self._apply(*await aflow_router(self.state, phase))
         
-        # Return new assistant messages
         return self.get_new_messages(message_count_before)
     
+    def _current_phase(self) -> Optional[str]:
+        """
+        Get the conversation phase the next user message belongs to.
+        
+        Returns:
+            "meeting", "permission", "questions" or None when nothing is pending
+        """
+        return current_phase(self.state, self.questions_started)
+    
+    def _current_route(self) -> Optional[str]:
+        """
+        Get the route name LLM usage of the next user message is attributed to.
+        
+        Returns:
+            The phase, with the pending question for the questions phase (e.g. "questions:location")
+        """
+        return phase_route(self.state, self.questions_started)
+    
+    def _apply(self, transition: Transition, update: StateUpdate):
+        """
+        Store the routed answers and merge the updates of a flow table transition's nodes.
+        
+        When the transition lands on a question answered earlier, the flow
+        moves on through flow_table.skipped until a question needs asking.
+        """
+        merge_update(self.state, update)
+        while transition is not None:
+            for node in transition.nodes:
+                merge_update(self.state, node(self.state))
+            if transition.starts_questions:
+                self.questions_started = True
+            transition = flow_table.skipped(self.state)
+    
     def is_completed(self) -> bool:
         """Check if conversation is completed."""
         return (
@@ -168,5 +185,59 @@ class RecruiterAssistant:
             "experience_details": self.state["experience_details"],
             "why_call_center": self.state["why_call_center"],
             "salary_expectation": self.state["salary_expectation"],
-            "previous_applications": self.state["previous_applications"]
-        }
\ No newline at end of file
+            "previous_applications": self.state["previous_applications"],
+            **{spec["field"]: self.state.get(spec["field"]) for spec in settings.QUESTION_FLOW.values()},
+            **{
+                normalized_field(spec["field"]): self.state.get(normalized_field(spec["field"]))
+                for spec in settings.QUESTION_FLOW.values() if "normalize" in spec
+            },
+            "enrichment": self.state.get("enrichment")
+        }
+    
+    def spill_history(self, keep_messages: int, keep_log: int) -> Tuple[List[dict], List[str]]:
+        """
+        Take the history added since the last call and trim what stays in memory.
+        
+        Routers only read the latest user message, so keeping a short tail
+        is enough to continue the flow; the taken entries go to the transcript.
+        
+        Args:
+            keep_messages: Messages to keep (0 keeps all)
+            keep_log: Log entries to keep (0 keeps all)
+            
+        Returns:
+            (new messages, new log entries)
+        """
+        messages, log = self.state["messages"], self.state["log"]
+        new_messages = messages[self._spilled_messages:]
+        new_log = log[self._spilled_log:]
+        if 0 < keep_messages < len(messages):
+            del messages[:-keep_messages]
+        if 0 < keep_log < len(log):
+            del log[:-keep_log]
+        self._spilled_messages = len(messages)
+        self._spilled_log = len(log)
+        return new_messages, new_log
+    
+    def to_snapshot(self) -> dict:
+        """Get a JSON-serializable snapshot of the conversation."""
+        return {"state": dict(self.state), "questions_started": self.questions_started}
+    
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "RecruiterAssistant":
+        """
+        Restore an assistant from a snapshot without re-running the flow.
+        
+        Args:
+            snapshot: Dictionary produced by to_snapshot
+            
+        Returns:
+            RecruiterAssistant instance
+        """
+        assistant = cls(snapshot["state"]["first_name"])
+        assistant.state.update(snapshot["state"])
+        assistant.questions_started = snapshot["questions_started"]
+        # A snapshot only holds history that was already spilled
+        assistant._spilled_messages = len(assistant.state["messages"])
+        assistant._spilled_log = len(assistant.state["log"])
+        return assistant
@@ -0,0 +1,269 @@
+"""
+Compact per-session record for idle conversations.
+"""
+import sys
+from enum import IntEnum
+from typing import Dict, Optional, Tuple, Union
+from config.settings import settings
+from src.models.state import normalized_field
+
+
+class Question(IntEnum):
+    """Built-in questionnaire questions; values are persisted, so only append."""
+    NONE = 0
+    LOCATION = 1
+    CITY = 2
+    PLAN_TO_MOVE = 3
+    PREFERRED_CITIES = 4
+    CALL_CENTER_EXPERIENCE = 5
+    EXPERIENCE_DETAILS = 6
+    WHY_CALL_CENTER = 7
+    SALARY_EXPECTATION = 8
+    PREVIOUS_APPLICATIONS = 9
+
+
+# Question ids: Question members, then questions added to settings.QUESTION_FLOW in spec order
+QUESTION_IDS: Dict[str, int] = {question.name.lower(): int(question) for question in Question if question}
+for _key in settings.QUESTION_FLOW:
+    QUESTION_IDS.setdefault(_key, len(QUESTION_IDS) + 1)
+QUESTION_KEYS: Tuple[Optional[str], ...] = (None,) + tuple(sorted(QUESTION_IDS, key=QUESTION_IDS.get))
+_ADDED_QUESTIONS = QUESTION_KEYS[len(Question):]
+
+# Tri-state answers packed two bits each: (answered, value)
+FLAG_FIELDS = ("meeting_booked", "permission_given", "in_morocco", "has_call_center_experience")
+QUESTIONS_STARTED = 1 << (2 * len(FLAG_FIELDS))
+# Yes/no answers of added questions take the bits above QUESTIONS_STARTED
+ADDED_FLAG_FIELDS = tuple(
+    spec["field"] for spec in settings.QUESTION_FLOW.values()
+    if spec["kind"] == "yes_no" and spec["field"] not in FLAG_FIELDS
+)
+_FLAG_SHIFTS = tuple(
+    [(field, 2 * i) for i, field in enumerate(FLAG_FIELDS)]
+    + [(field, 2 * (len(FLAG_FIELDS) + i) + 1) for i, field in enumerate(ADDED_FLAG_FIELDS)]
+)
+
+# Free-text answers, stored as one tuple (or None while nothing is answered)
+TEXT_FIELDS = (
+    "current_city",
+    "plan_to_move",
+    "preferred_cities",
+    "experience_details",
+    "why_call_center",
+    "salary_expectation",
+    "previous_applications"
+)
+TEXT_FIELDS += tuple(
+    spec["field"] for spec in settings.QUESTION_FLOW.values()
+    if spec["kind"] == "text" and spec["field"] not in TEXT_FIELDS
+)
+
+# Gazetteer-normalized answers, stored as one tuple (or None while nothing is normalized)
+NORMALIZED_FIELDS = tuple(
+    normalized_field(spec["field"]) for spec in settings.QUESTION_FLOW.values() if "normalize" in spec
+)
+
+# Assistant messages by template id. Ids are persisted, so only append.
+TEMPLATES: Tuple[str, ...] = (
+    settings.WELCOME_MESSAGE_TEMPLATE,
+    settings.MEETING_UNCLEAR_MESSAGE,
+    settings.BOOKING_LINK_MESSAGE_TEMPLATE.format(booking_link=settings.BOOKING_LINK),
+    settings.PERMISSION_QUESTION,
+    settings.PERMISSION_UNCLEAR_MESSAGE,
+    settings.PERSUASION_MESSAGE,
+    settings.FINAL_MESSAGE,
+    *(settings.QUESTIONS[question.name.lower()] for question in Question if question),
+    *(settings.QUESTIONS[key] for key in _ADDED_QUESTIONS)
+)
+WELCOME_TEMPLATE = 0
+_TEMPLATE_IDS: Dict[str, int] = {text: i for i, text in enumerate(TEMPLATES) if i != WELCOME_TEMPLATE}
+
+# A message is a template id (assistant), a str (user) or a (role, content) pair
+Message = Union[int, str, Tuple[str, str]]
+
+
+class SessionRecord:
+    """
+    Packed conversation state of one session.
+
+    Booleans are a bitfield, the pending question is a small int, static
+    assistant messages are template ids and log entries are interned, so an
+    idle session only pays for what the candidate actually typed. The
+    RecruiterAssistant is rebuilt from the record when a turn needs it
+    (``unpack``) and folded back afterwards (``pack``); while checked out it
+    is kept in ``assistant``.
+    """
+
+    __slots__ = (
+        "first_name",
+        "flags",
+        "question",
+        "answers",
+        "normalized",
+        "messages",
+        "log",
+        "enrichment",
+        "created_at",
+        "last_activity",
+        "version",
+        "assistant"
+    )
+
+    def __init__(self, created_at: float, last_activity: Optional[float] = None):
+        """
+        Initialize an empty record.
+
+        Args:
+            created_at: Epoch seconds the session was created
+            last_activity: Epoch seconds of the last message (defaults to created_at)
+        """
+        self.first_name = ""
+        self.flags = 0
+        # QUESTION_IDS value of the pending question (0 when none)
+        self.question = Question.NONE
+        self.answers: Optional[tuple] = None
+        self.normalized: Optional[tuple] = None
+        self.messages: Tuple[Message, ...] = ()
+        self.log: Tuple[str, ...] = ()
+        # Normalized answers added after completion, if any
+        self.enrichment: Optional[dict] = None
+        self.created_at = created_at
+        self.last_activity = created_at if last_activity is None else last_activity
+        # Stored version this record matches, when sessions are shared between workers
+        self.version: Optional[int] = None
+        self.assistant = None
+
+    def pack(self, snapshot: dict):
+        """
+        Fold an assistant snapshot into the record.
+
+        Args:
+            snapshot: Dictionary produced by RecruiterAssistant.to_snapshot
+        """
+        state = snapshot["state"]
+        self.first_name = state["first_name"]
+
+        flags = QUESTIONS_STARTED if snapshot["questions_started"] else 0
+        for field, shift in _FLAG_SHIFTS:
+            value = state.get(field)
+            if value is not None:
+                flags |= (0b11 if value else 0b01) << shift
+        self.flags = flags
+
+        current = state["current_question"]
+        self.question = QUESTION_IDS[current] if current else Question.NONE
+
+        answers = tuple(state.get(field) for field in TEXT_FIELDS)
+        self.answers = answers if any(answer is not None for answer in answers) else None
+        normalized = tuple(state.get(field) for field in NORMALIZED_FIELDS)
+        self.normalized = normalized if any(value is not None for value in normalized) else None
+
+        welcome = settings.WELCOME_MESSAGE_TEMPLATE.format(first_name=self.first_name)
+        self.messages = tuple(self._encode(message, welcome) for message in state["messages"])
+        self.log = tuple(sys.intern(entry) for entry in state["log"])
+        self.enrichment = state.get("enrichment")
+
+    @staticmethod
+    def _encode(message: dict, welcome: str) -> Message:
+        role, content = message["role"], message["content"]
+        if role == "user":
+            return content
+        if role == "assistant":
+            if content == welcome:
+                return WELCOME_TEMPLATE
+            template_id = _TEMPLATE_IDS.get(content)
+            if template_id is not None:
+                return template_id
+        return role, content
+
+    def unpack(self) -> dict:
+        """
+        Rebuild an assistant snapshot from the record.
+
+        Returns:
+            Dictionary accepted by RecruiterAssistant.from_snapshot
+        """
+        state = {"first_name": self.first_name}
+        for field, shift in _FLAG_SHIFTS:
+            bits = (self.flags >> shift) & 0b11
+            state[field] = None if not bits else bits == 0b11
+        # Records saved before a text question was added have fewer answers
+        answers = self.answers or ()
+        state.update(zip(TEXT_FIELDS, answers + (None,) * (len(TEXT_FIELDS) - len(answers))))
+        normalized = self.normalized or ()
+        state.update(zip(NORMALIZED_FIELDS, normalized + (None,) * (len(NORMALIZED_FIELDS) - len(normalized))))
+        state["current_question"] = QUESTION_KEYS[self.question]
+        state["messages"] = [self._decode(message) for message in self.messages]
+        state["log"] = list(self.log)
+        state["enrichment"] = self.enrichment
+        return {"state": state, "questions_started": bool(self.flags & QUESTIONS_STARTED)}
+
+    def _decode(self, message: Message) -> dict:
+        if isinstance(message, int):
+            content = TEMPLATES[message]
+            if message == WELCOME_TEMPLATE:
+                content = content.format(first_name=self.first_name)
+            return {"role": "assistant", "content": content}
+        if isinstance(message, str):
+            return {"role": "user", "content": message}
+        return {"role": message[0], "content": message[1]}
+
+    @property
+    def message_count(self) -> int:
+        """Number of messages in the conversation."""
+        return len(self.messages)
+
+    def text_answers(self) -> Dict[str, str]:
+        """Free-text answers given so far, by state field."""
+        return {field: answer for field, answer in zip(TEXT_FIELDS, self.answers or ()) if answer is not None}
+
+    def is_completed(self) -> bool:
+        """Same rule as RecruiterAssistant.is_completed, without rebuilding it."""
+        permission_answered = self.flags & (0b01 << 2)
+        return not self.question and bool(self.flags & QUESTIONS_STARTED) and bool(permission_answered)
+
+    def to_snapshot(self) -> dict:
+        """Get the JSON-serializable packed form, for durable storage."""
+        return {
+            "v": 1,
+            "first_name": self.first_name,
+            "flags": self.flags,
+            "question": int(self.question),
+            "answers": self.answers,
+            "normalized": self.normalized,
+            "messages": [message if not isinstance(message, tuple) else list(message) for message in self.messages],
+            "log": self.log,
+            "enrichment": self.enrichment
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict, created_at: float, last_activity: float) -> "SessionRecord":
+        """
+        Restore a record from to_snapshot output or a RecruiterAssistant snapshot.
+
+        Args:
+            snapshot: Packed or assistant snapshot
+            created_at: Epoch seconds the session was created
+            last_activity: Epoch seconds of the last message
+
+        Returns:
+            SessionRecord instance
+        """
+        record = cls(created_at, last_activity)
+        if "state" in snapshot:
+            record.pack(snapshot)
+            return record
+
+        record.first_name = snapshot["first_name"]
+        record.flags = snapshot["flags"]
+        record.question = snapshot["question"]
+        record.answers = tuple(snapshot["answers"]) if snapshot["answers"] is not None else None
+        # Records saved before answers were normalized have no "normalized"
+        normalized = snapshot.get("normalized")
+        record.normalized = tuple(normalized) if normalized is not None else None
+        record.messages = tuple(
+            message if not isinstance(message, list) else tuple(message)
+            for message in snapshot["messages"]
+        )
+        record.log = tuple(sys.intern(entry) for entry in snapshot["log"])
+        record.enrichment = snapshot.get("enrichment")
+        return record
@@ -1,17 +1,23 @@
 """
 State and data models for the Recruiter Assistant.
 """
-from typing import TypedDict, Optional, List, Dict
+import operator
+from typing import Annotated, Any, TypedDict, Optional, List, Dict
 from pydantic import BaseModel
 
 
 class RecruiterState(TypedDict):
-    """Main state for the recruiter conversation flow."""
+    """
+    Main state for the recruiter conversation flow.
+    
+    Nodes return only the fields they change; messages and log are appended
+    to (see merge_update), every other field is replaced.
+    """
     first_name: str
     meeting_booked: Optional[bool]
     permission_given: Optional[bool]
-    messages: List[Dict[str, str]]
-    log: List[str]
+    messages: Annotated[List[Dict[str, str]], operator.add]
+    log: Annotated[List[str], operator.add]
     
     # Question responses
     in_morocco: Optional[bool]
@@ -24,12 +30,86 @@ class RecruiterState(TypedDict):
     salary_expectation: Optional[str]
     previous_applications: Optional[str]
     
+    # Gazetteer-normalized answers (see FlowTable.normalize)
+    current_city_normalized: Optional[str]
+    preferred_cities_normalized: Optional[List[str]]
+    
     # Current question tracker
     current_question: Optional[str]
+    
+    # Normalized answers added after completion (see CandidateEnrichment)
+    enrichment: Optional[Dict[str, Any]]
+
+
+# What a node returns: the state fields it changes
+StateUpdate = Dict[str, Any]
+
+# Fields a node update is appended to rather than replacing
+APPEND_FIELDS = ("messages", "log")
+
+
+def normalized_field(field: str) -> str:
+    """State field holding the normalized form of an answer field."""
+    return f"{field}_normalized"
+
+
+def merge_update(state: RecruiterState, update: StateUpdate) -> RecruiterState:
+    """
+    Apply a node's update to a state in place, as the graph's reducers would.
+    
+    Args:
+        state: Conversation state to update
+        update: Fields returned by a node
+        
+    Returns:
+        The same state
+    """
+    for key, value in update.items():
+        if key in APPEND_FIELDS:
+            state[key].extend(value)
+        else:
+            state[key] = value
+    return state
 
 
 class YesNoIntent(BaseModel):
     """Intent classification result for yes/no questions."""
     answer: Optional[bool]  # true/false/null
     confidence: float
-    reasoning: str
\ No newline at end of file
+    reasoning: str
+
+
+class SlotExtraction(BaseModel):
+    """Answers recognized in one user message, keyed by state field."""
+    answers: Dict[str, Any]
+
+
+class CandidateEnrichment(BaseModel):
+    """Normalized form of a completed candidate's free-text answers."""
+    city: Optional[str] = None
+    move_date: Optional[str] = None  # YYYY-MM or YYYY
+    salary_amount: Optional[float] = None  # monthly
+    salary_currency: Optional[str] = None  # ISO 4217
+    employers: List[str] = []
+
+
+class EnrichmentBatchItem(CandidateEnrichment):
+    """Enrichment of one candidate in a batched request."""
+    id: int
+
+
+class EnrichmentBatchResult(BaseModel):
+    """Structured output of a batched enrichment request."""
+    results: List[EnrichmentBatchItem]
+
+
+class YesNoBatchItem(BaseModel):
+    """Classification result for one item of a batched yes/no request (no reasoning, to keep the reply short)."""
+    id: int
+    answer: Optional[bool]
+    confidence: float
+
+
+class YesNoBatchResult(BaseModel):
+    """Structured output of a batched yes/no classification."""
+    results: List[YesNoBatchItem]
@@ -2,10 +2,10 @@
 Meeting-related conversation nodes.
 """
 from config.settings import settings
-from src.models.state import RecruiterState
+from src.models.state import RecruiterState, StateUpdate
 
 
-def meeting_unclear(state: RecruiterState) -> RecruiterState:
+def meeting_unclear(state: RecruiterState) -> StateUpdate:
     """
     Handle unclear response to meeting question.
     
@@ -13,15 +13,13 @@ def meeting_unclear(state: RecruiterState) -> RecruiterState:
         state: Current conversation state
         
     Returns:
-        Updated state asking for clarification
+        Update asking for clarification
     """
-    msg = "Sorry, I didn't fully catch that — have you already booked a meeting? (yes/no)"
-    state["messages"].append({"role": "assistant", "content": msg})
-    state["log"].append("Meeting unclear → asked again")
-    return state
+    msg = settings.MEETING_UNCLEAR_MESSAGE
+    return {"messages": [{"role": "assistant", "content": msg}], "log": ["Meeting unclear → asked again"]}
 
 
-def send_booking_link(state: RecruiterState) -> RecruiterState:
+def send_booking_link(state: RecruiterState) -> StateUpdate:
     """
     Send booking link when user hasn't booked a meeting.
     
@@ -29,13 +27,7 @@ def send_booking_link(state: RecruiterState) -> RecruiterState:
         state: Current conversation state
         
     Returns:
-        Updated state with booking link
+        Update with booking link
     """
-    msg = (
-        "No problem! Please book a meeting using this link:\n"
-        f"{settings.BOOKING_LINK}\n\n"
-        "After booking, I'll ask you a couple of quick questions to prepare for the meeting."
-    )
-    state["messages"].append({"role": "assistant", "content": msg})
-    state["log"].append("Meeting not booked → sent link")
-    return state
\ No newline at end of file
+    msg = settings.BOOKING_LINK_MESSAGE_TEMPLATE.format(booking_link=settings.BOOKING_LINK)
+    return {"messages": [{"role": "assistant", "content": msg}], "log": ["Meeting not booked → sent link"]}
\ No newline at end of file
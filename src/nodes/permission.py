@@ -1,10 +1,11 @@
 """
 Permission-related conversation nodes.
 """
-from src.models.state import RecruiterState
+from config.settings import settings
+from src.models.state import RecruiterState, StateUpdate
 
 
-def permission_question(state: RecruiterState) -> RecruiterState:
+def permission_question(state: RecruiterState) -> StateUpdate:
     """
     Ask for permission to continue with questions.
     
@@ -12,15 +13,13 @@ def permission_question(state: RecruiterState) -> RecruiterState:
         state: Current conversation state
         
     Returns:
-        Updated state with permission question
+        Update with permission question
     """
-    msg = "Is it okay if we ask you a couple of questions to prepare ourselves for the upcoming meeting?"
-    state["messages"].append({"role": "assistant", "content": msg})
-    state["log"].append("Asked permission")
-    return state
+    msg = settings.PERMISSION_QUESTION
+    return {"messages": [{"role": "assistant", "content": msg}], "log": ["Asked permission"]}
 
 
-def permission_unclear(state: RecruiterState) -> RecruiterState:
+def permission_unclear(state: RecruiterState) -> StateUpdate:
     """
     Handle unclear response to permission question.
     
@@ -28,15 +27,13 @@ def permission_unclear(state: RecruiterState) -> RecruiterState:
         state: Current conversation state
         
     Returns:
-        Updated state asking for clarification
+        Update asking for clarification
     """
-    msg = "Just to confirm — is it okay if we ask you a few questions? (yes/no)"
-    state["messages"].append({"role": "assistant", "content": msg})
-    state["log"].append("Permission unclear → asked again")
-    return state
+    msg = settings.PERMISSION_UNCLEAR_MESSAGE
+    return {"messages": [{"role": "assistant", "content": msg}], "log": ["Permission unclear → asked again"]}
 
 
-def persuasion_then_end(state: RecruiterState) -> RecruiterState:
+def persuasion_then_end(state: RecruiterState) -> StateUpdate:
     """
     Send persuasion message when permission is denied.
     
@@ -44,18 +41,13 @@ def persuasion_then_end(state: RecruiterState) -> RecruiterState:
         state: Current conversation state
         
     Returns:
-        Updated state with persuasion message
+        Update with persuasion message
     """
-    msg = (
-        "No worries — these questions help our recruiter prepare and make the meeting more effective. "
-        "It takes only about 2 minutes."
-    )
-    state["messages"].append({"role": "assistant", "content": msg})
-    state["log"].append("Permission denied → persuasion sent")
-    return state
+    msg = settings.PERSUASION_MESSAGE
+    return {"messages": [{"role": "assistant", "content": msg}], "log": ["Permission denied → persuasion sent"]}
 
 
-def end_success(state: RecruiterState) -> RecruiterState:
+def end_success(state: RecruiterState) -> StateUpdate:
     """
     Permission granted - move to first question.
     
@@ -63,7 +55,6 @@ def end_success(state: RecruiterState) -> RecruiterState:
         state: Current conversation state
         
     Returns:
-        Updated state (questions will continue in main loop)
+        Update (questions will continue in main loop)
     """
-    state["log"].append("Permission granted - starting questions")
-    return state
\ No newline at end of file
+    return {"log": ["Permission granted - starting questions"]}
\ No newline at end of file
@@ -2,10 +2,10 @@
 Welcome and initial meeting question node.
 """
 from config.settings import settings
-from src.models.state import RecruiterState
+from src.models.state import RecruiterState, StateUpdate
 
 
-def welcome_and_meeting_question(state: RecruiterState) -> RecruiterState:
+def welcome_and_meeting_question(state: RecruiterState) -> StateUpdate:
     """
     Send welcome message and ask about meeting booking.
     
@@ -13,13 +13,10 @@ def welcome_and_meeting_question(state: RecruiterState) -> RecruiterState:
         state: Current conversation state
         
     Returns:
-        Updated state with welcome message
+        Update with welcome message
     """
     msg = settings.WELCOME_MESSAGE_TEMPLATE.format(
         first_name=state['first_name']
     )
     
-    state["messages"].append({"role": "assistant", "content": msg})
-    state["log"].append("Sent welcome + meeting question")
-    
-    return state
\ No newline at end of file
+    return {"messages": [{"role": "assistant", "content": msg}], "log": ["Sent welcome + meeting question"]}
\ No newline at end of file
@@ -1,133 +1,140 @@
 """
 Routing logic for conversation flow.
 """
-from typing import Literal
-from src.models.state import RecruiterState
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+from config.settings import settings
+from src.graph.flow_table import QUESTIONS, Transition, current_phase, flow_table
+from src.models.state import RecruiterState, StateUpdate
 from src.services.llm_service import llm_service
 
 
-MeetingRoute = Literal["meeting_unclear", "permission_question", "send_booking_link"]
-PermissionRoute = Literal["permission_unclear", "end_success", "persuasion_then_end"]
-QuestionRoute = Literal[
-    "question_city",
-    "question_plan_to_move",
-    "question_preferred_cities",
-    "question_call_center_experience",
-    "question_experience_details",
-    "question_why_call_center",
-    "question_salary_expectation",
-    "question_previous_applications",
-    "final_message"
-]
+def flow_router(state: RecruiterState, phase: str) -> Tuple[Transition, StateUpdate]:
+    """
+    Read the latest user message and pick the next nodes.
 
+    The answer is classified as yes/no only where the flow table asks for
+    it; other answers are kept as typed. With SLOT_FILLING_ENABLED, a longer
+    message also goes through one extraction call that fills every other
+    unanswered question it answers, so those questions are skipped later.
 
-def meeting_router(state: RecruiterState) -> MeetingRoute:
-    """
-    Route based on meeting booking response.
-    
     Args:
         state: Current conversation state
-        
+        phase: Phase the message belongs to ("meeting", "permission" or "questions")
+
     Returns:
-        Next node to execute
+        (transition to apply, state update with the answer and extracted fields)
     """
     last_user_msg = state["messages"][-1]["content"]
-    answer = llm_service.classify_yes_no(last_user_msg)
-    
-    if answer is None:
-        return "meeting_unclear"
-    
-    state["meeting_booked"] = answer
-    
-    if answer:
-        return "permission_question"
-    else:
-        return "send_booking_link"
-
-
-def permission_router(state: RecruiterState) -> PermissionRoute:
+    question = state["current_question"] if phase == QUESTIONS else None
+    answer = last_user_msg
+    if flow_table.classifies(phase, question):
+        answer = llm_service.classify_yes_no(last_user_msg)
+    extracted: StateUpdate = {}
+    fields = _extra_fields(state, phase, question, last_user_msg)
+    if fields:
+        extracted = llm_service.extract_slots(last_user_msg, fields)
+    return _decide(state, phase, answer, extracted)
+
+
+async def aflow_router(state: RecruiterState, phase: str) -> Tuple[Transition, StateUpdate]:
     """
-    Route based on permission response.
-    
+    Async variant of flow_router; classification and extraction run concurrently.
+
     Args:
         state: Current conversation state
-        
+        phase: Phase the message belongs to
+
     Returns:
-        Next node to execute
+        (transition to apply, state update with the answer and extracted fields)
     """
     last_user_msg = state["messages"][-1]["content"]
-    answer = llm_service.classify_yes_no(last_user_msg)
-    
-    if answer is None:
-        return "permission_unclear"
-    
-    state["permission_given"] = answer
-    
-    if answer:
-        return "end_success"
-    else:
-        return "persuasion_then_end"
-
-
-def question_router(state: RecruiterState) -> QuestionRoute:
+    question = state["current_question"] if phase == QUESTIONS else None
+    answer = last_user_msg
+    extracted: StateUpdate = {}
+    classifies = flow_table.classifies(phase, question)
+    fields = _extra_fields(state, phase, question, last_user_msg)
+    if classifies and fields:
+        answer, extracted = await asyncio.gather(
+            llm_service.aclassify_yes_no(last_user_msg),
+            llm_service.aextract_slots(last_user_msg, fields)
+        )
+    elif classifies:
+        answer = await llm_service.aclassify_yes_no(last_user_msg)
+    elif fields:
+        extracted = await llm_service.aextract_slots(last_user_msg, fields)
+    return _decide(state, phase, answer, extracted)
+
+
+def _extra_fields(
+    state: RecruiterState,
+    phase: str,
+    question: Optional[str],
+    user_text: str
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Fields slot extraction looks for in a message: the unanswered questions
+    other than the pending one, and none for short replies, which answer one question.
+    """
+    if not settings.SLOT_FILLING_ENABLED or len(user_text.split()) < settings.SLOT_FILLING_MIN_WORDS:
+        return {}
+    fields = flow_table.slot_fields(state, phase)
+    fields.pop(flow_table.answer_field(phase, question), None)
+    return fields
+
+
+def _decide(state: RecruiterState, phase: str, answer: Any, extracted: StateUpdate) -> Tuple[Transition, StateUpdate]:
+    """
+    Pick the transition and build the update.
+
+    The pending answer is the classified (or typed) one; extracted fields
+    only fill the other questions. City answers get their
+    gazetteer-normalized fields next to the raw text.
+    """
+    transition = flow_table.decide(state, phase, answer)
+    update = {**extracted, **transition.update(answer)}
+    update.update(flow_table.normalize(update))
+    return transition, update
+
+
+def _route_update(transition: Transition, update: StateUpdate) -> StateUpdate:
+    """Graph update for a routed message: the stored answers and the node to run next."""
+    update = {**update, "next_node": transition.route}
+    if transition.starts_questions:
+        update["questions_started"] = True
+    return update
+
+
+def route_node(state: RecruiterState) -> StateUpdate:
     """
-    Route to next question based on current question and answer.
-    
+    Graph node routing the latest user message.
+
+    It writes the answer and ``next_node``, which the graph's conditional
+    edge follows; with nothing pending ``next_node`` is None and the turn ends.
+
     Args:
-        state: Current conversation state
-        
+        state: Current conversation graph state
+
     Returns:
-        Next question node to execute
+        Update with the answer fields and next_node
     """
-    current = state.get("current_question")
-    last_user_msg = state["messages"][-1]["content"]
-    
-    if current == "location":
-        # Store the answer
-        answer = llm_service.classify_yes_no(last_user_msg)
-        state["in_morocco"] = answer
-        
-        if answer:
-            return "question_city"
-        else:
-            return "question_plan_to_move"
-    
-    elif current == "city":
-        state["current_city"] = last_user_msg
-        return "question_preferred_cities"
-    
-    elif current == "plan_to_move":
-        state["plan_to_move"] = last_user_msg
-        return "question_preferred_cities"
-    
-    elif current == "preferred_cities":
-        state["preferred_cities"] = last_user_msg
-        return "question_call_center_experience"
-    
-    elif current == "call_center_experience":
-        answer = llm_service.classify_yes_no(last_user_msg)
-        state["has_call_center_experience"] = answer
-        
-        if answer:
-            return "question_experience_details"
-        else:
-            return "question_why_call_center"
-    
-    elif current == "experience_details":
-        state["experience_details"] = last_user_msg
-        return "question_salary_expectation"
-    
-    elif current == "why_call_center":
-        state["why_call_center"] = last_user_msg
-        return "question_salary_expectation"
-    
-    elif current == "salary_expectation":
-        state["salary_expectation"] = last_user_msg
-        return "question_previous_applications"
-    
-    elif current == "previous_applications":
-        state["previous_applications"] = last_user_msg
-        return "final_message"
-    
-    # Default to first question
-    return "question_preferred_cities"
\ No newline at end of file
+    phase = current_phase(state, state.get("questions_started", False))
+    if phase is None:
+        return {"next_node": None}
+    return _route_update(*flow_router(state, phase))
+
+
+async def aroute_node(state: RecruiterState) -> StateUpdate:
+    """
+    Async variant of route_node, used by graph.ainvoke.
+
+    Args:
+        state: Current conversation graph state
+
+    Returns:
+        Update with the answer fields and next_node
+    """
+    phase = current_phase(state, state.get("questions_started", False))
+    if phase is None:
+        return {"next_node": None}
+    return _route_update(*await aflow_router(state, phase))
@@ -0,0 +1,317 @@
+"""
+Admission control for outbound LLM requests.
+"""
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, Optional, Tuple
+from config.settings import settings
+
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# How often async waiters re-check for a free slot
+_ASYNC_POLL_SECONDS = 0.005
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a request is not admitted: breaker open or no capacity in time."""
+
+
+def is_transient_failure(error: BaseException) -> bool:
+    """
+    Decide whether an error should count against the circuit breaker.
+
+    Throttling (429), server errors (5xx), timeouts and connection errors
+    count. Client errors such as 400 are the request's fault, not the
+    provider's. Any other exception (a bug, a validation error, a
+    cassette miss) is not the provider's either, and is ignored.
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    # Client libraries are only imported once a request has failed
+    try:
+        import httpx
+        import openai
+    except ImportError:
+        return False
+    return isinstance(error, (httpx.TransportError, openai.APIConnectionError))
+
+
+class AdmissionController:
+    """
+    Process-wide gate in front of the LLM provider.
+
+    Every request needs a token from a bucket refilled at
+    ``rate_per_second`` (holding at most ``burst``) and one of
+    ``max_concurrent`` slots. Callers wait up to ``max_wait`` seconds (or
+    until their turn deadline) and are then rejected instead of piling up.
+
+    A circuit breaker opens after ``failure_threshold`` consecutive
+    transient failures and rejects everything immediately. After
+    ``reset_timeout`` seconds it lets one probe through: success closes it,
+    failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: int,
+        max_concurrent: int,
+        max_wait: float,
+        failure_threshold: int,
+        reset_timeout: float
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            rate_per_second: Sustained request rate (<= 0 disables the bucket)
+            burst: Bucket capacity
+            max_concurrent: Requests allowed in flight (<= 0 for no limit)
+            max_wait: Longest time a caller waits for admission
+            failure_threshold: Consecutive failures that open the breaker (<= 0 disables it)
+            reset_timeout: Seconds the breaker stays open before probing
+        """
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._cond = threading.Condition()
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._in_flight = 0
+        self._waiting = 0
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._stats = {
+            "admitted": 0,
+            "rejected_breaker": 0,
+            "rejected_timeout": 0,
+            "successes": 0,
+            "failures": 0,
+            "breaker_opened": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0
+        }
+
+    @contextmanager
+    def admit(self, deadline: Optional[float] = None) -> Iterator[None]:
+        """
+        Hold an admission for the enclosed request.
+
+        Args:
+            deadline: Monotonic deadline of the caller's turn, if any
+
+        Raises:
+            AdmissionRejected: If the breaker is open or no capacity freed up in time
+        """
+        probe = self._acquire(deadline)
+        failed: Optional[bool] = None
+        try:
+            yield
+            failed = False
+        except Exception as e:
+            failed = True if is_transient_failure(e) else None
+            raise
+        finally:
+            self._release(probe, failed)
+
+    @asynccontextmanager
+    async def aadmit(self, deadline: Optional[float] = None) -> AsyncIterator[None]:
+        """Async variant of admit; waiting never blocks the event loop."""
+        probe = await self._aacquire(deadline)
+        failed: Optional[bool] = None
+        try:
+            yield
+            failed = False
+        except Exception as e:
+            failed = True if is_transient_failure(e) else None
+            raise
+        finally:
+            self._release(probe, failed)
+
+    def _wait_limit(self, started: float, deadline: Optional[float]) -> float:
+        limit = started + self.max_wait
+        return limit if deadline is None else min(limit, deadline)
+
+    def _acquire(self, deadline: Optional[float]) -> bool:
+        """Block until admitted; returns whether this request is the breaker probe."""
+        started = time.monotonic()
+        limit = self._wait_limit(started, deadline)
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    admitted, probe, retry_after = self._try_acquire(now)
+                    if admitted:
+                        self._record_wait(now - started)
+                        return probe
+                    remaining = limit - now
+                    if remaining <= 0:
+                        self._reject_timeout()
+                    self._cond.wait(min(remaining, retry_after) if retry_after is not None else remaining)
+            finally:
+                self._waiting -= 1
+
+    async def _aacquire(self, deadline: Optional[float]) -> bool:
+        """Async variant of _acquire."""
+        started = time.monotonic()
+        limit = self._wait_limit(started, deadline)
+        with self._cond:
+            self._waiting += 1
+        try:
+            while True:
+                now = time.monotonic()
+                with self._cond:
+                    admitted, probe, retry_after = self._try_acquire(now)
+                    if admitted:
+                        self._record_wait(now - started)
+                        return probe
+                    remaining = limit - now
+                    if remaining <= 0:
+                        self._reject_timeout()
+                await asyncio.sleep(min(remaining, retry_after or _ASYNC_POLL_SECONDS))
+        finally:
+            with self._cond:
+                self._waiting -= 1
+
+    def _try_acquire(self, now: float) -> Tuple[bool, bool, Optional[float]]:
+        """
+        Take a token and a slot if both are free. Caller holds the lock.
+
+        Returns:
+            (admitted, is_probe, seconds until a token is due or None when waiting on a slot)
+
+        Raises:
+            AdmissionRejected: If the breaker rejects the request
+        """
+        probe = False
+        if self._state == OPEN:
+            if now - self._opened_at < self.reset_timeout:
+                self._stats["rejected_breaker"] += 1
+                raise AdmissionRejected("LLM circuit breaker is open")
+            self._state = HALF_OPEN
+        if self._state == HALF_OPEN:
+            if self._probe_in_flight:
+                self._stats["rejected_breaker"] += 1
+                raise AdmissionRejected("LLM circuit breaker is probing")
+            probe = True
+
+        if self.max_concurrent > 0 and self._in_flight >= self.max_concurrent:
+            return False, False, None
+
+        if self.rate_per_second > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_per_second)
+            self._refilled_at = now
+            if self._tokens < 1:
+                return False, False, (1 - self._tokens) / self.rate_per_second
+            self._tokens -= 1
+
+        self._in_flight += 1
+        self._probe_in_flight = self._probe_in_flight or probe
+        self._stats["admitted"] += 1
+        return True, probe, None
+
+    def _release(self, probe: bool, failed: Optional[bool]):
+        """
+        Free a slot and feed the outcome to the breaker.
+
+        Args:
+            probe: Whether the request was the breaker probe
+            failed: True for a transient failure, False for success, None when
+                the outcome says nothing about the provider (cancelled, 4xx)
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if probe:
+                self._probe_in_flight = False
+
+            if failed:
+                self._stats["failures"] += 1
+                self._consecutive_failures += 1
+                tripped = (
+                    self.failure_threshold > 0
+                    and self._consecutive_failures >= self.failure_threshold
+                )
+                if self._state == HALF_OPEN or (self._state == CLOSED and tripped):
+                    self._open()
+            elif failed is False:
+                self._stats["successes"] += 1
+                self._consecutive_failures = 0
+                if self._state == HALF_OPEN:
+                    self._state = CLOSED
+                    print("✅ LLM circuit breaker closed")
+
+            self._cond.notify_all()
+
+    def _open(self):
+        """Trip the breaker. Caller holds the lock."""
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._stats["breaker_opened"] += 1
+        print(f"⚠️ LLM circuit breaker opened after {self._consecutive_failures} consecutive failures")
+
+    def _record_wait(self, waited: float):
+        self._stats["wait_seconds_total"] += waited
+        self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+
+    def _reject_timeout(self):
+        self._stats["rejected_timeout"] += 1
+        raise AdmissionRejected("No LLM capacity freed up in time")
+
+    def get_stats(self) -> dict:
+        """
+        Get queue, wait and breaker state.
+
+        Returns:
+            Dictionary with breaker state, in-flight and waiting requests,
+            available tokens, admission counters and wait times
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            now = time.monotonic()
+            stats.update({
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "tokens": round(min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_per_second), 2)
+                if self.rate_per_second > 0 else None,
+                "probe_in": round(max(0.0, self.reset_timeout - (now - self._opened_at)), 2)
+                if self._state == OPEN else None
+            })
+
+        stats["wait_seconds_avg"] = round(stats["wait_seconds_total"] / stats["admitted"], 4) if stats["admitted"] else 0.0
+        stats["wait_seconds_total"] = round(stats["wait_seconds_total"], 4)
+        stats["wait_seconds_max"] = round(stats["wait_seconds_max"], 4)
+        stats["limits"] = {
+            "rate_per_second": self.rate_per_second,
+            "burst": self.burst,
+            "max_concurrent": self.max_concurrent,
+            "max_wait_seconds": self.max_wait
+        }
+        return stats
+
+
+# Global instance
+admission_controller = AdmissionController(
+    rate_per_second=settings.LLM_RATE_LIMIT_PER_SECOND,
+    burst=settings.LLM_RATE_LIMIT_BURST,
+    max_concurrent=settings.LLM_MAX_CONCURRENT_REQUESTS,
+    max_wait=settings.LLM_ADMISSION_MAX_WAIT_SECONDS,
+    failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.LLM_BREAKER_RESET_SECONDS
+)
@@ -0,0 +1,222 @@
+"""
+Micro-batching for yes/no classification across concurrent sessions.
+"""
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.models.state import YesNoBatchResult, YesNoIntent
+from src.services.admission import AdmissionController
+
+
+YES_NO_BATCH_PROMPT = """
+You are a classifier. Each item below is a user's response to a yes/no question.
+Classify every item independently.
+
+Return ONLY JSON in this schema:
+{{
+  "results": [
+    {{"id": <item id>, "answer": true/false/null, "confidence": 0.0-1.0}}
+  ]
+}}
+
+Items:
+{items}
+"""
+
+
+class BatchClassifier:
+    """
+    Collect pending classifications for a few milliseconds and send them as one request.
+
+    Callers from any thread get a Future; async callers can await it with
+    ``asyncio.wrap_future``. A collector thread waits up to ``max_wait_ms``
+    after the first pending item (or until ``max_batch_size`` items are
+    queued), then hands the batch to a small pool that performs the LLM call
+    and resolves every waiting Future. Items missing from the model's reply,
+    or the whole batch on a parse failure, fall back to single calls. A
+    batch waits for admission until the latest deadline among its items.
+    """
+
+    def __init__(
+        self,
+        llm_getter: Callable,
+        classify_single: Callable[[str], Optional[YesNoIntent]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10,
+        max_concurrent_batches: int = 4,
+        admission: Optional[AdmissionController] = None,
+        record_usage: Optional[Callable[[str, Any], None]] = None
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            llm_getter: Returns the (max-token capped) chat model used for batched requests
+            classify_single: Single-item classifier used as fallback
+            max_batch_size: Maximum number of items per LLM request
+            max_wait_ms: Time to wait for more items after the first one
+            max_concurrent_batches: Batches allowed in flight at once
+            admission: Admission controller every batched request must pass
+            record_usage: Called with the prompt and response of each batched request
+        """
+        self.llm_getter = llm_getter
+        self.classify_single = classify_single
+        self.admission = admission
+        self.record_usage = record_usage
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_concurrent_batches = max_concurrent_batches
+        self._queue: "queue.Queue[Tuple[str, Optional[float], Future]]" = queue.Queue()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._collector: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "items": 0,
+            "batches": 0,
+            "llm_requests": 0,
+            "single_fallbacks": 0,
+            "parse_failures": 0
+        }
+
+    def submit(self, user_text: str, deadline: Optional[float] = None) -> Future:
+        """
+        Queue a classification.
+
+        Args:
+            user_text: The user's response text
+            deadline: Monotonic deadline of the caller's turn, if any
+
+        Returns:
+            Future resolving to the parsed intent (None if unparseable)
+        """
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((user_text, deadline, future))
+        return future
+
+    def _ensure_started(self):
+        """Start the collector thread and batch pool on first use."""
+        if self._collector is not None:
+            return
+        with self._start_lock:
+            if self._collector is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrent_batches,
+                    thread_name_prefix="yes-no-batch"
+                )
+                self._collector = threading.Thread(
+                    target=self._collect, name="yes-no-batch-collector", daemon=True
+                )
+                self._collector.start()
+
+    def _collect(self):
+        """Group queued items into batches and dispatch them."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: List[Tuple[str, Optional[float], Future]]):
+        """Classify a batch and resolve its futures."""
+        # Identical texts in the same batch are classified once
+        texts: List[str] = []
+        waiters: Dict[str, List[Future]] = {}
+        deadlines = [deadline for _, deadline, _ in batch]
+        # An item without a deadline lets the batch wait as long as admission allows
+        deadline = None if None in deadlines else max(deadlines)
+        for user_text, _, future in batch:
+            if user_text not in waiters:
+                texts.append(user_text)
+                waiters[user_text] = []
+            waiters[user_text].append(future)
+
+        self._count(items=len(batch), batches=1)
+
+        try:
+            if len(texts) == 1:
+                results = {texts[0]: self._classify_single(texts[0], fallback=False)}
+            else:
+                results = self._classify_batch(texts, deadline)
+        except Exception as e:
+            for futures in waiters.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+
+        for user_text, futures in waiters.items():
+            for future in futures:
+                future.set_result(results.get(user_text))
+
+    def _classify_batch(self, texts: List[str], deadline: Optional[float] = None) -> Dict[str, Optional[YesNoIntent]]:
+        """Send one multi-item request, falling back to single calls for gaps."""
+        items = "\n".join(json.dumps({"id": i, "text": text}, ensure_ascii=False) for i, text in enumerate(texts))
+        self._count(llm_requests=1)
+        prompt = YES_NO_BATCH_PROMPT.format(items=items)
+        if self.admission is not None:
+            with self.admission.admit(deadline):
+                res = self.llm_getter().invoke(prompt)
+        else:
+            res = self.llm_getter().invoke(prompt)
+        if self.record_usage is not None:
+            self.record_usage(prompt, res)
+
+        results: Dict[str, Optional[YesNoIntent]] = {}
+        try:
+            parsed = YesNoBatchResult(**json.loads(res.content))
+            for item in parsed.results:
+                if 0 <= item.id < len(texts):
+                    results[texts[item.id]] = YesNoIntent(
+                        answer=item.answer,
+                        confidence=item.confidence,
+                        reasoning="batched"
+                    )
+        except (json.JSONDecodeError, ValueError) as e:
+            print(f"Error parsing batched LLM response: {e}")
+            self._count(parse_failures=1)
+
+        for user_text in texts:
+            if user_text not in results:
+                results[user_text] = self._classify_single(user_text)
+        return results
+
+    def _classify_single(self, user_text: str, fallback: bool = True) -> Optional[YesNoIntent]:
+        """Classify one item with a regular request."""
+        self._count(llm_requests=1, single_fallbacks=int(fallback))
+        return self.classify_single(user_text)
+
+    def _count(self, **increments: int):
+        """Add to the batching counters."""
+        with self._stats_lock:
+            for name, value in increments.items():
+                self._stats[name] += value
+
+    def get_stats(self) -> dict:
+        """
+        Get batching statistics.
+
+        Returns:
+            Dictionary with item/batch/request counters and average batch size
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        stats["pending"] = self._queue.qsize()
+        stats["avg_batch_size"] = round(stats["items"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["llm_requests_saved"] = stats["items"] - stats["llm_requests"]
+        stats["max_batch_size"] = self.max_batch_size
+        stats["max_wait_ms"] = self.max_wait * 1000
+        return stats
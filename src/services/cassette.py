@@ -0,0 +1,325 @@
+"""
+Record/replay cassettes for outbound LLM and Twilio calls.
+
+With CASSETTE_MODE=record every request is executed and its response is
+appended to ``<CASSETTE_DIR>/<name>.jsonl`` together with its latency. With
+CASSETTE_MODE=replay responses are served from that file without touching
+the network, optionally sleeping for the recorded latency scaled by
+CASSETTE_LATENCY_SCALE.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+from config.settings import settings
+
+
+MODES = ("off", "record", "replay")
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class Cassette:
+    """Request-hash → response store for one outbound service."""
+
+    def __init__(
+        self,
+        name: str,
+        mode: Optional[str] = None,
+        directory: Optional[str] = None,
+        latency_scale: Optional[float] = None
+    ):
+        """
+        Initialize the cassette; recordings are loaded on first use.
+
+        Args:
+            name: Cassette name, also the file stem
+            mode: off, record or replay (defaults to CASSETTE_MODE)
+            directory: Folder holding cassette files (defaults to CASSETTE_DIR)
+            latency_scale: Multiplier for replayed latency, 0 disables sleeping
+                (defaults to CASSETTE_LATENCY_SCALE)
+        """
+        self.name = name
+        self.mode = (mode or settings.CASSETTE_MODE).lower()
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown cassette mode '{self.mode}', expected one of {MODES}")
+        self.path = os.path.join(directory or settings.CASSETTE_DIR, f"{name}.jsonl")
+        self.latency_scale = settings.CASSETTE_LATENCY_SCALE if latency_scale is None else latency_scale
+        self._entries: Optional[Dict[str, dict]] = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "recorded": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @staticmethod
+    def key(request: dict) -> str:
+        """Hash a JSON-serializable request."""
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def call(self, request: dict, fn: Callable[[], Any]) -> Any:
+        """
+        Run a request through the cassette.
+
+        Args:
+            request: JSON-serializable description of the request
+            fn: Performs the real request and returns a JSON-serializable response
+
+        Returns:
+            Recorded or live response
+
+        Raises:
+            CassetteMiss: In replay mode, if the request was never recorded
+        """
+        if self.mode == "replay":
+            entry = self._lookup(request)
+            if self.latency_scale > 0:
+                time.sleep(entry["latency_ms"] / 1000 * self.latency_scale)
+            return entry["response"]
+
+        started = time.perf_counter()
+        response = fn()
+        if self.mode == "record":
+            self.record(request, response, time.perf_counter() - started)
+        return response
+
+    async def acall(self, request: dict, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async variant of call.
+
+        Args:
+            request: JSON-serializable description of the request
+            fn: Factory for the real request's awaitable
+
+        Returns:
+            Recorded or live response
+        """
+        if self.mode == "replay":
+            entry = self._lookup(request)
+            if self.latency_scale > 0:
+                await asyncio.sleep(entry["latency_ms"] / 1000 * self.latency_scale)
+            return entry["response"]
+
+        started = time.perf_counter()
+        response = await fn()
+        if self.mode == "record":
+            self.record(request, response, time.perf_counter() - started)
+        return response
+
+    def stream(self, request: dict, fn: Callable[[], Iterator[str]]) -> Iterator[str]:
+        """
+        Run a streaming request through the cassette.
+
+        The recording holds the text seen until the stream was exhausted or
+        closed, so a replay stops at the same point as the original call.
+
+        Args:
+            request: JSON-serializable description of the request
+            fn: Starts the real stream and yields text pieces
+
+        Yields:
+            Text pieces
+        """
+        if self.mode == "replay":
+            entry = self._lookup(request)
+            if self.latency_scale > 0:
+                time.sleep(entry["latency_ms"] / 1000 * self.latency_scale)
+            yield from _pieces(entry["response"])
+            return
+
+        started = time.perf_counter()
+        pieces = []
+        source = fn()
+        try:
+            for piece in source:
+                pieces.append(piece)
+                yield piece
+        finally:
+            source.close()
+            if self.mode == "record":
+                self.record(request, "".join(pieces), time.perf_counter() - started)
+
+    async def astream(self, request: dict, fn: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Async variant of stream."""
+        if self.mode == "replay":
+            entry = self._lookup(request)
+            if self.latency_scale > 0:
+                await asyncio.sleep(entry["latency_ms"] / 1000 * self.latency_scale)
+            for piece in _pieces(entry["response"]):
+                yield piece
+            return
+
+        started = time.perf_counter()
+        pieces = []
+        source = fn()
+        try:
+            async for piece in source:
+                pieces.append(piece)
+                yield piece
+        finally:
+            await source.aclose()
+            if self.mode == "record":
+                self.record(request, "".join(pieces), time.perf_counter() - started)
+
+    def record(self, request: dict, response: Any, latency: float):
+        """
+        Store a response, replacing any earlier one for the same request.
+
+        Args:
+            request: JSON-serializable description of the request
+            response: JSON-serializable response
+            latency: Seconds the real request took
+        """
+        entry = {
+            "key": self.key(request),
+            "request": request,
+            "response": response,
+            "latency_ms": round(latency * 1000, 1),
+            "ts": time.time()
+        }
+        with self._lock:
+            self._load()
+            self._entries[entry["key"]] = entry
+            self._stats["recorded"] += 1
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _lookup(self, request: dict) -> dict:
+        """Find the recorded entry for a request."""
+        key = self.key(request)
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            self._stats["hits" if entry is not None else "misses"] += 1
+        if entry is None:
+            raise CassetteMiss(f"No recording in {self.path} for request {key}")
+        return entry
+
+    def _load(self):
+        """Read the cassette file once; later lines win. Caller holds the lock."""
+        if self._entries is not None:
+            return
+        self._entries = {}
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._entries[entry["key"]] = entry
+
+    def get_stats(self) -> dict:
+        """
+        Get cassette counters.
+
+        Returns:
+            Dictionary with mode, file path, entries and hit/miss/recorded counts
+        """
+        with self._lock:
+            self._load()
+            return {"mode": self.mode, "path": self.path, "entries": len(self._entries), **self._stats}
+
+
+def _pieces(text: str, size: int = 16) -> Iterator[str]:
+    """Split replayed text into stream-sized pieces."""
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+class CassetteLLM:
+    """
+    Chat model wrapper that routes invoke/stream calls through a cassette.
+
+    The real model is only built when a request actually goes to the
+    network, so replay runs need no API key.
+    """
+
+    def __init__(self, cassette: Cassette, factory: Callable[[], Any], bound: Optional[dict] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            cassette: Cassette holding the recordings
+            factory: Returns the real (possibly bound) chat model
+            bound: Keyword arguments bound to the model, part of the request key
+        """
+        self.cassette = cassette
+        self._factory = factory
+        self._bound = bound or {}
+
+    def bind(self, **kwargs) -> "CassetteLLM":
+        """Bind model keyword arguments, like Runnable.bind."""
+        return CassetteLLM(
+            self.cassette,
+            lambda: self._factory().bind(**kwargs),
+            {**self._bound, **kwargs}
+        )
+
+    def _request(self, prompt: str) -> dict:
+        return {"model": settings.MODEL_NAME, "prompt": prompt, **self._bound}
+
+    def invoke(self, prompt: str):
+        from langchain_core.messages import AIMessage
+
+        content = self.cassette.call(self._request(prompt), lambda: self._factory().invoke(prompt).content)
+        return AIMessage(content=content)
+
+    async def ainvoke(self, prompt: str):
+        from langchain_core.messages import AIMessage
+
+        async def live():
+            return (await self._factory().ainvoke(prompt)).content
+
+        content = await self.cassette.acall(self._request(prompt), live)
+        return AIMessage(content=content)
+
+    def stream(self, prompt: str):
+        from langchain_core.messages import AIMessageChunk
+
+        def live():
+            source = self._factory().stream(prompt)
+            try:
+                for chunk in source:
+                    yield chunk.content
+            finally:
+                source.close()
+
+        pieces = self.cassette.stream(self._request(prompt), live)
+        try:
+            for piece in pieces:
+                yield AIMessageChunk(content=piece)
+        finally:
+            pieces.close()
+
+    async def astream(self, prompt: str):
+        from langchain_core.messages import AIMessageChunk
+
+        async def live():
+            source = self._factory().astream(prompt)
+            try:
+                async for chunk in source:
+                    yield chunk.content
+            finally:
+                await source.aclose()
+
+        pieces = self.cassette.astream(self._request(prompt), live)
+        try:
+            async for piece in pieces:
+                yield AIMessageChunk(content=piece)
+        finally:
+            await pieces.aclose()
+
+
+# Global instances
+llm_cassette = Cassette("llm")
+twilio_cassette = Cassette("twilio")
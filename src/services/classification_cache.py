@@ -0,0 +1,394 @@
+"""
+Caches for yes/no classification and slot extraction results.
+"""
+import atexit
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# (answer, confidence) as returned by the LLM before thresholding
+CachedVerdict = Tuple[Optional[bool], float]
+
+
+class ClassificationCache:
+    """
+    Two-tier cache for classifier verdicts.
+
+    An in-process LRU bounded to ``max_entries`` sits in front of an optional
+    SQLite file. The SQLite tier survives restarts and is shared by every
+    worker process pointing at the same file. Entries expire after
+    ``ttl_seconds`` in both tiers.
+
+    Disk writes are taken off the request path: ``set`` only queues the
+    row, and a background thread commits the queue in one transaction every
+    ``flush_interval`` seconds. The same thread deletes expired rows and
+    the oldest rows beyond ``max_disk_entries`` every ``prune_interval``
+    seconds. Disk reads hold their own lock, never the one memory hits take.
+    """
+
+    def __init__(
+        self,
+        normalizer: Callable[[str], str],
+        namespace: str,
+        max_entries: int = 10000,
+        ttl_seconds: float = 86400,
+        db_path: Optional[str] = None,
+        flush_interval: float = 1.0,
+        max_disk_entries: Optional[int] = None,
+        prune_interval: float = 300
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            normalizer: Function applied to user text before keying
+            namespace: Prompt version, so prompt changes never reuse old verdicts
+            max_entries: Maximum number of entries kept in memory
+            ttl_seconds: Lifetime of an entry
+            db_path: SQLite file for the persistent tier (None disables it)
+            flush_interval: Seconds between commits of queued disk writes
+            max_disk_entries: Maximum number of rows kept on disk (None for no cap)
+            prune_interval: Seconds between deletions of expired and excess rows
+        """
+        self.normalizer = normalizer
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval = flush_interval
+        self.max_disk_entries = max_disk_entries
+        self.prune_interval = prune_interval
+        self._entries: "OrderedDict[str, Tuple[Optional[bool], float, float]]" = OrderedDict()
+        # Rows waiting for the next disk flush, by key
+        self._pending: Dict[str, Tuple[Optional[bool], float, float]] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "rows_flushed": 0,
+            "rows_pruned": 0
+        }
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS classification_cache ("
+                " key TEXT PRIMARY KEY,"
+                " answer INTEGER,"
+                " confidence REAL NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS classification_cache_created_at"
+                " ON classification_cache (created_at)"
+            )
+            self._db.commit()
+            self.prune()
+            self._thread = threading.Thread(target=self._run, name="classification-cache-flush", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def make_key(self, user_text: str) -> str:
+        """
+        Build the cache key for a piece of user text.
+
+        Args:
+            user_text: Raw user text
+
+        Returns:
+            Hex digest of the prompt version and normalized text
+        """
+        normalized = self.normalizer(user_text)
+        return hashlib.sha1(f"{self.namespace}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, user_text: str) -> Optional[CachedVerdict]:
+        """
+        Look up a cached verdict.
+
+        Args:
+            user_text: Raw user text
+
+        Returns:
+            (answer, confidence) or None on a miss
+        """
+        key = self.make_key(user_text)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                answer, confidence, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return answer, confidence
+                del self._entries[key]
+                self._stats["expirations"] += 1
+
+            # Evicted from memory before its disk write was flushed
+            entry = self._pending.get(key)
+            if entry is not None and now - entry[2] <= self.ttl_seconds:
+                self._store(key, *entry)
+                self._stats["memory_hits"] += 1
+                return entry[0], entry[1]
+
+        row = None
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT answer, confidence, created_at FROM classification_cache WHERE key = ?",
+                    (key,)
+                ).fetchone()
+
+        with self._lock:
+            if row is not None and now - row[2] <= self.ttl_seconds:
+                answer = None if row[0] is None else bool(row[0])
+                self._store(key, answer, row[1], row[2])
+                self._stats["disk_hits"] += 1
+                return answer, row[1]
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, user_text: str, answer: Optional[bool], confidence: float):
+        """
+        Store a verdict in memory and queue it for the disk tier.
+
+        Args:
+            user_text: Raw user text
+            answer: True/False/None as returned by the classifier
+            confidence: Classifier confidence
+        """
+        key = self.make_key(user_text)
+        now = time.time()
+
+        with self._lock:
+            self._store(key, answer, confidence, now)
+            if self._db is not None:
+                self._pending[key] = (answer, confidence, now)
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM classification_cache")
+                self._db.commit()
+
+    def flush(self):
+        """Commit the queued disk writes in one transaction."""
+        if self._db is None:
+            return
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return
+
+        rows = [
+            (key, None if answer is None else int(answer), confidence, created_at)
+            for key, (answer, confidence, created_at) in batch.items()
+        ]
+        try:
+            with self._db_lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO classification_cache (key, answer, confidence, created_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Error flushing {len(rows)} cached classifications: {e}")
+            with self._lock:
+                # Keep newer verdicts that arrived during the failed flush
+                for key, entry in batch.items():
+                    self._pending.setdefault(key, entry)
+            return
+
+        with self._lock:
+            self._stats["rows_flushed"] += len(rows)
+
+    def prune(self):
+        """Delete expired rows and the oldest rows beyond max_disk_entries from the disk tier."""
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                pruned = self._db.execute(
+                    "DELETE FROM classification_cache WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,)
+                ).rowcount
+                if self.max_disk_entries is not None:
+                    pruned += self._db.execute(
+                        "DELETE FROM classification_cache WHERE key IN ("
+                        " SELECT key FROM classification_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_disk_entries,)
+                    ).rowcount
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Error pruning the classification cache: {e}")
+            return
+
+        with self._lock:
+            self._stats["rows_pruned"] += pruned
+
+    def _run(self):
+        """Flush queued writes periodically and prune on a slower schedule until closed."""
+        next_prune = time.monotonic() + self.prune_interval
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+            if time.monotonic() >= next_prune:
+                self.prune()
+                next_prune = time.monotonic() + self.prune_interval
+
+    def close(self):
+        """Stop the flusher and commit what is left."""
+        if self._db is None or self._closed.is_set():
+            return
+        self._closed.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def _store(self, key: str, answer: Optional[bool], confidence: float, created_at: float):
+        """Insert into the in-memory LRU, evicting the oldest entries. Caller holds the lock."""
+        self._entries[key] = (answer, confidence, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get_stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss/eviction counters, size and hit rate
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["pending_writes"] = len(self._pending)
+
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        stats["max_entries"] = self.max_entries
+        stats["ttl_seconds"] = self.ttl_seconds
+        stats["persistent"] = self._db is not None
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class ExtractionCache:
+    """
+    In-process LRU for slot extraction results.
+
+    Keyed by the normalized message and the fields it was searched for,
+    since the same message asked for other fields gets another answer.
+    Entries expire after ``ttl_seconds``.
+    """
+
+    def __init__(
+        self,
+        normalizer: Callable[[str], str],
+        namespace: str,
+        max_entries: int = 10000,
+        ttl_seconds: float = 86400
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            normalizer: Function applied to user text before keying
+            namespace: Prompt version, so prompt changes never reuse old results
+            max_entries: Maximum number of entries kept
+            ttl_seconds: Lifetime of an entry
+        """
+        self.normalizer = normalizer
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def make_key(self, user_text: str, fields: Dict[str, Tuple[str, str]]) -> str:
+        """
+        Build the cache key for a message and the fields searched for.
+
+        Args:
+            user_text: Raw user text
+            fields: State field to (kind, question)
+
+        Returns:
+            Hex digest of the prompt version, fields and normalized text
+        """
+        spec = json.dumps(sorted(fields.items()), ensure_ascii=False)
+        normalized = self.normalizer(user_text)
+        return hashlib.sha1(f"{self.namespace}\x00{spec}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, user_text: str, fields: Dict[str, Tuple[str, str]]) -> Optional[Dict[str, Any]]:
+        """
+        Look up cached answers.
+
+        Args:
+            user_text: Raw user text
+            fields: State field to (kind, question)
+
+        Returns:
+            Copy of the extracted answers, or None on a miss
+        """
+        key = self.make_key(user_text, fields)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                answers, created_at = entry
+                if time.time() - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return dict(answers)
+                del self._entries[key]
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, user_text: str, fields: Dict[str, Tuple[str, str]], answers: Dict[str, Any]):
+        """
+        Store the answers of a successful extraction.
+
+        Args:
+            user_text: Raw user text
+            fields: State field to (kind, question)
+            answers: Extracted answers by state field
+        """
+        key = self.make_key(user_text, fields)
+        with self._lock:
+            self._entries[key] = (dict(answers), time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get_stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss/eviction counters and size
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        return stats
@@ -0,0 +1,117 @@
+"""
+Compressed tier for sessions evicted from memory.
+"""
+from typing import Dict, Iterator, Optional, Tuple
+import ormsgpack
+import zstandard
+from src.models.session_record import SessionRecord
+from src.services.session_snapshot import train_dictionary
+
+
+# Frames collected before a compression dictionary is trained on them
+_TRAIN_AFTER = 1024
+
+
+class ColdTier:
+    """
+    Evicted sessions kept as compressed frames.
+
+    A session is stored as zstd-compressed ormsgpack of its packed record,
+    a few hundred bytes instead of a live SessionRecord. Once enough
+    sessions have been evicted a dictionary is trained on them, which
+    shrinks each frame several times over. Not thread-safe; the owner
+    serializes access.
+    """
+
+    def __init__(self, level: int = 3):
+        """
+        Initialize an empty tier.
+
+        Args:
+            level: zstd compression level
+        """
+        self.level = level
+        # phone number -> (frame, created_at, last_activity)
+        self._frames: Dict[str, Tuple[bytes, float, float]] = {}
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+        self._trained = False
+        self._dictionary_bytes = 0
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __contains__(self, phone_number: str) -> bool:
+        return phone_number in self._frames
+
+    def put(self, phone_number: str, record: SessionRecord):
+        """
+        Store a session, replacing any previous copy.
+
+        Args:
+            phone_number: Session key
+            record: Packed record (its assistant must be checked in)
+        """
+        self.discard(phone_number)
+        frame = self._compressor.compress(ormsgpack.packb(record.to_snapshot()))
+        self._frames[phone_number] = (frame, record.created_at, record.last_activity)
+        self._bytes += len(frame)
+        if not self._trained and len(self._frames) >= _TRAIN_AFTER:
+            self._train()
+
+    def take(self, phone_number: str) -> Optional[SessionRecord]:
+        """
+        Remove a session and decode it.
+
+        Args:
+            phone_number: Session key
+
+        Returns:
+            SessionRecord, or None if the session is not in the tier
+        """
+        entry = self._frames.pop(phone_number, None)
+        if entry is None:
+            return None
+        self._bytes -= len(entry[0])
+        return self._decode(entry)
+
+    def discard(self, phone_number: str):
+        """Forget a session (deleted or expired)."""
+        entry = self._frames.pop(phone_number, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+    def records(self) -> Iterator[Tuple[str, SessionRecord]]:
+        """Yield (phone number, record) for every session, without removing them."""
+        for phone, entry in self._frames.items():
+            yield phone, self._decode(entry)
+
+    def _decode(self, entry: Tuple[bytes, float, float]) -> SessionRecord:
+        frame, created_at, last_activity = entry
+        return SessionRecord.from_snapshot(ormsgpack.unpackb(self._decompressor.decompress(frame)), created_at, last_activity)
+
+    def _train(self):
+        """Train a dictionary on the stored sessions and recompress them with it."""
+        self._trained = True
+        entries = {phone: (self._decompressor.decompress(frame), created_at, last_activity)
+                   for phone, (frame, created_at, last_activity) in self._frames.items()}
+        dict_data = train_dictionary([payload for payload, _, _ in entries.values()])
+        if dict_data is None:
+            return
+        dictionary = zstandard.ZstdCompressionDict(dict_data)
+        self._dictionary_bytes = len(dict_data)
+        self._compressor = zstandard.ZstdCompressor(level=self.level, dict_data=dictionary)
+        self._decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+        self._frames = {phone: (self._compressor.compress(payload), created_at, last_activity)
+                        for phone, (payload, created_at, last_activity) in entries.items()}
+        self._bytes = sum(len(frame) for frame, _, _ in self._frames.values())
+
+    def get_stats(self) -> dict:
+        """
+        Get tier size.
+
+        Returns:
+            Dictionary with sessions, compressed bytes and dictionary size (0 when untrained)
+        """
+        return {"sessions": len(self._frames), "bytes": self._bytes, "dictionary_bytes": self._dictionary_bytes}
@@ -0,0 +1,265 @@
+"""
+Distilled yes/no classifier trained from logged LLM decisions.
+
+A multinomial logistic regression over hashed character n-grams, trained
+with NumPy on the (user_text, answer, confidence) records LLMService writes
+to CLASSIFIER_DECISION_LOG_PATH. Scoring a message is a sum of a few dozen
+weight rows, so it runs in microseconds on CPU.
+"""
+import json
+import zlib
+from typing import Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+
+# Class order of the model outputs
+LABELS: Tuple[Optional[bool], ...] = (False, True, None)
+
+NGRAM_RANGE = (1, 4)
+DEFAULT_DIM = 2 ** 18
+
+
+def label_index(answer: Optional[bool], confidence: float, threshold: float) -> int:
+    """
+    Map an LLM verdict to a class index.
+
+    Verdicts below the acceptance threshold were treated as unclear by the
+    conversation flow, so they are learned as unclear too.
+    """
+    if answer is None or confidence < threshold:
+        return LABELS.index(None)
+    return LABELS.index(answer)
+
+
+def featurize(texts: Sequence[str], dim: int, normalizer) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash character n-grams of each text into feature indices.
+
+    Args:
+        texts: Raw user texts
+        dim: Number of hash buckets
+        normalizer: Text normalizer shared with the rest of the classifier
+
+    Returns:
+        (indices, offsets) in CSR layout: text i uses indices[offsets[i]:offsets[i + 1]]
+    """
+    indices: List[int] = []
+    offsets = [0]
+    low, high = NGRAM_RANGE
+    for text in texts:
+        padded = f" {normalizer(text)} "
+        grams = {
+            padded[start:start + n]
+            for n in range(low, high + 1)
+            for start in range(len(padded) - n + 1)
+        }
+        indices.extend(zlib.crc32(gram.encode("utf-8")) % dim for gram in grams)
+        offsets.append(len(indices))
+    return np.asarray(indices, dtype=np.int64), np.asarray(offsets, dtype=np.int64)
+
+
+def _logits(weights: np.ndarray, bias: np.ndarray, indices: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Sum weight rows per text (vectorized sparse-dense product)."""
+    rows = weights[indices]
+    sums = np.add.reduceat(rows, offsets[:-1], axis=0) if len(rows) else np.zeros((len(offsets) - 1, len(bias)))
+    # reduceat returns the next row for empty segments; zero them out
+    empty = offsets[1:] == offsets[:-1]
+    sums[empty] = 0.0
+    return sums + bias
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class DistilledClassifier:
+    """Compact local model that mimics the LLM's yes/no decisions."""
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: np.ndarray,
+        normalizer,
+        temperature: float = 1.0,
+        threshold: float = 0.9
+    ):
+        """
+        Initialize the model.
+
+        Args:
+            weights: (dim, 3) weight matrix
+            bias: (3,) bias vector
+            normalizer: Text normalizer used at training time
+            temperature: Calibration temperature applied to logits
+            threshold: Calibrated confidence below which callers escalate to the LLM
+        """
+        self.weights = weights
+        self.bias = bias
+        self.normalizer = normalizer
+        self.temperature = temperature
+        self.threshold = threshold
+
+    @property
+    def dim(self) -> int:
+        return self.weights.shape[0]
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Get calibrated class probabilities.
+
+        Args:
+            texts: Raw user texts
+
+        Returns:
+            (len(texts), 3) probabilities in LABELS order
+        """
+        indices, offsets = featurize(texts, self.dim, self.normalizer)
+        return _softmax(_logits(self.weights, self.bias, indices, offsets) / self.temperature)
+
+    def predict(self, user_text: str) -> Tuple[Optional[bool], float]:
+        """
+        Classify one text.
+
+        Args:
+            user_text: The user's response text
+
+        Returns:
+            (answer, calibrated confidence)
+        """
+        probs = self.predict_proba([user_text])[0]
+        best = int(probs.argmax())
+        return LABELS[best], float(probs[best])
+
+    @classmethod
+    def train(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[int],
+        normalizer,
+        dim: int = DEFAULT_DIM,
+        epochs: int = 200,
+        learning_rate: float = 0.05,
+        l2: float = 1e-6
+    ) -> "DistilledClassifier":
+        """
+        Fit the model with full-batch Adam on the softmax cross-entropy.
+
+        Args:
+            texts: Training texts
+            labels: Class indices (see LABELS)
+            normalizer: Text normalizer
+            dim: Number of hash buckets
+            epochs: Optimization steps
+            learning_rate: Adam step size
+            l2: L2 penalty on the weights
+
+        Returns:
+            Trained (uncalibrated) classifier
+        """
+        indices, offsets = featurize(texts, dim, normalizer)
+        counts = np.diff(offsets)
+        targets = np.zeros((len(texts), len(LABELS)))
+        targets[np.arange(len(texts)), np.asarray(labels)] = 1.0
+
+        weights = np.zeros((dim, len(LABELS)))
+        bias = np.zeros(len(LABELS))
+        moments = [np.zeros_like(weights), np.zeros_like(weights), np.zeros_like(bias), np.zeros_like(bias)]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+        for step in range(1, epochs + 1):
+            error = (_softmax(_logits(weights, bias, indices, offsets)) - targets) / len(texts)
+
+            grad_w = l2 * weights
+            np.add.at(grad_w, indices, np.repeat(error, counts, axis=0))
+            grad_b = error.sum(axis=0)
+
+            for param, grad, m, v in ((weights, grad_w, moments[0], moments[1]), (bias, grad_b, moments[2], moments[3])):
+                m *= beta1
+                m += (1 - beta1) * grad
+                v *= beta2
+                v += (1 - beta2) * grad ** 2
+                param -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+
+        return cls(weights, bias, normalizer)
+
+    def calibrate(self, texts: Sequence[str], labels: Sequence[int], target_agreement: float = 0.98):
+        """
+        Fit the temperature and the escalation threshold on held-out data.
+
+        The temperature minimizes held-out negative log-likelihood. The
+        threshold is the lowest confidence at which predictions at or above
+        it agree with the LLM at least ``target_agreement`` of the time. When
+        no confidence reaches that agreement the threshold is infinite, so
+        the model never answers and every text goes to the LLM.
+
+        Args:
+            texts: Held-out texts
+            labels: Held-out class indices
+            target_agreement: Required agreement with the LLM above the threshold
+        """
+        labels = np.asarray(labels)
+        indices, offsets = featurize(texts, self.dim, self.normalizer)
+        logits = _logits(self.weights, self.bias, indices, offsets)
+
+        best_nll = None
+        for temperature in np.linspace(0.25, 5.0, 39):
+            probs = _softmax(logits / temperature)
+            nll = -np.log(probs[np.arange(len(labels)), labels] + 1e-12).mean()
+            if best_nll is None or nll < best_nll:
+                best_nll, self.temperature = nll, float(temperature)
+
+        probs = _softmax(logits / self.temperature)
+        confidence = probs.max(axis=1)
+        correct = probs.argmax(axis=1) == labels
+
+        self.threshold = float("inf")
+        for threshold in np.unique(confidence)[::-1]:
+            covered = confidence >= threshold
+            if correct[covered].mean() < target_agreement:
+                break
+            self.threshold = float(threshold)
+
+    def save(self, path: str):
+        """Write the model to an .npz file."""
+        np.savez_compressed(
+            path,
+            weights=self.weights.astype(np.float32),
+            bias=self.bias,
+            temperature=self.temperature,
+            threshold=self.threshold
+        )
+
+    @classmethod
+    def load(cls, path: str, normalizer) -> "DistilledClassifier":
+        """
+        Load a model written by save.
+
+        Args:
+            path: .npz file
+            normalizer: Text normalizer used at training time
+
+        Returns:
+            DistilledClassifier
+        """
+        data = np.load(path)
+        return cls(
+            weights=data["weights"],
+            bias=data["bias"],
+            normalizer=normalizer,
+            temperature=float(data["temperature"]),
+            threshold=float(data["threshold"])
+        )
+
+
+def read_decision_log(path: str) -> Iterable[dict]:
+    """Yield records from a JSONL decision log, skipping malformed lines."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record.get("text"), str) and "confidence" in record:
+                yield record
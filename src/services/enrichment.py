@@ -0,0 +1,228 @@
+"""
+Deferred enrichment of completed candidates' free-text answers.
+"""
+import json
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from src.models.state import EnrichmentBatchResult
+from src.services.admission import AdmissionController
+
+
+ENRICHMENT_PROMPT = """
+You normalize job candidates' questionnaire answers. For every candidate below return:
+- city: the city the candidate lives in now, by its usual English name, or null
+- move_date: when the candidate plans to move to Morocco, as YYYY-MM or YYYY, or null
+- salary_amount: expected monthly salary as a number, or null
+- salary_currency: ISO 4217 code of that salary (MAD when none is given), or null
+- employers: call centers or companies the candidate worked for or applied to
+
+Return ONLY JSON in this schema:
+{{
+  "results": [
+    {{"id": <candidate id>, "city": "...", "move_date": "...", "salary_amount": 0, "salary_currency": "...", "employers": ["..."]}}
+  ]
+}}
+
+Today is {today}.
+
+Candidates:
+{items}
+"""
+
+# (phone number, free-text answers, attempts so far)
+_Item = Tuple[str, Dict[str, str], int]
+
+
+class EnrichmentQueue:
+    """
+    Normalize completed candidates' answers in the background, many per LLM call.
+
+    Completed sessions are submitted from save_session and never wait on
+    the LLM: a collector thread gathers up to ``max_batch_size`` candidates,
+    or whatever arrived within ``max_wait_seconds`` of the first one, and
+    sends them as one request. Each result is handed to ``apply``. Failed
+    requests, and candidates missing from a reply, are retried after
+    ``retry_after_seconds`` up to ``max_attempts`` times.
+    """
+
+    def __init__(
+        self,
+        llm_getter: Callable,
+        apply: Callable[[str, Dict[str, Any]], None],
+        max_batch_size: int = 20,
+        max_wait_seconds: float = 30,
+        max_attempts: int = 3,
+        retry_after_seconds: float = 60,
+        admission: Optional[AdmissionController] = None,
+        record_usage: Optional[Callable[[str, Any], None]] = None
+    ):
+        """
+        Initialize the queue; the collector starts on the first submission.
+
+        Args:
+            llm_getter: Returns the chat model used for enrichment requests
+            apply: Called with (phone number, enrichment dict) for each result
+            max_batch_size: Maximum number of candidates per LLM request
+            max_wait_seconds: Time to wait for more candidates after the first one
+            max_attempts: Requests tried per candidate before giving up
+            retry_after_seconds: Delay before a failed candidate is queued again
+            admission: Admission controller every request must pass
+            record_usage: Called with the prompt and response of each request
+        """
+        self.llm_getter = llm_getter
+        self.apply = apply
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_seconds
+        self.max_attempts = max_attempts
+        self.retry_after = retry_after_seconds
+        self.admission = admission
+        self.record_usage = record_usage
+        self._queue: "queue.Queue[_Item]" = queue.Queue()
+        # Phone numbers queued, in flight or waiting for a retry
+        self._pending: Set[str] = set()
+        self._pending_lock = threading.Lock()
+        self._collector: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "items": 0,
+            "enriched": 0,
+            "batches": 0,
+            "llm_requests": 0,
+            "retries": 0,
+            "failed": 0,
+            "parse_failures": 0
+        }
+
+    def submit(self, phone_number: str, answers: Dict[str, str]) -> bool:
+        """
+        Queue a completed candidate for enrichment.
+
+        Args:
+            phone_number: Session key the result is applied to
+            answers: Free-text answers by state field
+
+        Returns:
+            False if the candidate was already pending
+        """
+        with self._pending_lock:
+            if phone_number in self._pending:
+                return False
+            self._pending.add(phone_number)
+        self._ensure_started()
+        self._count(submitted=1)
+        self._queue.put((phone_number, answers, 0))
+        return True
+
+    def _ensure_started(self):
+        """Start the collector thread on first use."""
+        if self._collector is not None:
+            return
+        with self._start_lock:
+            if self._collector is None:
+                self._collector = threading.Thread(target=self._collect, name="enrichment-collector", daemon=True)
+                self._collector.start()
+
+    def _collect(self):
+        """Group queued candidates into batches and enrich them."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._enrich(batch)
+            except Exception as e:
+                print(f"Error enriching {len(batch)} candidates: {e}")
+                self._retry(batch)
+
+    def _enrich(self, batch: List[_Item]):
+        """Send one request for a batch and apply every result it holds."""
+        self._count(items=len(batch), batches=1, llm_requests=1)
+        items = "\n".join(
+            json.dumps({"id": i, "answers": answers}, ensure_ascii=False)
+            for i, (_, answers, _) in enumerate(batch)
+        )
+        prompt = ENRICHMENT_PROMPT.format(today=time.strftime("%Y-%m-%d"), items=items)
+        if self.admission is not None:
+            with self.admission.admit():
+                res = self.llm_getter().invoke(prompt)
+        else:
+            res = self.llm_getter().invoke(prompt)
+        if self.record_usage is not None:
+            self.record_usage(prompt, res)
+
+        results: Dict[int, Dict[str, Any]] = {}
+        try:
+            parsed = EnrichmentBatchResult(**json.loads(res.content))
+            for item in parsed.results:
+                if 0 <= item.id < len(batch):
+                    results[item.id] = item.model_dump(exclude={"id"})
+        except (json.JSONDecodeError, ValueError, TypeError) as e:
+            print(f"Error parsing enrichment response: {e}")
+            self._count(parse_failures=1)
+
+        missing = []
+        for i, item in enumerate(batch):
+            if i not in results:
+                missing.append(item)
+                continue
+            try:
+                self.apply(item[0], results[i])
+                self._count(enriched=1)
+            except Exception as e:
+                print(f"Error applying enrichment for {item[0]}: {e}")
+                self._count(failed=1)
+            self._done(item[0])
+        self._retry(missing)
+
+    def _retry(self, items: List[_Item]):
+        """Queue candidates again after a delay, or give up on them."""
+        for phone_number, answers, attempts in items:
+            if attempts + 1 >= self.max_attempts:
+                self._count(failed=1)
+                self._done(phone_number)
+                continue
+            self._count(retries=1)
+            timer = threading.Timer(self.retry_after, self._queue.put, args=((phone_number, answers, attempts + 1),))
+            timer.daemon = True
+            timer.start()
+
+    def _done(self, phone_number: str):
+        with self._pending_lock:
+            self._pending.discard(phone_number)
+
+    def _count(self, **increments: int):
+        """Add to the enrichment counters."""
+        with self._stats_lock:
+            for name, value in increments.items():
+                self._stats[name] += value
+
+    def get_stats(self) -> dict:
+        """
+        Get enrichment statistics.
+
+        Returns:
+            Dictionary with candidate/batch/request counters, pending candidates
+            and average batch size
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._pending_lock:
+            stats["pending"] = len(self._pending)
+
+        stats["avg_batch_size"] = round(stats["items"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["max_batch_size"] = self.max_batch_size
+        stats["max_wait_seconds"] = self.max_wait
+        return stats
@@ -0,0 +1,100 @@
+"""
+Expiry index for idle sessions.
+"""
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Stale heap entries tolerated before the heap is rebuilt from live deadlines
+_COMPACT_SLACK = 1024
+
+
+class ExpiryIndex:
+    """
+    Min-heap of expiry deadlines with lazy deletion.
+
+    ``touch`` pushes a new (deadline, key) entry in O(log N) and records it
+    as the key's current deadline; older entries for the key become stale
+    and are skipped when they reach the top of the heap. The heap is
+    rebuilt once stale entries outnumber live ones, which keeps memory
+    bounded at O(N) and costs O(1) amortized per touch. Not thread-safe;
+    the owner serializes access.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._heap: List[Tuple[float, str]] = []
+        self._deadlines: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def touch(self, key: str, expires_at: float):
+        """
+        Set or move a key's deadline.
+
+        Args:
+            key: Session key
+            expires_at: Monotonic time after which the key is expired
+        """
+        self._deadlines[key] = expires_at
+        heapq.heappush(self._heap, (expires_at, key))
+        if len(self._heap) > 2 * len(self._deadlines) + _COMPACT_SLACK:
+            self._compact()
+
+    def touch_many(self, items: Iterable[Tuple[str, float]]):
+        """
+        Set many deadlines at once, rebuilding the heap in O(N).
+
+        Args:
+            items: (key, monotonic deadline) pairs
+        """
+        self._deadlines.update(items)
+        self._compact()
+
+    def remove(self, key: str):
+        """Forget a key; its heap entries become stale."""
+        self._deadlines.pop(key, None)
+
+    def deadline(self, key: str) -> Optional[float]:
+        """Get a key's current deadline, or None if it is not indexed."""
+        return self._deadlines.get(key)
+
+    def pop_expired(self, now: float, limit: int) -> List[str]:
+        """
+        Remove and return keys whose deadline has passed.
+
+        Args:
+            now: Current monotonic time
+            limit: Maximum heap entries to pop (stale ones included), bounding the work
+
+        Returns:
+            Expired keys, earliest deadline first
+        """
+        expired = []
+        for _ in range(limit):
+            if not self._heap or self._heap[0][0] > now:
+                break
+            expires_at, key = heapq.heappop(self._heap)
+            if self._deadlines.get(key) == expires_at:
+                del self._deadlines[key]
+                expired.append(key)
+        return expired
+
+    def next_deadline(self) -> Optional[float]:
+        """Get the earliest deadline in the heap (possibly stale), if any."""
+        return self._heap[0][0] if self._heap else None
+
+    def _compact(self):
+        """Rebuild the heap from live deadlines only."""
+        self._heap = [(expires_at, key) for key, expires_at in self._deadlines.items()]
+        heapq.heapify(self._heap)
+
+    def get_stats(self) -> dict:
+        """
+        Get index size.
+
+        Returns:
+            Dictionary with live keys and heap entries (live + stale)
+        """
+        return {"keys": len(self._deadlines), "heap_entries": len(self._heap)}
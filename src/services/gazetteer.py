@@ -0,0 +1,312 @@
+"""
+In-process gazetteer normalizing Moroccan city names in free-text answers.
+"""
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from src.services.llm_service import normalize_text
+from src.services.similarity_cache import char_trigrams
+
+
+# Canonical city name to the spellings candidates use (English, French,
+# Darija, Arabic); the canonical name itself always matches
+MOROCCAN_CITIES: Dict[str, Tuple[str, ...]] = {
+    "Casablanca": ("casa", "dar bida", "dar beida", "dar el beida", "dar al bayda", "الدار البيضاء", "البيضاء", "كازا", "كازابلانكا"),
+    "Rabat": ("rbat", "الرباط", "رباط"),
+    "Salé": ("sla", "سلا"),
+    "Temara": ("tmara", "تمارة"),
+    "Kenitra": ("knitra", "القنيطرة", "قنيطرة"),
+    "Mohammedia": ("mohamedia", "fedala", "المحمدية"),
+    "Marrakech": ("marrakesh", "marakech", "kech", "مراكش"),
+    "Fes": ("fez", "fès", "fas", "فاس"),
+    "Meknes": ("meknès", "mknes", "مكناس"),
+    "Tangier": ("tanger", "tangiers", "tanja", "طنجة"),
+    "Tetouan": ("tétouan", "tetuan", "titwan", "تطوان"),
+    "Agadir": ("أكادير", "اكادير"),
+    "Inezgane": ("إنزكان", "انزكان"),
+    "Oujda": ("ujda", "wjda", "وجدة"),
+    "Nador": ("الناظور", "ناظور"),
+    "Berkane": ("بركان",),
+    "Al Hoceima": ("hoceima", "el hoceima", "alhucemas", "الحسيمة"),
+    "El Jadida": ("jadida", "الجديدة"),
+    "Safi": ("asfi", "آسفي"),
+    "Essaouira": ("mogador", "swira", "الصويرة"),
+    "Beni Mellal": ("bni mellal", "بني ملال"),
+    "Khouribga": ("خريبكة",),
+    "Settat": ("سطات",),
+    "Berrechid": ("برشيد",),
+    "Khemisset": ("الخميسات",),
+    "Taza": ("تازة",),
+    "Ifrane": ("إفران",),
+    "Khenifra": ("خنيفرة",),
+    "Errachidia": ("rachidia", "الرشيدية"),
+    "Ouarzazate": ("ورزازات",),
+    "Larache": ("العرائش",),
+    "Ksar El Kebir": ("ksar kebir", "القصر الكبير"),
+    "Chefchaouen": ("chaouen", "chaouene", "شفشاون"),
+    "Sidi Kacem": ("سيدي قاسم",),
+    "Sidi Slimane": ("سيدي سليمان",),
+    "Youssoufia": ("اليوسفية",),
+    "Taroudant": ("تارودانت",),
+    "Tiznit": ("تيزنيت",),
+    "Guelmim": ("كلميم",),
+    "Laayoune": ("el aaiun", "layoune", "العيون"),
+    "Dakhla": ("الداخلة",),
+    "Fnideq": ("الفنيدق",),
+    "Martil": ("مرتيل",),
+    "Bouskoura": ("بوسكورة",),
+}
+
+# Aliases that are also everyday words ("la salle", "la casa de papel",
+# "safi" for "ok"); they only name a city in a city context
+COMMON_WORD_ALIASES = ("casa", "sale", "salle", "taza", "safi")
+# Words after which a common-word alias is read as a city ("I live in casa")
+LOCATION_WORDS = (
+    "in", "at", "from", "near", "to", "city", "a", "en", "dans", "vers", "ville",
+    "fi", "f", "mn", "men", "mdina", "في", "ف", "من", "ب", "مدينة"
+)
+# Words between the cities of a list ("casa ou rabat")
+LIST_CONNECTORS = ("and", "or", "et", "ou", "w", "o", "wla", "ola", "و", "او", "ولا")
+# Words excluding the city after them ("Rabat but not Fes", "sauf Casa")
+NEGATION_WORDS = (
+    "not", "no", "never", "except", "without", "pas", "sauf", "sans", "jamais",
+    "machi", "mashi", "ماشي", "ليس", "بلا", "ماعدا", "الا"
+)
+
+
+class Gazetteer:
+    """
+    City name index answering lookups without an LLM call.
+
+    Aliases are normalized like any user text and keyed without spaces, so
+    "dar bida" and "darbida" are the same key. A lookup first tries every
+    run of up to ``max_words`` words as an exact key; a word with no exact
+    match goes to a character trigram index, and the candidates sharing
+    enough trigrams are verified by edit distance, which tolerates one typo
+    in names of 5-8 characters and two in longer ones ("Rbat", "Marakch").
+    Words shorter than ``min_fuzzy_length`` only match exactly.
+
+    Aliases in ``common_words`` are ordinary words as well, so they only
+    count as the whole answer, after one of ``location_words``, or next to
+    another recognized city in a list.
+
+    A city with one of ``negation_words`` among the two words before it
+    (location words aside, and never past the previous city) is left out,
+    as is the rest of a list it starts: "not Rabat or Fes" names no city.
+    """
+
+    def __init__(
+        self,
+        cities: Dict[str, Iterable[str]],
+        normalizer: Callable[[str], str],
+        common_words: Iterable[str] = (),
+        location_words: Iterable[str] = (),
+        list_connectors: Iterable[str] = (),
+        negation_words: Iterable[str] = (),
+        min_fuzzy_length: int = 4,
+        min_dice: float = 0.5
+    ):
+        """
+        Build the index.
+
+        Args:
+            cities: Canonical city name to its other spellings
+            normalizer: Function applied to aliases and user text
+            common_words: Aliases that are also everyday words
+            location_words: Words introducing a city ("in", "à", "في")
+            list_connectors: Words joining cities in a list ("and", "ou", "و")
+            negation_words: Words excluding the city after them ("not", "sauf", "ماشي")
+            min_fuzzy_length: Shortest word looked up approximately
+            min_dice: Minimum trigram Dice similarity for a fuzzy candidate
+        """
+        self.normalizer = normalizer
+        self.min_fuzzy_length = min_fuzzy_length
+        self.min_dice = min_dice
+        self.common_words = frozenset(self.normalizer(word).replace(" ", "") for word in common_words)
+        self.location_words = frozenset(self.normalizer(word) for word in location_words)
+        self.list_connectors = frozenset(self.normalizer(word) for word in list_connectors)
+        self.negation_words = frozenset(self.normalizer(word) for word in negation_words)
+        self._exact: Dict[str, str] = {}
+        self._keys: List[str] = []
+        self._key_cities: List[str] = []
+        self._key_trigrams: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self.max_words = 1
+
+        for city, aliases in cities.items():
+            for alias in (city, *aliases):
+                words = self.normalizer(alias).split()
+                key = "".join(words)
+                if not key or key in self._exact:
+                    continue
+                self._exact[key] = city
+                self.max_words = max(self.max_words, len(words))
+                if self._max_edits(key):
+                    key_id = len(self._keys)
+                    self._keys.append(key)
+                    self._key_cities.append(city)
+                    trigrams = char_trigrams(key)
+                    self._key_trigrams.append(len(trigrams))
+                    for trigram in trigrams:
+                        self._postings[trigram].append(key_id)
+        self._postings = dict(self._postings)
+        self.cities = tuple(cities)
+
+    @staticmethod
+    def _max_edits(key: str) -> int:
+        """Typos tolerated in an alias: none up to 4 characters, one up to 8, then two."""
+        return 0 if len(key) <= 4 else 1 if len(key) <= 8 else 2
+
+    def parse(self, text: str) -> List[str]:
+        """
+        Get every city named in a free-text answer, in order of mention.
+
+        Args:
+            text: Raw answer, e.g. "casa, rbat or tanger"
+
+        Returns:
+            Canonical city names without duplicates (empty when none is
+            recognized), leaving out negated ones ("Rabat but not Fes")
+        """
+        words = self.normalizer(text).split()
+        # (city, first word, word after it, whether it is a common-word alias)
+        found: List[Tuple[str, int, int, bool]] = []
+        i = 0
+        while i < len(words):
+            city, used, key = self._match_at(words, i)
+            if city is None:
+                i += 1
+                continue
+            found.append((city, i, i + used, key in self.common_words))
+            i += used
+
+        cities: List[str] = []
+        negated = False
+        for n, (city, start, end, common) in enumerate(found):
+            negated = self._negated(words, found, n, negated)
+            if negated or (common and not self._city_context(words, found, n)):
+                continue
+            if city not in cities:
+                cities.append(city)
+        return cities
+
+    def match(self, text: str) -> Optional[str]:
+        """
+        Get the first city named in a free-text answer.
+
+        Args:
+            text: Raw answer, e.g. "I live in dar bida"
+
+        Returns:
+            Canonical city name, or None when none is recognized
+        """
+        cities = self.parse(text)
+        return cities[0] if cities else None
+
+    def _city_context(self, words: List[str], found: List[Tuple[str, int, int, bool]], n: int) -> bool:
+        """Whether the n-th match is the whole answer, follows a location word or sits in a list of cities."""
+        _, start, end, _ = found[n]
+        if start == 0 and end == len(words):
+            return True
+        if start > 0 and words[start - 1] in self.location_words:
+            return True
+        for other in (found[n - 1] if n > 0 else None, found[n + 1] if n + 1 < len(found) else None):
+            if other is None or other[3]:
+                continue
+            gap = words[min(end, other[2]):max(start, other[1])]
+            if all(word in self.list_connectors for word in gap):
+                return True
+        return False
+
+    def _negated(self, words: List[str], found: List[Tuple[str, int, int, bool]], n: int, previous: bool) -> bool:
+        """Whether the n-th match is negated, given whether the match before it was."""
+        _, start, _, _ = found[n]
+        gap = words[found[n - 1][2] if n > 0 else 0:start]
+        if any(word in self.negation_words for word in [word for word in gap if word not in self.location_words][-2:]):
+            return True
+        # "not Rabat or Fes": the negation carries through a plain list
+        return previous and bool(gap) and all(word in self.list_connectors for word in gap)
+
+    def _match_at(self, words: List[str], i: int) -> Tuple[Optional[str], int, Optional[str]]:
+        """
+        City starting at words[i], the number of words it spans and the
+        alias key it matched (None for a fuzzy match), longest exact match first.
+        """
+        for width in range(min(self.max_words, len(words) - i), 0, -1):
+            key = "".join(words[i:i + width])
+            city = self._exact.get(key)
+            if city is not None:
+                return city, width, key
+        word = words[i]
+        if word[0] == "و" and len(word) > 2:
+            # Arabic "and" is written attached to the next word
+            city, used, key = self._match_at([word[1:], *words[i + 1:i + self.max_words]], 0)
+            if city is not None:
+                return city, used, key
+        if len(word) < self.min_fuzzy_length:
+            return None, 1, None
+        return self._fuzzy(word), 1, None
+
+    def _fuzzy(self, word: str) -> Optional[str]:
+        """Closest alias within its typo allowance among those sharing enough trigrams."""
+        trigrams = char_trigrams(word)
+        shared: Dict[int, int] = defaultdict(int)
+        for trigram in trigrams:
+            for key_id in self._postings.get(trigram, ()):
+                shared[key_id] += 1
+
+        best: Optional[str] = None
+        best_distance = 3
+        for key_id, count in shared.items():
+            if 2 * count < self.min_dice * (len(trigrams) + self._key_trigrams[key_id]):
+                continue
+            key = self._keys[key_id]
+            limit = min(self._max_edits(key), best_distance - 1)
+            if abs(len(key) - len(word)) > limit:
+                continue
+            distance = _edit_distance(word, key, limit)
+            if distance <= limit:
+                best, best_distance = self._key_cities[key_id], distance
+        return best
+
+    def get_stats(self) -> dict:
+        """
+        Get index statistics.
+
+        Returns:
+            Dictionary with city, alias and trigram counts
+        """
+        return {
+            "cities": len(self.cities),
+            "aliases": len(self._exact),
+            "fuzzy_aliases": len(self._keys),
+            "trigrams": len(self._postings),
+            "max_words": self.max_words
+        }
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, or limit + 1 once every alignment exceeds limit."""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+# Global instance
+gazetteer = Gazetteer(
+    MOROCCAN_CITIES,
+    normalize_text,
+    common_words=COMMON_WORD_ALIASES,
+    location_words=LOCATION_WORDS,
+    list_connectors=LIST_CONNECTORS,
+    negation_words=NEGATION_WORDS
+)
@@ -0,0 +1,216 @@
+"""
+Hedged requests under a latency budget.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class BudgetExceeded(TimeoutError):
+    """Raised when no request answered before the turn's deadline."""
+
+
+class HedgedCaller:
+    """
+    Run a request with a backup ("hedge") request for slow tails.
+
+    If the primary request has not answered after ``hedge_after`` seconds, a
+    second request is started and whichever finishes first wins. Both are
+    bounded by the caller's deadline; when it passes, BudgetExceeded is
+    raised so the caller can degrade instead of failing. Outcomes are
+    counted as primary, hedge or timeout.
+
+    A blocking request cannot be cancelled, so the loser of a sync call
+    keeps its pool thread until the HTTP timeout. At most
+    ``max_hedges_in_flight`` hedges (sync or async) run at once; past that
+    the primary is awaited alone and the skipped hedge is counted.
+    """
+
+    def __init__(self, hedge_after: Optional[float], max_workers: int = 64, max_hedges_in_flight: int = 16):
+        """
+        Initialize the caller.
+
+        Args:
+            hedge_after: Seconds before starting the hedge (None or <= 0 disables hedging)
+            max_workers: Threads available to sync requests
+            max_hedges_in_flight: Hedges allowed to run at once
+        """
+        self.hedge_after = hedge_after if hedge_after and hedge_after > 0 else None
+        self.max_workers = max_workers
+        self.max_hedges_in_flight = max_hedges_in_flight
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._hedges_in_flight = 0
+        self._stats = {"primary": 0, "hedge": 0, "timeout": 0, "hedges_started": 0, "hedges_skipped": 0}
+
+    def call(self, primary: Callable[[], T], hedge: Callable[[], T], deadline: Optional[float] = None) -> T:
+        """
+        Run a blocking request with hedging.
+
+        Args:
+            primary: First request
+            hedge: Backup request started after hedge_after seconds
+            deadline: Monotonic deadline (None for no deadline)
+
+        Returns:
+            Result of the first request to succeed
+
+        Raises:
+            BudgetExceeded: If the deadline passed first
+        """
+        if self.hedge_after is None and deadline is None:
+            return primary()
+
+        executor = self._get_executor()
+        futures: List[Future] = [self._submit(executor, primary)]
+
+        done, _ = wait(futures, timeout=self._first_wait(deadline))
+        if not done and self.hedge_after is not None and not self._expired(deadline) and self._start_hedge():
+            future = self._submit(executor, hedge)
+            future.add_done_callback(lambda _: self._finish_hedge())
+            futures.append(future)
+
+        pending = set(futures)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, timeout=self._remaining(deadline), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    self._count("primary" if future is futures[0] else "hedge")
+                    return future.result()
+                error = error or future.exception()
+
+        if pending:
+            self._count("timeout")
+            raise BudgetExceeded("Turn budget exhausted before the LLM answered")
+        raise error
+
+    async def acall(
+        self,
+        primary: Callable[[], Awaitable[T]],
+        hedge: Callable[[], Awaitable[T]],
+        deadline: Optional[float] = None
+    ) -> T:
+        """
+        Async variant of call; the losing request is cancelled.
+
+        Args:
+            primary: Factory for the first request
+            hedge: Factory for the backup request
+            deadline: Monotonic deadline (None for no deadline)
+
+        Returns:
+            Result of the first request to succeed
+
+        Raises:
+            BudgetExceeded: If the deadline passed first
+        """
+        if self.hedge_after is None and deadline is None:
+            return await primary()
+
+        primary_task = asyncio.ensure_future(primary())
+        tasks = [primary_task]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._first_wait(deadline))
+            if not done and self.hedge_after is not None and not self._expired(deadline) and self._start_hedge():
+                task = asyncio.ensure_future(hedge())
+                task.add_done_callback(lambda _: self._finish_hedge())
+                tasks.append(task)
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=self._remaining(deadline), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in done:
+                    if task.exception() is None:
+                        self._count("primary" if task is primary_task else "hedge")
+                        return task.result()
+                    error = error or task.exception()
+
+            if pending:
+                self._count("timeout")
+                raise BudgetExceeded("Turn budget exhausted before the LLM answered")
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _start_hedge(self) -> bool:
+        """Take a hedge slot; False (and counted as skipped) when all are in use."""
+        with self._lock:
+            if self._hedges_in_flight >= self.max_hedges_in_flight:
+                self._stats["hedges_skipped"] += 1
+                return False
+            self._hedges_in_flight += 1
+            self._stats["hedges_started"] += 1
+            return True
+
+    def _finish_hedge(self):
+        """Free the slot of a hedge that returned, failed or was cancelled."""
+        with self._lock:
+            self._hedges_in_flight -= 1
+
+    @staticmethod
+    def _submit(executor: ThreadPoolExecutor, fn: Callable[[], T]) -> Future:
+        """Run fn in the pool under a copy of the caller's context (turn labels, deadline)."""
+        return executor.submit(contextvars.copy_context().run, fn)
+
+    def _first_wait(self, deadline: Optional[float]) -> Optional[float]:
+        """Time to wait on the primary before deciding whether to hedge."""
+        remaining = self._remaining(deadline)
+        if self.hedge_after is None:
+            return remaining
+        if remaining is None:
+            return self.hedge_after
+        return min(self.hedge_after, remaining)
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        return max(0.0, deadline - time.monotonic())
+
+    @staticmethod
+    def _expired(deadline: Optional[float]) -> bool:
+        return deadline is not None and time.monotonic() >= deadline
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the request pool on first use."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="llm-hedge"
+                    )
+        return self._executor
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def get_stats(self) -> dict:
+        """
+        Get hedging outcome counters.
+
+        Returns:
+            Dictionary with primary/hedge/timeout counts, hedges started and
+            skipped, and hedges in flight
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["hedges_in_flight"] = self._hedges_in_flight
+        stats["hedge_after_seconds"] = self.hedge_after
+        stats["max_hedges_in_flight"] = self.max_hedges_in_flight
+        return stats
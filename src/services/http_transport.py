@@ -0,0 +1,242 @@
+"""
+Shared HTTP transport for the LLM and Twilio clients.
+"""
+import importlib.util
+import threading
+from typing import Optional
+import httpx
+from config.settings import settings
+
+
+class _TransportStats:
+    """Thread-safe request counters for one client."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def begin(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def end(self, failed: bool):
+        with self._lock:
+            self.in_flight -= 1
+            self.errors += int(failed)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight
+            }
+
+
+class _CountingTransport(httpx.HTTPTransport):
+    """httpx transport that records request counters."""
+
+    def __init__(self, stats: _TransportStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.begin()
+        failed = True
+        try:
+            response = super().handle_request(request)
+            failed = False
+            return response
+        finally:
+            self.stats.end(failed)
+
+
+class _CountingAsyncTransport(httpx.AsyncHTTPTransport):
+    """Async httpx transport that records request counters."""
+
+    def __init__(self, stats: _TransportStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.begin()
+        failed = True
+        try:
+            response = await super().handle_async_request(request)
+            failed = False
+            return response
+        finally:
+            self.stats.end(failed)
+
+
+def _pool_usage(transport) -> dict:
+    """Summarize the connections held by an httpx transport's pool."""
+    connections = list(getattr(getattr(transport, "_pool", None), "connections", []))
+    idle = sum(1 for conn in connections if conn.is_idle())
+    return {"connections": len(connections), "idle": idle, "active": len(connections) - idle}
+
+
+class HTTPTransport:
+    """
+    Lazily built HTTP clients shared by every outbound service.
+
+    Each client is created on first use with keep-alive pools sized from
+    settings, explicit connect/read timeouts and HTTP/2 when the ``h2``
+    package is available, then reused for every later request so steady
+    state traffic runs over warm connections.
+    """
+
+    def __init__(self):
+        """Initialize without creating any client."""
+        self._lock = threading.Lock()
+        self._httpx_client: Optional[httpx.Client] = None
+        self._httpx_async_client: Optional[httpx.AsyncClient] = None
+        self._twilio_http_client = None
+        self._twilio_async_http_client = None
+        self._stats = {
+            "llm": _TransportStats(),
+            "llm_async": _TransportStats(),
+            "twilio": _TransportStats()
+        }
+        self.http2 = settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        """Timeouts applied to every request."""
+        return httpx.Timeout(
+            settings.HTTP_READ_TIMEOUT,
+            connect=settings.HTTP_CONNECT_TIMEOUT,
+            pool=settings.HTTP_CONNECT_TIMEOUT
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        """Connection pool limits."""
+        return httpx.Limits(
+            max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        )
+
+    def httpx_client(self) -> httpx.Client:
+        """Get the shared sync httpx client (used by the LLM)."""
+        if self._httpx_client is None:
+            with self._lock:
+                if self._httpx_client is None:
+                    self._httpx_client = httpx.Client(
+                        timeout=self.timeout,
+                        transport=_CountingTransport(
+                            self._stats["llm"], http2=self.http2, limits=self.limits
+                        )
+                    )
+        return self._httpx_client
+
+    def httpx_async_client(self) -> httpx.AsyncClient:
+        """Get the shared async httpx client (used by the LLM)."""
+        if self._httpx_async_client is None:
+            with self._lock:
+                if self._httpx_async_client is None:
+                    self._httpx_async_client = httpx.AsyncClient(
+                        timeout=self.timeout,
+                        transport=_CountingAsyncTransport(
+                            self._stats["llm_async"], http2=self.http2, limits=self.limits
+                        )
+                    )
+        return self._httpx_async_client
+
+    def twilio_http_client(self):
+        """Get the shared Twilio HTTP client with a tuned requests pool."""
+        if self._twilio_http_client is None:
+            with self._lock:
+                if self._twilio_http_client is None:
+                    from requests.adapters import HTTPAdapter
+                    from twilio.http.http_client import TwilioHttpClient
+
+                    stats = self._stats["twilio"]
+
+                    class CountingAdapter(HTTPAdapter):
+                        def send(self, request, **kwargs):
+                            stats.begin()
+                            failed = True
+                            try:
+                                response = super().send(request, **kwargs)
+                                failed = False
+                                return response
+                            finally:
+                                stats.end(failed)
+
+                    client = TwilioHttpClient(
+                        pool_connections=True,
+                        timeout=settings.HTTP_READ_TIMEOUT
+                    )
+                    client.session.mount("https://", CountingAdapter(
+                        pool_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+                        pool_maxsize=settings.HTTP_POOL_MAX_CONNECTIONS
+                    ))
+                    self._twilio_http_client = client
+        return self._twilio_http_client
+
+    def twilio_async_http_client(self):
+        """
+        Get the shared async Twilio HTTP client.
+
+        Must be called from inside the running event loop; aiohttp binds its
+        session to it.
+        """
+        if self._twilio_async_http_client is None:
+            from aiohttp import ClientSession, ClientTimeout, TCPConnector
+            from twilio.http.async_http_client import AsyncTwilioHttpClient
+
+            client = AsyncTwilioHttpClient(pool_connections=False, timeout=settings.HTTP_READ_TIMEOUT)
+            client.session = ClientSession(
+                connector=TCPConnector(
+                    limit=settings.HTTP_POOL_MAX_CONNECTIONS,
+                    keepalive_timeout=settings.HTTP_KEEPALIVE_EXPIRY
+                ),
+                timeout=ClientTimeout(
+                    total=settings.HTTP_READ_TIMEOUT,
+                    connect=settings.HTTP_CONNECT_TIMEOUT
+                )
+            )
+            self._twilio_async_http_client = client
+        return self._twilio_async_http_client
+
+    def get_stats(self) -> dict:
+        """
+        Get request counters and pool utilization per client.
+
+        Returns:
+            Dictionary keyed by client name; clients not yet built report
+            ``initialized: False``
+        """
+        stats = {"http2": self.http2}
+
+        for name, client in (("llm", self._httpx_client), ("llm_async", self._httpx_async_client)):
+            entry = {"initialized": client is not None, **self._stats[name].as_dict()}
+            if client is not None:
+                entry["pool"] = _pool_usage(client._transport)
+                entry["pool"]["max_connections"] = settings.HTTP_POOL_MAX_CONNECTIONS
+            stats[name] = entry
+
+        twilio = {"initialized": self._twilio_http_client is not None, **self._stats["twilio"].as_dict()}
+        if self._twilio_http_client is not None:
+            adapter = self._twilio_http_client.session.get_adapter("https://")
+            pools = [adapter.poolmanager.pools[key] for key in adapter.poolmanager.pools.keys()]
+            twilio["pool"] = {
+                "hosts": len(pools),
+                "connections_opened": sum(pool.num_connections for pool in pools),
+                "max_connections": settings.HTTP_POOL_MAX_CONNECTIONS
+            }
+        stats["twilio"] = twilio
+        stats["twilio_async"] = {"initialized": self._twilio_async_http_client is not None}
+        return stats
+
+
+# Global instance
+http_transport = HTTPTransport()
@@ -1,63 +1,922 @@
 """
 LLM service for intent classification and text generation.
 """
+import asyncio
 import json
-from typing import Optional
-from langchain_openai import ChatOpenAI
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from config.settings import settings
-from src.models.state import YesNoIntent
+from src.models.state import SlotExtraction, StateUpdate, YesNoIntent
+from src.services.admission import AdmissionRejected, admission_controller, is_transient_failure
+from src.services.batch_classifier import BatchClassifier
+from src.services.cassette import CassetteLLM, llm_cassette
+from src.services.classification_cache import ClassificationCache, ExtractionCache
+from src.services.hedging import BudgetExceeded, HedgedCaller
+from src.services.similarity_cache import SimilarityCache
+from src.services.http_transport import http_transport
+from src.services.stream_parser import IncrementalIntentParser
+from src.services.token_budget import PromptBuilder, token_ledger
+from src.services.turn_context import turn_deadline
+
+
+# Bump whenever YES_NO_PROMPT changes so cached verdicts are not reused
+YES_NO_PROMPT_VERSION = "yes_no_v1"
+
+YES_NO_PROMPT = """
+You are a classifier. The user responded to a yes/no question.
+
+Return ONLY JSON in this schema:
+{{
+  "answer": true/false/null,
+  "confidence": 0.0-1.0,
+  "reasoning": "short explanation"
+}}
+
+User response: "{user_text}"
+"""
+
+# Bump whenever SLOT_FILLING_PROMPT changes so cached extractions are not reused
+SLOT_FILLING_PROMPT_VERSION = "slot_filling_v1"
+
+SLOT_FILLING_PROMPT = """
+You extract a job candidate's answers from their message.
+
+Fields (name, expected value: question it answers):
+{fields}
+
+Return ONLY JSON in this schema, with only the fields the message clearly answers:
+{{
+  "answers": {{"field_name": true/false for yes/no fields, a short text otherwise}}
+}}
+
+User message: "{user_text}"
+"""
+
+
+# ----------------------------
+# Local yes/no intent engine
+# ----------------------------
+
+_ARABIC_DIACRITICS = re.compile(r"[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]")
+_ARABIC_LETTER_MAP = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ى": "ي", "ئ": "ي", "ؤ": "و", "ة": "ه",
+    "؟": " ", "،": " ", "؛": " ",
+})
+_APOSTROPHES = re.compile(r"['’`´ʼ]")
+_NON_WORD = re.compile(r"[^\w\s]")
+_REPEATED_CHARS = re.compile(r"(.)\1+")
+
+_EMOJI_MODIFIERS = re.compile(r"[\U0001F3FB-\U0001F3FF\uFE0F\u200D]")
+_YES_EMOJI = {"👍", "✅", "👌", "✔", "☑", "🙆", "💯", "🆗", "🤝"}
+_NO_EMOJI = {"👎", "❌", "✖", "🚫", "🙅", "⛔"}
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize free text for lexicon lookups and cache keys.
+
+    Lowercases, strips Latin accents and Arabic diacritics, unifies Arabic
+    letter variants, drops apostrophes ("na'am" -> "naam", "d'accord" ->
+    "daccord"), turns punctuation into spaces and collapses repeated
+    characters ("yesss", "nooon", "ouiii").
+
+    Args:
+        text: Raw user text
+
+    Returns:
+        Normalized, whitespace-separated text
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _ARABIC_DIACRITICS.sub("", text).translate(_ARABIC_LETTER_MAP)
+    text = _APOSTROPHES.sub("", text)
+    text = _NON_WORD.sub(" ", text)
+    text = _REPEATED_CHARS.sub(r"\1", text)
+    return " ".join(text.split())
+
+
+def _lexicon(*phrases: str) -> frozenset:
+    """Build a lexicon normalized the same way as user input."""
+    return frozenset(normalize_text(p) for p in phrases)
+
+
+# Whole-message answers (after politeness words are stripped)
+_YES_PHRASES = _lexicon(
+    # English
+    "yes", "yeah", "yea", "yep", "yup", "ya", "y", "sure", "of course", "ok", "okay", "k",
+    "absolutely", "definitely", "certainly", "correct", "right", "indeed", "affirmative",
+    "go ahead", "why not", "no problem", "no worries", "i did", "i have", "i am", "i do",
+    "already did", "already booked", "done", "booked", "no doubt", "no doubt about it",
+    # French
+    "oui", "ouais", "ouai", "ouep", "bien sur", "bien sûr", "d'accord", "dac", "dacc",
+    "daccord", "exactement", "absolument", "evidemment", "tout à fait", "c'est fait", "c est fait",
+    "deja fait",
+    "pas de probleme", "pas de souci", "pas de soucis", "avec plaisir", "volontiers",
+    "je suis d'accord", "oui bien sûr",
+    # MSA Arabic
+    "نعم", "أجل", "بلى", "طبعا", "بالتأكيد", "موافق", "حسنا", "أكيد", "بالطبع",
+    # Darija (Arabic script)
+    "اه", "آه", "واه", "ايه", "إيه", "واخا", "صافي", "مزيان", "ماشي مشكل", "بلا مشكل",
+    # Arabizi
+    "naam", "n3am", "na3am", "ah", "aah", "iyeh", "eyeh", "ayeh", "wah", "waah",
+    "wakha", "wkha", "wakhha", "safi", "mzyan", "mezyan", "akid", "tab3an",
+    "machi mochkil", "mashi mushkil", "bla mochkil",
+)
+
+_NO_PHRASES = _lexicon(
+    # English
+    "no", "nope", "nah", "n", "not yet", "never", "negative", "not really", "no thanks",
+    "no thank you", "i didnt", "i did not", "i havent", "i have not", "i dont", "i do not",
+    "i am not", "im not", "not at all", "no way", "i dont think so", "haven't yet",
+    # French
+    "non", "nan", "pas encore", "pas du tout", "jamais", "non merci", "pas vraiment",
+    "je nai pas", "je ne pense pas", "pas pour l'instant", "pas maintenant", "non pas encore",
+    # MSA Arabic
+    "لا", "كلا", "ليس بعد", "أبدا", "لا شكرا", "لم أفعل",
+    # Darija (Arabic script)
+    "لالا", "لا لا", "والو", "باقي", "مازال", "ماشي دابا", "لا مازال",
+    # Arabizi
+    "la", "laa", "la2", "lala", "walo", "walou", "mazal", "mazal la", "ba9i",
+    "baqi", "machi daba", "mashi daba", "la mazal", "abadan",
+)
+
+# Leading single-word markers decide the answer when the rest of the message is consistent
+_YES_MARKERS = _lexicon(
+    "yes", "yeah", "yep", "yup", "sure", "absolutely", "definitely", "certainly", "correct",
+    "oui", "ouais", "absolument", "exactement", "evidemment",
+    "نعم", "أجل", "بلى", "طبعا", "بالتأكيد", "اه", "واه", "ايه", "واخا",
+    "naam", "n3am", "na3am", "iyeh", "eyeh", "wah", "wakha", "akid", "tab3an",
+)
+_NO_MARKERS = _lexicon(
+    "no", "nope", "nah", "never",
+    "non", "nan", "jamais",
+    "لا", "كلا", "لالا",
+    "la2", "walo", "walou",
+)
+# Idioms that start with a marker word but do not carry its polarity; checked
+# before the single-word markers: these read as a yes...
+_YES_IDIOMS = _lexicon("no doubt", "no problem", "no worries")
+# ...and these carry no answer at all, so the message goes to the LLM
+_UNCLEAR_IDIOMS = _lexicon("no idea", "no clue", "no comment", "never mind", "correct me")
+# Arabizi "la" is also the French article, so it only leads a no followed by one of these
+_LA_NEGATIONS = _lexicon("la2", "walo", "walou", "mazal", "ba9i", "baqi", "abadan")
+# Phrase words too common inside other sentences to show the opposite polarity
+_AMBIGUOUS_PHRASE_WORDS = _lexicon("la", "n", "y", "k", "ya", "ah")
+
+# Words that carry no intent and may surround an answer
+_FILLERS = _lexicon(
+    "please", "pls", "plz", "thanks", "thank you", "thx", "sir", "madam", "maam",
+    "merci", "svp", "stp", "monsieur", "madame",
+    "شكرا", "من فضلك", "الله يخليك", "عافاك",
+    "shukran", "choukran", "chokran", "afak", "3afak", "lah ykhalik", "allah ykhalik",
+    "hello", "hi", "bonjour", "salam", "salut", "السلام عليكم", "سلام",
+)
+
+# Tokens that make an otherwise clear answer ambiguous
+_NEGATIONS = _lexicon(
+    "not", "dont", "didnt", "havent", "hasnt", "wasnt", "isnt", "cant", "cannot", "wont",
+    "ne", "pas", "jamais", "aucun",
+    "ما", "ماشي", "مشي", "ليس", "لم", "لن",
+    "ma", "machi", "mashi", "mach",
+)
+_HEDGES = _lexicon(
+    "maybe", "perhaps", "probably", "unsure", "idk", "dunno", "think", "guess",
+    "peut-être", "peutetre", "peut", "etre", "sais", "sait", "probablement",
+    "ربما", "يمكن", "ممكن", "مايمكنش", "عرفت",
+    "rbma", "ymkn", "mmkn", "momkin", "3reft", "3rft", "ma3reft",
+    "but", "however", "mais", "sauf", "walakin", "lakin", "ولكن", "لكن", "غير",
+)
+
+_MAX_TOKENS_FOR_MARKER_RULE = 8
+
+
+def polarity_classes(normalized: str) -> FrozenSet[str]:
+    """
+    Get the polarity-bearing word classes in a normalized text.
+
+    Near-duplicate texts may only share a verdict when these match, so a
+    negation or hedge never gets lost between "similar" replies.
+    """
+    classes = set()
+    for token in normalized.split():
+        if token in _YES_MARKERS:
+            classes.add("yes")
+        if token in _NO_MARKERS:
+            classes.add("no")
+        if token in _NEGATIONS:
+            classes.add("negation")
+        if token in _HEDGES:
+            classes.add("hedge")
+    return frozenset(classes)
+
+
+class YesNoIntentEngine:
+    """
+    Local multilingual yes/no classifier.
+
+    Covers English, French, MSA Arabic, Darija and Arabizi replies, emoji-only
+    replies and simple negations. It only answers when the text is clearly
+    a yes or a no; anything else returns None so the caller can fall through
+    to the LLM.
+    """
+
+    EXACT_CONFIDENCE = 0.97
+    MARKER_CONFIDENCE = 0.9
+    EMOJI_CONFIDENCE = 0.9
+
+    def classify(self, user_text: str) -> Tuple[Optional[YesNoIntent], str]:
+        """
+        Classify a reply without calling the LLM.
+
+        Args:
+            user_text: The user's response text
+
+        Returns:
+            Tuple of (intent or None when undecided, path that decided it)
+        """
+        emoji_answer = self._classify_emoji(user_text)
+        tokens = self._strip_fillers(normalize_text(user_text).split())
+
+        if not tokens:
+            if emoji_answer is None:
+                return None, "undecided"
+            return self._intent(emoji_answer, self.EMOJI_CONFIDENCE, "emoji"), "emoji"
+
+        phrase = " ".join(tokens)
+        if phrase in _YES_PHRASES:
+            answer, confidence, path = True, self.EXACT_CONFIDENCE, "exact"
+        elif phrase in _NO_PHRASES:
+            answer, confidence, path = False, self.EXACT_CONFIDENCE, "exact"
+        else:
+            answer = self._classify_leading_marker(tokens)
+            confidence, path = self.MARKER_CONFIDENCE, "marker"
+
+        # Text and emoji disagreeing ("yes 👎") is left to the LLM
+        if answer is None or (emoji_answer is not None and emoji_answer != answer):
+            return None, "undecided"
+
+        return self._intent(answer, confidence, path), path
+
+    @staticmethod
+    def _classify_emoji(user_text: str) -> Optional[bool]:
+        """Return the answer carried by emoji, or None if absent or mixed."""
+        text = _EMOJI_MODIFIERS.sub("", user_text)
+        has_yes = any(ch in _YES_EMOJI for ch in text)
+        has_no = any(ch in _NO_EMOJI for ch in text)
+        if has_yes == has_no:
+            return None
+        return has_yes
+
+    @staticmethod
+    def _strip_fillers(tokens: List[str]) -> List[str]:
+        """Drop politeness words and greetings from both ends of the message."""
+        changed = True
+        while tokens and changed:
+            changed = False
+            for size in (3, 2, 1):
+                if len(tokens) < size:
+                    continue
+                if " ".join(tokens[:size]) in _FILLERS:
+                    tokens, changed = tokens[size:], True
+                    break
+                if " ".join(tokens[-size:]) in _FILLERS:
+                    tokens, changed = tokens[:-size], True
+                    break
+        return tokens
+
+    @staticmethod
+    def _classify_leading_marker(tokens: List[str]) -> Optional[bool]:
+        """
+        Decide from a leading yes/no word ("yes I did", "non, pas encore").
+        Leading idioms come first: "no doubt" is a yes, "no idea" no answer.
+
+        Returns None when the message is long, hedged, or the rest of it
+        contains a negation, marker or phrase of the opposite polarity
+        ("no, I have already booked it").
+        """
+        if len(tokens) > _MAX_TOKENS_FOR_MARKER_RULE:
+            return None
+
+        idiom = " ".join(tokens[:2])
+        if idiom in _UNCLEAR_IDIOMS:
+            return None
+        if idiom in _YES_IDIOMS:
+            answer, rest = True, tokens[2:]
+        elif tokens[0] in _YES_MARKERS:
+            answer, rest = True, tokens[1:]
+        elif tokens[0] in _NO_MARKERS:
+            answer, rest = False, tokens[1:]
+        elif tokens[0] == "la" and len(tokens) > 1 and tokens[1] in _LA_NEGATIONS:
+            answer, rest = False, tokens[2:]
+        else:
+            return None
+
+        if any(token in _HEDGES for token in rest):
+            return None
+        if answer and (
+            any(token in _NEGATIONS or token in _NO_MARKERS for token in rest)
+            or YesNoIntentEngine._contains_phrase(rest, _NO_PHRASES)
+        ):
+            return None
+        if not answer and (
+            any(token in _YES_MARKERS for token in rest)
+            or YesNoIntentEngine._contains_phrase(rest, _YES_PHRASES)
+        ):
+            return None
+        return answer
+
+    @staticmethod
+    def _contains_phrase(tokens: List[str], phrases: frozenset) -> bool:
+        """Whether any run of up to three tokens is one of the phrases."""
+        for size in (3, 2, 1):
+            for i in range(len(tokens) - size + 1):
+                phrase = " ".join(tokens[i:i + size])
+                if phrase in phrases and phrase not in _AMBIGUOUS_PHRASE_WORDS:
+                    return True
+        return False
+
+    @staticmethod
+    def _intent(answer: bool, confidence: float, reason: str) -> YesNoIntent:
+        """Wrap a fast-path decision in the same model the LLM path validates."""
+        return YesNoIntent(answer=answer, confidence=confidence, reasoning=f"fast path: {reason}")
 
 
 class LLMService:
     """Service for interacting with the LLM."""
-    
+
     def __init__(self):
-        """Initialize the LLM client."""
-        self.llm = ChatOpenAI(
-            model=settings.MODEL_NAME,
-            api_key=settings.DEEPINFRA_API_KEY,
-            base_url=settings.DEEPINFRA_BASE_URL,
-            temperature=settings.TEMPERATURE
+        """Initialize the service; the LLM client is built on first use."""
+        self._llm = None
+        self._chat = None
+        self._llm_lock = threading.RLock()
+        self.intent_engine = YesNoIntentEngine()
+        self.cache = ClassificationCache(
+            normalizer=normalize_text,
+            namespace=YES_NO_PROMPT_VERSION,
+            max_entries=settings.CLASSIFIER_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.CLASSIFIER_CACHE_TTL_SECONDS,
+            db_path=settings.CLASSIFIER_CACHE_DB_PATH,
+            flush_interval=settings.CLASSIFIER_CACHE_FLUSH_INTERVAL_SECONDS,
+            max_disk_entries=settings.CLASSIFIER_CACHE_MAX_DISK_ENTRIES
+        )
+        self.slot_cache = ExtractionCache(
+            normalizer=normalize_text,
+            namespace=SLOT_FILLING_PROMPT_VERSION,
+            max_entries=settings.CLASSIFIER_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.CLASSIFIER_CACHE_TTL_SECONDS
         )
-    
+        self.similarity_cache: Optional[SimilarityCache] = None
+        if settings.SIMILARITY_CACHE_ENABLED:
+            self.similarity_cache = SimilarityCache(
+                normalizer=normalize_text,
+                polarity=polarity_classes,
+                threshold=settings.SIMILARITY_CACHE_THRESHOLD,
+                min_confidence=settings.SIMILARITY_CACHE_MIN_CONFIDENCE,
+                max_entries=settings.SIMILARITY_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.CLASSIFIER_CACHE_TTL_SECONDS
+            )
+        self.hedger = HedgedCaller(
+            hedge_after=settings.HEDGE_AFTER_SECONDS,
+            max_hedges_in_flight=settings.HEDGE_MAX_IN_FLIGHT
+        )
+        self.prompts = PromptBuilder(settings.TOKENIZER_ENCODING, settings.CLASSIFIER_MAX_INPUT_TOKENS)
+        self.batcher: Optional[BatchClassifier] = None
+        if settings.CLASSIFIER_BATCHING_ENABLED:
+            self.batcher = BatchClassifier(
+                llm_getter=lambda: self.classifier_llm,
+                classify_single=self._invoke_intent,
+                max_batch_size=settings.CLASSIFIER_BATCH_MAX_SIZE,
+                max_wait_ms=settings.CLASSIFIER_BATCH_MAX_WAIT_MS,
+                admission=admission_controller,
+                record_usage=lambda prompt, res: self._record_usage(
+                    prompt, res.content, getattr(res, "usage_metadata", None), route="batch"
+                )
+            )
+        self._distilled = None
+        self._distilled_loaded = False
+        self._decision_log_lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "exact": 0, "marker": 0, "emoji": 0, "cache": 0, "similar": 0, "distilled": 0, "llm": 0
+        }
+        self._stream_stats: Dict[str, int] = {"early_exit": 0, "full": 0}
+        self._slot_stats: Dict[str, int] = {"calls": 0, "cache": 0, "fields_filled": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+
     def classify_yes_no(self, user_text: str) -> Optional[bool]:
         """
         Classify user response as yes/no/unclear.
-        
+
+        Confident replies are answered by the local intent engine, repeated
+        replies by the classification cache; only the rest is sent to the LLM.
+
         Args:
             user_text: The user's response text
-            
+
         Returns:
             True for yes, False for no, None for unclear
         """
-        prompt = f"""
-You are a classifier. The user responded to a yes/no question.
+        hit, answer = self._classify_without_llm(user_text)
+        if hit:
+            return answer
 
-Return ONLY JSON in this schema:
-{{
-  "answer": true/false/null,
-  "confidence": 0.0-1.0,
-  "reasoning": "short explanation"
-}}
+        self._count("llm")
+        started = time.perf_counter()
+        parsed = self._request_intent(user_text)
+        self._log_decision(user_text, parsed, time.perf_counter() - started)
+        return self._remember(user_text, parsed)
 
-User response: "{user_text}"
-"""
-        
+    async def aclassify_yes_no(self, user_text: str) -> Optional[bool]:
+        """
+        Async variant of classify_yes_no built on ChatOpenAI.ainvoke.
+
+        Args:
+            user_text: The user's response text
+
+        Returns:
+            True for yes, False for no, None for unclear
+        """
+        hit, answer = self._classify_without_llm(user_text)
+        if hit:
+            return answer
+
+        self._count("llm")
+        started = time.perf_counter()
+        parsed = await self._arequest_intent(user_text)
+        self._log_decision(user_text, parsed, time.perf_counter() - started)
+        return self._remember(user_text, parsed)
+
+    def extract_slots(self, user_text: str, fields: Dict[str, Tuple[str, str]]) -> StateUpdate:
+        """
+        Extract every answer a message contains with one LLM call.
+
+        The call is hedged, admitted, capped at SLOT_FILLING_MAX_TOKENS and
+        bounded by the current turn's budget like a classification; when it
+        is skipped or the provider fails transiently nothing is extracted.
+        Successful extractions are cached by normalized text and fields.
+
+        Args:
+            user_text: The user's message
+            fields: State field to (kind, question) for the answers to look for,
+                kind being "yes_no" or "text"
+
+        Returns:
+            Extracted answers by state field (booleans for yes/no fields)
+        """
+        cached = self._cached_slots(user_text, fields)
+        if cached is not None:
+            return cached
+
+        prompt = self._slot_prompt(user_text, fields)
         try:
-            res = self.llm.invoke(prompt)
-            data = json.loads(res.content)
-            parsed = YesNoIntent(**data)
-            
-            # Only accept when confidence is high enough
-            if parsed.confidence < settings.CONFIDENCE_THRESHOLD:
-                return None
-            
-            return parsed.answer
-        
+            content = self.hedger.call(
+                lambda: self._invoke_slots(prompt), lambda: self._invoke_slots(prompt), turn_deadline()
+            )
+        except (BudgetExceeded, AdmissionRejected) as e:
+            print(f"Slot extraction skipped: {e}")
+            content = None
+        except Exception as e:
+            # Transient provider errors degrade the turn; admission already counted them
+            if not is_transient_failure(e):
+                raise
+            print(f"Slot extraction failed: {e}")
+            content = None
+        return self._parse_slots(user_text, content, fields)
+
+    async def aextract_slots(self, user_text: str, fields: Dict[str, Tuple[str, str]]) -> StateUpdate:
+        """
+        Async variant of extract_slots.
+
+        Args:
+            user_text: The user's message
+            fields: State field to (kind, question) for the answers to look for
+
+        Returns:
+            Extracted answers by state field
+        """
+        cached = self._cached_slots(user_text, fields)
+        if cached is not None:
+            return cached
+
+        prompt = self._slot_prompt(user_text, fields)
+        try:
+            content = await self.hedger.acall(
+                lambda: self._ainvoke_slots(prompt), lambda: self._ainvoke_slots(prompt), turn_deadline()
+            )
+        except (BudgetExceeded, AdmissionRejected) as e:
+            print(f"Slot extraction skipped: {e}")
+            content = None
+        except Exception as e:
+            # Transient provider errors degrade the turn; admission already counted them
+            if not is_transient_failure(e):
+                raise
+            print(f"Slot extraction failed: {e}")
+            content = None
+        return self._parse_slots(user_text, content, fields)
+
+    def _cached_slots(self, user_text: str, fields: Dict[str, Tuple[str, str]]) -> Optional[StateUpdate]:
+        """Answers of an earlier extraction of the same message and fields, if cached."""
+        answers = self.slot_cache.get(user_text, fields)
+        if answers is not None:
+            with self._stats_lock:
+                self._slot_stats["cache"] += 1
+                self._slot_stats["fields_filled"] += len(answers)
+        return answers
+
+    def _slot_prompt(self, user_text: str, fields: Dict[str, Tuple[str, str]]) -> str:
+        """Build the extraction prompt for the given fields."""
+        lines = "\n".join(
+            f"- {field} ({'true/false' if kind == 'yes_no' else 'text'}): {question}"
+            for field, (kind, question) in fields.items()
+        )
+        return SLOT_FILLING_PROMPT.format(fields=lines, user_text=self.prompts.fit(user_text))
+
+    def _invoke_slots(self, prompt: str) -> str:
+        """Send an extraction request through admission control."""
+        with admission_controller.admit(turn_deadline()):
+            res = self.slot_llm.invoke(prompt)
+        self._record_usage(prompt, res.content, getattr(res, "usage_metadata", None))
+        return res.content
+
+    async def _ainvoke_slots(self, prompt: str) -> str:
+        """Async variant of _invoke_slots."""
+        async with admission_controller.aadmit(turn_deadline()):
+            res = await self.slot_llm.ainvoke(prompt)
+        self._record_usage(prompt, res.content, getattr(res, "usage_metadata", None))
+        return res.content
+
+    def _parse_slots(self, user_text: str, content: Optional[str], fields: Dict[str, Tuple[str, str]]) -> StateUpdate:
+        """Keep the extracted answers that belong to a requested field and match its kind, and cache them."""
+        answers: StateUpdate = {}
+        if content is not None:
+            try:
+                extraction = SlotExtraction(**json.loads(content))
+            except (json.JSONDecodeError, ValueError, TypeError) as e:
+                print(f"Error parsing slot extraction: {e}")
+                content = None
+            else:
+                for field, value in extraction.answers.items():
+                    kind = fields[field][0] if field in fields else None
+                    if kind == "yes_no" and isinstance(value, bool):
+                        answers[field] = value
+                    elif kind == "text" and isinstance(value, (str, int, float)) and not isinstance(value, bool):
+                        if str(value).strip():
+                            answers[field] = str(value).strip()
+                self.slot_cache.set(user_text, fields, answers)
+
+        with self._stats_lock:
+            self._slot_stats["calls"] += 1
+            self._slot_stats["fields_filled"] += len(answers)
+            self._slot_stats["failed"] += content is None
+        return answers
+
+    def _classify_without_llm(self, user_text: str) -> Tuple[bool, Optional[bool]]:
+        """
+        Try the local intent engine, the exact and similarity caches, then
+        the distilled model when it is confident enough.
+
+        Args:
+            user_text: The user's response text
+
+        Returns:
+            Tuple of (whether an answer was found, the answer)
+        """
+        if settings.FAST_PATH_ENABLED:
+            intent, path = self.intent_engine.classify(user_text)
+            if intent is not None:
+                self._count(path)
+                return True, intent.answer
+
+        cached = self.cache.get(user_text)
+        if cached is not None:
+            self._count("cache")
+            return True, self._accept(*cached)
+
+        if self.similarity_cache is not None:
+            similar = self.similarity_cache.get(user_text)
+            if similar is not None:
+                self._count("similar")
+                return True, self._accept(*similar)
+
+        distilled = self.distilled
+        if distilled is not None:
+            answer, confidence = distilled.predict(user_text)
+            if confidence >= distilled.threshold:
+                self._count("distilled")
+                return True, answer
+
+        return False, None
+
+    @property
+    def distilled(self):
+        """Distilled local model, loaded on first use when configured."""
+        if not self._distilled_loaded:
+            with self._llm_lock:
+                if not self._distilled_loaded:
+                    path = settings.DISTILLED_MODEL_PATH
+                    if path and os.path.exists(path):
+                        from src.services.distilled_classifier import DistilledClassifier
+
+                        self._distilled = DistilledClassifier.load(path, normalize_text)
+                    self._distilled_loaded = True
+        return self._distilled
+
+    def _log_decision(self, user_text: str, parsed: Optional[YesNoIntent], latency: float):
+        """Append an LLM verdict to the decision log used to train the distilled model."""
+        if parsed is None or not settings.CLASSIFIER_DECISION_LOG_PATH:
+            return
+
+        record = {
+            "text": user_text,
+            "answer": parsed.answer,
+            "confidence": parsed.confidence,
+            "latency_ms": round(latency * 1000, 1),
+            "prompt_version": YES_NO_PROMPT_VERSION,
+            "ts": time.time()
+        }
+        with self._decision_log_lock:
+            with open(settings.CLASSIFIER_DECISION_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _remember(self, user_text: str, parsed: Optional[YesNoIntent]) -> Optional[bool]:
+        """Cache a parsed LLM verdict and apply the confidence threshold."""
+        if parsed is None:
+            return None
+
+        self.cache.set(user_text, parsed.answer, parsed.confidence)
+        if self.similarity_cache is not None:
+            self.similarity_cache.set(user_text, parsed.answer, parsed.confidence)
+        return self._accept(parsed.answer, parsed.confidence)
+
+    def _request_intent(self, user_text: str) -> Optional[YesNoIntent]:
+        """
+        Classify user response with a round trip to the LLM.
+
+        Goes through the micro-batcher when batching is enabled. The request
+        is hedged and bounded by the current turn's budget; when the budget
+        runs out the answer is treated as unclear.
+
+        Args:
+            user_text: The user's response text
+
+        Returns:
+            Parsed intent, or None if the response could not be parsed in time
+            or the provider failed transiently (429, 5xx, timeout, connection)
+        """
+        deadline = turn_deadline()
+        if self.batcher is not None:
+            primary = lambda: self.batcher.submit(self.prompts.fit(user_text), deadline).result()
+        else:
+            primary = lambda: self._invoke_intent(user_text)
+
+        try:
+            return self.hedger.call(primary, lambda: self._invoke_intent(user_text), deadline)
+        except (BudgetExceeded, AdmissionRejected) as e:
+            print(f"Classification skipped: {e}")
+            return None
+        except Exception as e:
+            # Transient provider errors degrade the turn; admission already counted them
+            if not is_transient_failure(e):
+                raise
+            print(f"Classification failed: {e}")
+            return None
+
+    async def _arequest_intent(self, user_text: str) -> Optional[YesNoIntent]:
+        """
+        Async variant of _request_intent.
+
+        Args:
+            user_text: The user's response text
+
+        Returns:
+            Parsed intent, or None if the response could not be parsed in time
+        """
+        deadline = turn_deadline()
+        if self.batcher is not None:
+            primary = lambda: asyncio.wrap_future(self.batcher.submit(self.prompts.fit(user_text), deadline))
+        else:
+            primary = lambda: self._ainvoke_intent(user_text)
+
+        try:
+            return await self.hedger.acall(primary, lambda: self._ainvoke_intent(user_text), deadline)
+        except (BudgetExceeded, AdmissionRejected) as e:
+            print(f"Classification skipped: {e}")
+            return None
+        except Exception as e:
+            # Transient provider errors degrade the turn; admission already counted them
+            if not is_transient_failure(e):
+                raise
+            print(f"Classification failed: {e}")
+            return None
+
+    def _invoke_intent(self, user_text: str) -> Optional[YesNoIntent]:
+        """Send a single-item classification request through admission control."""
+        prompt = self.prompts.build(YES_NO_PROMPT, user_text)
+        with admission_controller.admit(turn_deadline()):
+            if settings.CLASSIFIER_STREAMING_ENABLED:
+                return self._stream_intent(prompt)
+
+            res = self.classifier_llm.invoke(prompt)
+        self._record_usage(prompt, res.content, getattr(res, "usage_metadata", None))
+        return self._parse_intent(res.content)
+
+    async def _ainvoke_intent(self, user_text: str) -> Optional[YesNoIntent]:
+        """Async variant of _invoke_intent."""
+        prompt = self.prompts.build(YES_NO_PROMPT, user_text)
+        async with admission_controller.aadmit(turn_deadline()):
+            if settings.CLASSIFIER_STREAMING_ENABLED:
+                return await self._astream_intent(prompt)
+
+            res = await self.classifier_llm.ainvoke(prompt)
+        self._record_usage(prompt, res.content, getattr(res, "usage_metadata", None))
+        return self._parse_intent(res.content)
+
+    def _stream_intent(self, prompt: str) -> Optional[YesNoIntent]:
+        """
+        Stream the completion and stop once answer and confidence are known.
+
+        Closing the stream early cancels the HTTP response, so the reasoning
+        string is never generated in full.
+
+        Args:
+            prompt: Classifier prompt
+
+        Returns:
+            Parsed intent, or None if the response could not be parsed
+        """
+        parser = IncrementalIntentParser()
+        stream = self.classifier_llm.stream(prompt)
+        try:
+            for chunk in stream:
+                intent = parser.feed(chunk.content)
+                if intent is not None:
+                    self._count_stream("early_exit")
+                    return intent
+        finally:
+            stream.close()
+            self._record_usage(prompt, parser.text)
+
+        self._count_stream("full")
+        return self._parse_intent(parser.text)
+
+    async def _astream_intent(self, prompt: str) -> Optional[YesNoIntent]:
+        """Async variant of _stream_intent."""
+        parser = IncrementalIntentParser()
+        stream = self.classifier_llm.astream(prompt)
+        try:
+            async for chunk in stream:
+                intent = parser.feed(chunk.content)
+                if intent is not None:
+                    self._count_stream("early_exit")
+                    return intent
+        finally:
+            await stream.aclose()
+            self._record_usage(prompt, parser.text)
+
+        self._count_stream("full")
+        return self._parse_intent(parser.text)
+
+    @property
+    def llm(self):
+        """Chat model, created on first use over the shared HTTP transport."""
+        if self._llm is None:
+            with self._llm_lock:
+                if self._llm is None:
+                    if llm_cassette.enabled:
+                        self._llm = CassetteLLM(llm_cassette, self._chat_model)
+                    else:
+                        self._llm = self._chat_model()
+        return self._llm
+
+    def _chat_model(self):
+        """
+        Build the real chat model once.
+
+        Under a cassette this only runs when a request reaches the network,
+        so replayed runs need no API key.
+        """
+        with self._llm_lock:
+            if self._chat is None:
+                from langchain_openai import ChatOpenAI
+
+                self._chat = ChatOpenAI(
+                    model=settings.MODEL_NAME,
+                    api_key=settings.DEEPINFRA_API_KEY,
+                    base_url=settings.DEEPINFRA_BASE_URL,
+                    temperature=settings.TEMPERATURE,
+                    timeout=http_transport.timeout,
+                    http_client=http_transport.httpx_client(),
+                    http_async_client=http_transport.httpx_async_client()
+                )
+        return self._chat
+
+    @property
+    def classifier_llm(self):
+        """Chat model bound to the classifier's max-token cap."""
+        return self.llm.bind(max_tokens=settings.CLASSIFIER_MAX_TOKENS)
+
+    @property
+    def slot_llm(self):
+        """Chat model bound to the slot extraction max-token cap."""
+        return self.llm.bind(max_tokens=settings.SLOT_FILLING_MAX_TOKENS)
+
+    def record_usage(self, prompt: str, res, route: Optional[str] = None):
+        """
+        Record the tokens of an LLM call made outside this service.
+
+        Args:
+            prompt: Prompt sent
+            res: Chat model response
+            route: Route the call is attributed to
+        """
+        self._record_usage(prompt, res.content, getattr(res, "usage_metadata", None), route=route)
+
+    def _record_usage(
+        self,
+        prompt: str,
+        completion: str,
+        usage: Optional[dict] = None,
+        route: Optional[str] = None
+    ):
+        """
+        Record the tokens of one LLM call in the token ledger.
+
+        Provider-reported usage is preferred; streamed and replayed calls
+        carry none, so their tokens are counted locally.
+
+        Args:
+            prompt: Prompt sent
+            completion: Text received (possibly cut short by an early exit)
+            usage: LangChain usage_metadata, if any
+            route: Route override (defaults to the current turn's route)
+        """
+        if usage:
+            prompt_tokens, completion_tokens = usage["input_tokens"], usage["output_tokens"]
+        else:
+            prompt_tokens, completion_tokens = self.prompts.count(prompt), self.prompts.count(completion)
+        token_ledger.record(prompt_tokens, completion_tokens, route=route)
+
+    @staticmethod
+    def _parse_intent(content: str) -> Optional[YesNoIntent]:
+        """Parse the classifier JSON into a YesNoIntent."""
+        try:
+            data = json.loads(content)
+            return YesNoIntent(**data)
+
         except (json.JSONDecodeError, ValueError) as e:
             print(f"Error parsing LLM response: {e}")
             return None
 
+    @staticmethod
+    def _accept(answer: Optional[bool], confidence: float) -> Optional[bool]:
+        """Only accept an answer when confidence is high enough."""
+        if confidence < settings.CONFIDENCE_THRESHOLD:
+            return None
+        return answer
+
+    def _count(self, path: str):
+        """Increment the counter for the path that answered a classification."""
+        with self._stats_lock:
+            self._stats[path] = self._stats.get(path, 0) + 1
+
+    def _count_stream(self, outcome: str):
+        """Increment the counter for how a streamed classification ended."""
+        with self._stats_lock:
+            self._stream_stats[outcome] += 1
+
+    def get_stats(self) -> dict:
+        """
+        Get classification counters per path.
+
+        Returns:
+            Dictionary with per-path counts, LLM calls saved, the share of
+            classifications answered without the LLM and slot extraction counters
+        """
+        with self._stats_lock:
+            paths = dict(self._stats)
+            streaming = dict(self._stream_stats)
+            slots = dict(self._slot_stats)
+
+        total = sum(paths.values())
+        saved = total - paths.get("llm", 0)
+        stats = {
+            "paths": paths,
+            "total": total,
+            "llm_calls_saved": saved,
+            "llm_avoided_rate": round(saved / total, 4) if total else 0.0,
+            "streaming": streaming,
+            "slot_filling": slots
+        }
+        stats["hedging"] = self.hedger.get_stats()
+        stats["prompts"] = self.prompts.get_stats()
+        if self.batcher is not None:
+            stats["batching"] = self.batcher.get_stats()
+        return stats
+
 
 # Global instance
-llm_service = LLMService()
\ No newline at end of file
+llm_service = LLMService()
@@ -0,0 +1,173 @@
+"""
+Cross-process session leases for multi-worker deployments.
+"""
+import asyncio
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from src.services.session_store import LeaseRelease, SessionStore
+
+
+# How often a worker retries a lease held by another worker
+_RETRY_SECONDS = 0.02
+
+
+class SessionBusy(RuntimeError):
+    """Raised when another worker keeps a session past the lease wait."""
+
+
+class SessionLeases:
+    """
+    Per-phone leases that give one worker at a time the right to change a session.
+
+    A lease is claimed in the shared store before a turn and released by the
+    write-behind flush that commits the turn's state, in the same
+    transaction, so the next worker to claim it always reads what this one
+    wrote. Until then the owner re-enters its own lease without touching the
+    store. Leases lapse after ``ttl`` seconds, so a crashed worker cannot
+    block a conversation for longer than that.
+    """
+
+    def __init__(self, store: SessionStore, ttl: float = 60, wait: float = 15):
+        """
+        Initialize lease bookkeeping for this process.
+
+        Args:
+            store: Shared backend holding the lease table
+            ttl: Lease lifetime in seconds; must exceed a turn plus a flush interval
+            wait: Longest time a turn waits for another worker's lease
+        """
+        self.store = store
+        self.ttl = ttl
+        self.wait = wait
+        self._owner: Optional[str] = None
+        self._owner_pid: Optional[int] = None
+        # phone number -> (token, expires_at) of leases this process holds
+        self._held: Dict[str, Tuple[str, float]] = {}
+        self._active: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stats = {
+            "claims": 0,
+            "reentries": 0,
+            "contended": 0,
+            "busy": 0,
+            "released": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0
+        }
+
+    @property
+    def owner(self) -> str:
+        """Identity of this worker process, recomputed after a fork."""
+        pid = os.getpid()
+        if self._owner_pid != pid:
+            self._owner = f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}"
+            self._owner_pid = pid
+        return self._owner
+
+    def acquire(self, phone_number: str) -> Tuple[bool, Optional[int]]:
+        """
+        Hold a session's lease, waiting for another worker to release it.
+
+        Args:
+            phone_number: Session key
+
+        Returns:
+            (claimed from the store, stored version); the version is only
+            meaningful when the lease was claimed from the store
+
+        Raises:
+            SessionBusy: If the lease could not be claimed within ``wait`` seconds
+        """
+        if self._reenter(phone_number):
+            return False, None
+        started = time.monotonic()
+        while True:
+            result = self._try_claim(phone_number, started)
+            if result is not None:
+                return result
+            time.sleep(_RETRY_SECONDS)
+
+    async def aacquire(self, phone_number: str) -> Tuple[bool, Optional[int]]:
+        """Async variant of acquire; store round trips run in a worker thread."""
+        if self._reenter(phone_number):
+            return False, None
+        started = time.monotonic()
+        while True:
+            result = await asyncio.to_thread(self._try_claim, phone_number, started)
+            if result is not None:
+                return result
+            await asyncio.sleep(_RETRY_SECONDS)
+
+    def _reenter(self, phone_number: str) -> bool:
+        """Use a lease this process still holds with time to spare."""
+        with self._lock:
+            held = self._held.get(phone_number)
+            if held is None or held[1] - time.time() < self.ttl / 2:
+                return False
+            self._active[phone_number] += 1
+            self._stats["reentries"] += 1
+            return True
+
+    def _try_claim(self, phone_number: str, started: float) -> Optional[Tuple[bool, Optional[int]]]:
+        """One claim attempt; None means retry."""
+        token = uuid.uuid4().hex
+        expires_at = time.time() + self.ttl
+        claimed, version = self.store.claim_lease(phone_number, self.owner, token, expires_at)
+        waited = time.monotonic() - started
+
+        with self._lock:
+            if claimed:
+                self._held[phone_number] = (token, expires_at)
+                self._active[phone_number] += 1
+                self._stats["claims"] += 1
+                if waited >= _RETRY_SECONDS:
+                    self._stats["contended"] += 1
+                self._stats["wait_seconds_total"] += waited
+                self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+                return True, version
+            if waited >= self.wait:
+                self._stats["busy"] += 1
+                raise SessionBusy(f"Session {phone_number} is held by another worker")
+        return None
+
+    def finish(self, phone_number: str):
+        """End a turn; the lease is released by the next flush."""
+        with self._lock:
+            self._active[phone_number] -= 1
+            if self._active[phone_number] <= 0:
+                del self._active[phone_number]
+
+    def releasable(self) -> List[LeaseRelease]:
+        """
+        Hand over every held lease with no turn in progress.
+
+        Call before collecting the writes to flush: a turn ends after its
+        write is queued, so each returned lease's state is in that batch.
+
+        Returns:
+            (phone number, token) pairs to release in the flush transaction
+        """
+        with self._lock:
+            idle = [phone for phone in self._held if phone not in self._active]
+            releases = [(phone, self._held.pop(phone)[0]) for phone in idle]
+            self._stats["released"] += len(releases)
+        return releases
+
+    def get_stats(self) -> dict:
+        """
+        Get lease statistics.
+
+        Returns:
+            Dictionary with claim, re-entry, contention and wait counters
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({"owner": self.owner, "held": len(self._held), "active": len(self._active)})
+        stats["wait_seconds_total"] = round(stats["wait_seconds_total"], 4)
+        stats["wait_seconds_max"] = round(stats["wait_seconds_max"], 4)
+        return stats
@@ -1,18 +1,170 @@
 """
 Session manager for handling multiple user conversations.
 """
-from typing import Dict, Optional
-from datetime import datetime, timedelta
+import asyncio
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, Optional
+from datetime import datetime
 from src.main import RecruiterAssistant
+from src.models.session_record import SessionRecord
+from src.services.cold_tier import ColdTier
+from src.services.enrichment import EnrichmentQueue
+from src.services.expiry_index import ExpiryIndex
+from src.services.session_snapshot import SnapshotReader, write_snapshot
+from src.services.striped_lock import StripedLock
+from src.services.transcripts import transcript_log
 from config.settings import settings
 
 
 class SessionManager:
-    """Manage conversation sessions for multiple users."""
+    """
+    Registry of conversation sessions for every user.
+    
+    This is the one place sessions live: the webhooks, the admin endpoints
+    and scripts/initiate_conversation.py all go through it. At most
+    SESSION_MAX_RESIDENT sessions stay in memory; beyond that the least
+    recently used idle ones are evicted to a cold tier (the durable store
+    when SESSION_STORE_URL is set, compressed frames in a ColdTier
+    otherwise) and brought back on their next access.
+    
+    Idle sessions expire after SESSION_TIMEOUT_MINUTES. Expiry is tracked in
+    an ExpiryIndex, so a message costs O(log N) instead of a scan over every
+    session: an expired session is detected when it is accessed, and a
+    background sweeper frees the rest in bounded batches.
+    
+    With SESSION_STORE_URL set, the in-memory sessions are a hot tier over a
+    durable store: a session missing from memory is rehydrated from the store
+    on first access, and state changes are queued to a write-behind buffer
+    that commits them in batches, so a turn never waits on disk.
+    
+    Sessions are held as compact SessionRecords. The RecruiterAssistant is
+    rebuilt when a session is accessed and stays checked out until
+    save_session folds it back into the record.
+    
+    With SESSION_STORE_SHARED, several worker processes use the same store.
+    A turn runs inside ``lease``/``alease``: the worker claims the phone's
+    lease, drops its hot copy if another worker saved a newer version, and
+    hands the lease back when its write is flushed.
+    
+    A server process can also save every session to a binary snapshot when
+    it shuts down and restore it when it starts (``enable_snapshots``).
+    Restoring only reads the snapshot's index; each session is decoded on
+    first access.
+    
+    With ENRICHMENT_ENABLED, a session is queued for enrichment once its
+    questionnaire is completed; the normalized answers are written back into
+    its state in the background, never during a webhook.
+    """
     
     def __init__(self):
         """Initialize session storage."""
-        self.sessions: Dict[str, dict] = {}
+        # Resident sessions, least recently used first
+        self.sessions: "OrderedDict[str, SessionRecord]" = OrderedDict()
+        self.max_resident = settings.SESSION_MAX_RESIDENT
+        self.expiry = ExpiryIndex()
+        self.timeout_seconds = settings.SESSION_TIMEOUT_MINUTES * 60
+        self._lock = threading.RLock()
+        # Serializes turns per phone number; _lock only guards the maps
+        self.locks = StripedLock(settings.SESSION_LOCK_STRIPES)
+        self._sweeper: Optional[threading.Thread] = None
+        self._stats = {"expired_on_access": 0, "expired_by_sweeper": 0, "sweeps": 0, "rehydrated": 0, "stale_dropped": 0}
+        # Snapshot the process was restored from; holds sessions not accessed yet
+        self.snapshot: Optional[SnapshotReader] = None
+        self._last_snapshot: Optional[dict] = None
+        self._registry_stats = {"evicted": 0, "thawed": 0}
+        self.store = None
+        self.cold: Optional[ColdTier] = None
+        if settings.SESSION_STORE_URL:
+            from src.services.session_store import create_session_store
+            self.store = create_session_store(
+                settings.SESSION_STORE_URL,
+                flush_interval=settings.SESSION_STORE_FLUSH_INTERVAL_SECONDS,
+                batch_size=settings.SESSION_STORE_BATCH_SIZE,
+                shared=settings.SESSION_STORE_SHARED,
+                lease_ttl=settings.SESSION_LEASE_SECONDS,
+                lease_wait=settings.SESSION_LEASE_WAIT_SECONDS
+            )
+        else:
+            # Without a store, evicted sessions are kept compressed in memory
+            self.cold = ColdTier(settings.SESSION_SNAPSHOT_COMPRESSION_LEVEL)
+        # Event loop serving async turns (see bind_event_loop)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.enrichment: Optional[EnrichmentQueue] = None
+        if settings.ENRICHMENT_ENABLED:
+            from src.services.admission import admission_controller
+            from src.services.llm_service import llm_service
+            self.enrichment = EnrichmentQueue(
+                llm_getter=lambda: llm_service.llm.bind(max_tokens=settings.ENRICHMENT_MAX_TOKENS),
+                apply=self._apply_enrichment,
+                max_batch_size=settings.ENRICHMENT_BATCH_SIZE,
+                max_wait_seconds=settings.ENRICHMENT_MAX_WAIT_SECONDS,
+                max_attempts=settings.ENRICHMENT_MAX_ATTEMPTS,
+                retry_after_seconds=settings.ENRICHMENT_RETRY_SECONDS,
+                admission=admission_controller,
+                record_usage=lambda prompt, res: llm_service.record_usage(prompt, res, route="enrichment")
+            )
+    
+    @contextmanager
+    def lease(self, phone_number: str) -> Iterator[None]:
+        """
+        Hold a session exclusively for one turn.
+        
+        Turns for the same phone number run one at a time, in arrival order,
+        while other numbers proceed in parallel. With a shared store the
+        session is also leased from the other worker processes.
+        
+        Args:
+            phone_number: User's phone number
+            
+        Raises:
+            SessionBusy: If another worker keeps the session past SESSION_LEASE_WAIT_SECONDS
+        """
+        with self.locks.hold(phone_number):
+            leases = self.store.leases if self.store is not None else None
+            if leases is None:
+                yield
+                return
+            
+            claimed, version = leases.acquire(phone_number)
+            try:
+                if claimed:
+                    self._drop_if_stale(phone_number, version)
+                yield
+            finally:
+                leases.finish(phone_number)
+    
+    @asynccontextmanager
+    async def alease(self, phone_number: str) -> AsyncIterator[None]:
+        """Async variant of lease; waiting never blocks the event loop."""
+        async with self.locks.ahold(phone_number):
+            leases = self.store.leases if self.store is not None else None
+            if leases is None:
+                yield
+                return
+            
+            claimed, version = await leases.aacquire(phone_number)
+            try:
+                if claimed:
+                    self._drop_if_stale(phone_number, version)
+                yield
+            finally:
+                leases.finish(phone_number)
+    
+    def _drop_if_stale(self, phone_number: str, version: Optional[int]):
+        """Forget the hot copy of a session another worker has changed since."""
+        with self._lock:
+            record = self.sessions.get(phone_number)
+            if record is None or record.version == version or self.store.is_dirty(phone_number):
+                return
+            del self.sessions[phone_number]
+            self.expiry.remove(phone_number)
+            self._stats["stale_dropped"] += 1
     
     def get_or_create_session(self, phone_number: str, first_name: str = None) -> RecruiterAssistant:
         """
@@ -25,42 +177,241 @@ class SessionManager:
         Returns:
             RecruiterAssistant instance
         """
-        # Clean up expired sessions
-        self._cleanup_expired_sessions()
+        self._ensure_sweeper()
         
-        # Check if session exists
-        if phone_number in self.sessions:
-            session_data = self.sessions[phone_number]
-            session_data["last_activity"] = datetime.now()
-            return session_data["assistant"]
+        with self._lock:
+            # Check if session exists
+            record = self._live_session(phone_number)
+            if record is not None:
+                record.last_activity = time.time()
+                self.expiry.touch(phone_number, time.monotonic() + self.timeout_seconds)
+                return self._checkout(record)
         
         # Create new session
-        assistant = RecruiterAssistant(first_name or "there")
+        assistant = RecruiterAssistant(first_name or settings.DEFAULT_FIRST_NAME)
         assistant.start()
         
-        self.sessions[phone_number] = {
-            "assistant": assistant,
-            "created_at": datetime.now(),
-            "last_activity": datetime.now(),
-            "phone_number": phone_number
-        }
+        with self._lock:
+            record = SessionRecord(time.time())
+            record.assistant = assistant
+            self._add_session(phone_number, record)
+            self.save_session(phone_number)
         
         return assistant
     
+    def _add_session(self, phone_number: str, record: SessionRecord):
+        """Store a session and schedule its expiry. Caller holds the lock."""
+        self.sessions[phone_number] = record
+        self.sessions.move_to_end(phone_number)
+        idle = max(0.0, time.time() - record.last_activity)
+        self.expiry.touch(phone_number, time.monotonic() + self.timeout_seconds - idle)
+        self._evict(keep=phone_number)
+    
+    def _evict(self, keep: str):
+        """Move least recently used idle sessions out of memory until under the cap. Caller holds the lock."""
+        excess = len(self.sessions) - self.max_resident
+        if self.max_resident <= 0 or excess <= 0:
+            return
+        # A checked-out session is mid-turn; it stays until save_session
+        victims = []
+        for phone, record in self.sessions.items():
+            if record.assistant is None and phone != keep:
+                victims.append(phone)
+                if len(victims) == excess:
+                    break
+        for phone in victims:
+            record = self.sessions.pop(phone)
+            # With a store the session is already queued there; it stays scheduled for expiry
+            if self.cold is not None:
+                self.cold.put(phone, record)
+        self._registry_stats["evicted"] += len(victims)
+    
+    def _forget_cold(self, phone_number: str):
+        """Drop a session from the tiers outside memory. Caller holds the lock."""
+        if self.snapshot is not None:
+            self.snapshot.discard(phone_number)
+        if self.cold is not None:
+            self.cold.discard(phone_number)
+    
+    @staticmethod
+    def _checkout(record: SessionRecord) -> RecruiterAssistant:
+        """Get the record's assistant, rebuilding it if needed. Caller holds the lock."""
+        if record.assistant is None:
+            record.assistant = RecruiterAssistant.from_snapshot(record.unpack())
+        return record.assistant
+    
+    def _live_session(self, phone_number: str) -> Optional[SessionRecord]:
+        """Get a session's record, dropping it if it has expired. Caller holds the lock."""
+        record = self.sessions.get(phone_number)
+        if record is not None and self._expired(phone_number):
+            self._expire(phone_number)
+            record = None
+        elif record is not None:
+            self.sessions.move_to_end(phone_number)
+        
+        if record is None:
+            # With a shared store another worker may have kept the session alive
+            record = self._restore(phone_number) or self._thaw(phone_number) or self._rehydrate(phone_number)
+            if record is not None and self._expired(phone_number):
+                self._expire(phone_number)
+                record = None
+        return record
+    
+    def _expired(self, phone_number: str) -> bool:
+        deadline = self.expiry.deadline(phone_number)
+        return deadline is not None and deadline <= time.monotonic()
+    
+    def _expire(self, phone_number: str):
+        """Drop an expired session. Caller holds the lock."""
+        print(f"Cleaning up expired session for {phone_number}")
+        del self.sessions[phone_number]
+        self.expiry.remove(phone_number)
+        # A shared row is left for its next save to overwrite: deleting it
+        # could erase a turn another worker is committing
+        if self.store is not None and self.store.leases is None:
+            self.store.delete(phone_number)
+        self._stats["expired_on_access"] += 1
+    
+    def _restore(self, phone_number: str) -> Optional[SessionRecord]:
+        """Decode a session still pending in the startup snapshot. Caller holds the lock."""
+        if self.snapshot is None:
+            return None
+        record = self.snapshot.take(phone_number)
+        if record is not None:
+            self._add_session(phone_number, record)
+        return record
+    
+    def _thaw(self, phone_number: str) -> Optional[SessionRecord]:
+        """Bring an evicted session back from the cold tier. Caller holds the lock."""
+        if self.cold is None:
+            return None
+        record = self.cold.take(phone_number)
+        if record is not None:
+            self._add_session(phone_number, record)
+            self._registry_stats["thawed"] += 1
+        return record
+    
+    def _rehydrate(self, phone_number: str) -> Optional[SessionRecord]:
+        """Load a session from the durable store into memory. Caller holds the lock."""
+        if self.store is None:
+            return None
+        row = self.store.load(phone_number)
+        if row is None:
+            return None
+        
+        record = SessionRecord.from_snapshot(json.loads(row["snapshot"]), row["created_at"], row["last_activity"])
+        record.version = row["version"]
+        self._add_session(phone_number, record)
+        self._stats["rehydrated"] += 1
+        return record
+    
+    def save_session(self, phone_number: str):
+        """
+        Fold a session's assistant back into its compact record.
+        
+        Call after each turn. The turn's messages go to the transcript and
+        only the last SESSION_HISTORY_MESSAGES stay in memory. With a durable
+        store the record is also queued for the write-behind buffer, and a
+        newly completed session is queued for enrichment.
+        
+        Args:
+            phone_number: User's phone number
+        """
+        with self._lock:
+            record = self.sessions.get(phone_number)
+            if record is None:
+                return
+            if record.assistant is not None:
+                messages, log = record.assistant.spill_history(
+                    settings.SESSION_HISTORY_MESSAGES, settings.SESSION_HISTORY_LOG
+                )
+                transcript_log.append(phone_number, messages, log)
+                record.pack(record.assistant.to_snapshot())
+                record.assistant = None
+                if self.enrichment is not None and record.enrichment is None and record.is_completed():
+                    self.enrichment.submit(phone_number, record.text_answers())
+            if self.store is not None:
+                record.version = time.time_ns()
+                self.store.put({
+                    "phone_number": phone_number,
+                    "snapshot": json.dumps(record.to_snapshot()),
+                    "created_at": record.created_at,
+                    "last_activity": record.last_activity,
+                    "is_completed": record.is_completed(),
+                    "version": record.version
+                })
+    
+    def bind_event_loop(self, loop: Optional[asyncio.AbstractEventLoop]):
+        """
+        Register the event loop async turns run on (None when it stops).
+        
+        Async turns hold alease, which does not exclude lease, so background
+        writers must take alease on this loop to wait for an in-flight turn.
+        
+        Args:
+            loop: Running event loop of the ASGI app
+        """
+        self._loop = loop
+    
+    def _apply_enrichment(self, phone_number: str, enrichment: dict):
+        """Write a candidate's enrichment into their session; runs on the enrichment thread."""
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._aapply_enrichment(phone_number, enrichment), loop).result()
+            return
+        with self.lease(phone_number):
+            self._store_enrichment(phone_number, enrichment)
+    
+    async def _aapply_enrichment(self, phone_number: str, enrichment: dict):
+        """Write a candidate's enrichment on the event loop, behind the session's async turns."""
+        async with self.alease(phone_number):
+            self._store_enrichment(phone_number, enrichment)
+    
+    def _store_enrichment(self, phone_number: str, enrichment: dict):
+        """Set a session's enrichment and save it. Caller holds the session's lease."""
+        assistant = self.get_session(phone_number)
+        if assistant is None:
+            # Expired or deleted while queued
+            return
+        assistant.state["enrichment"] = enrichment
+        self.save_session(phone_number)
+    
     def get_session(self, phone_number: str) -> Optional[RecruiterAssistant]:
         """
         Get existing session without creating new one.
         
+        The assistant stays checked out until save_session.
+        
         Args:
             phone_number: User's phone number
             
         Returns:
             RecruiterAssistant instance or None
         """
-        if phone_number in self.sessions:
-            return self.sessions[phone_number]["assistant"]
+        with self._lock:
+            record = self._live_session(phone_number)
+            if record is not None:
+                return self._checkout(record)
         return None
     
+    def peek_session(self, phone_number: str) -> Optional[RecruiterAssistant]:
+        """
+        Get a read-only view of a session without checking it out.
+        
+        Changes to the returned assistant are not saved; use get_session for turns.
+        
+        Args:
+            phone_number: User's phone number
+            
+        Returns:
+            RecruiterAssistant instance or None
+        """
+        with self._lock:
+            record = self._live_session(phone_number)
+            if record is None:
+                return None
+            return record.assistant or RecruiterAssistant.from_snapshot(record.unpack())
+    
     def delete_session(self, phone_number: str):
         """
         Delete a user's session.
@@ -68,26 +419,225 @@ class SessionManager:
         Args:
             phone_number: User's phone number
         """
-        if phone_number in self.sessions:
-            del self.sessions[phone_number]
+        with self._lock:
+            self.sessions.pop(phone_number, None)
+            self.expiry.remove(phone_number)
+            self._forget_cold(phone_number)
+            if self.store is not None:
+                self.store.delete(phone_number)
     
-    def _cleanup_expired_sessions(self):
-        """Remove sessions that have been inactive for too long."""
-        now = datetime.now()
-        timeout = timedelta(minutes=settings.SESSION_TIMEOUT_MINUTES)
+    def _cleanup_expired_sessions(self, limit: Optional[int] = None) -> int:
+        """
+        Remove sessions that have been inactive for too long.
         
-        expired_sessions = [
-            phone for phone, data in self.sessions.items()
-            if now - data["last_activity"] > timeout
-        ]
+        Args:
+            limit: Maximum expiry entries to process (defaults to SESSION_SWEEP_BATCH)
+            
+        Returns:
+            Number of sessions removed
+        """
+        with self._lock:
+            expired = self.expiry.pop_expired(time.monotonic(), limit or settings.SESSION_SWEEP_BATCH)
+            for phone in expired:
+                self.sessions.pop(phone, None)
+                self._forget_cold(phone)
+                # A shared row may have newer activity from another worker; it
+                # expires when next rehydrated instead
+                if self.store is not None and self.store.leases is None:
+                    self.store.delete(phone)
+            self._stats["expired_by_sweeper"] += len(expired)
+            self._stats["sweeps"] += 1
         
-        for phone in expired_sessions:
-            print(f"Cleaning up expired session for {phone}")
-            del self.sessions[phone]
+        if expired:
+            print(f"Cleaned up {len(expired)} expired sessions")
+        return len(expired)
+    
+    def _ensure_sweeper(self):
+        """Start the background sweeper thread on first use."""
+        if self._sweeper is not None or settings.SESSION_SWEEP_INTERVAL_SECONDS <= 0:
+            return
+        with self._lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(target=self._sweep_loop, name="session-sweeper", daemon=True)
+                self._sweeper.start()
+    
+    def _sweep_loop(self):
+        """Expire idle sessions, at most SESSION_SWEEP_BATCH per tick."""
+        while True:
+            time.sleep(settings.SESSION_SWEEP_INTERVAL_SECONDS)
+            try:
+                self._cleanup_expired_sessions()
+            except Exception as e:
+                print(f"Error sweeping sessions: {e}")
     
     def get_active_sessions_count(self) -> int:
-        """Get count of active sessions."""
-        return len(self.sessions)
+        """Get count of active sessions in memory, the cold tier and the startup snapshot."""
+        with self._lock:
+            count = len(self.sessions)
+            if self.snapshot is not None:
+                count += len(self.snapshot)
+            if self.cold is not None:
+                count += len(self.cold)
+            return count
+    
+    def get_registry_stats(self) -> dict:
+        """
+        Get occupancy and eviction statistics.
+        
+        Returns:
+            Dictionary with resident sessions, the cap and occupancy, evicted
+            and thawed counters and the cold tier size
+        """
+        with self._lock:
+            resident = len(self.sessions)
+            return {
+                "resident": resident,
+                "max_resident": self.max_resident,
+                "occupancy": round(resident / self.max_resident, 4) if self.max_resident > 0 else None,
+                **self._registry_stats,
+                "cold": self.cold.get_stats() if self.cold is not None else None
+            }
+    
+    def enable_snapshots(self, path: Optional[str] = None):
+        """
+        Restore sessions from a snapshot now and save them to it at exit.
+        
+        Call once from the serving process, before it accepts requests.
+        Workers sharing a store keep their sessions there instead, so this
+        does nothing with SESSION_STORE_SHARED.
+        
+        Args:
+            path: Snapshot file (defaults to SESSION_SNAPSHOT_PATH)
+        """
+        path = path or settings.SESSION_SNAPSHOT_PATH
+        if not path or settings.SESSION_STORE_SHARED:
+            return
+        if os.path.exists(path):
+            try:
+                started = time.perf_counter()
+                count = self.restore_snapshot(path)
+                print(f"Restored {count} sessions from {path} in {time.perf_counter() - started:.3f}s")
+            except Exception as e:
+                print(f"Error restoring session snapshot {path}: {e}")
+        atexit.register(self.save_snapshot, path)
+    
+    def restore_snapshot(self, path: str) -> int:
+        """
+        Restore sessions from a snapshot lazily.
+        
+        Only the index is read: sessions are scheduled for expiry from their
+        last activity and decoded on first access. Sessions that expired
+        while the server was down are skipped.
+        
+        Args:
+            path: Snapshot file written by save_snapshot
+            
+        Returns:
+            Number of sessions restored
+        """
+        reader = SnapshotReader(path)
+        now, monotonic_now = time.time(), time.monotonic()
+        with self._lock:
+            deadlines = []
+            stale = []
+            for phone, last_activity in reader.last_activity():
+                expires_at = monotonic_now + self.timeout_seconds - max(0.0, now - last_activity)
+                if expires_at <= monotonic_now or phone in self.sessions or (self.cold is not None and phone in self.cold):
+                    stale.append(phone)
+                else:
+                    deadlines.append((phone, expires_at))
+            for phone in stale:
+                reader.discard(phone)
+            self.expiry.touch_many(deadlines)
+            if self.snapshot is not None:
+                self.snapshot.close()
+            self.snapshot = reader
+        return len(reader)
+    
+    def save_snapshot(self, path: Optional[str] = None) -> dict:
+        """
+        Save every session to a snapshot file.
+        
+        A session in the middle of a turn is saved as of its last
+        save_session. Sessions restored but never accessed are copied from
+        the previous snapshot without being decoded.
+        
+        Args:
+            path: Snapshot file (defaults to SESSION_SNAPSHOT_PATH)
+            
+        Returns:
+            Dictionary with sessions written, bytes and seconds taken
+        """
+        path = path or settings.SESSION_SNAPSHOT_PATH
+        with self._lock:
+            records = list(self.sessions.items())
+            if self.cold is not None:
+                records.extend(self.cold.records())
+            stats = write_snapshot(
+                path,
+                records,
+                previous=self.snapshot,
+                level=settings.SESSION_SNAPSHOT_COMPRESSION_LEVEL
+            )
+        self._last_snapshot = {"path": path, **stats}
+        print(f"Saved {stats['sessions']} sessions to {path} in {stats['seconds']:.3f}s")
+        return stats
+    
+    def get_snapshot_stats(self) -> dict:
+        """
+        Get snapshot statistics.
+        
+        Returns:
+            Dictionary with sessions still pending in and restored from the
+            startup snapshot, and the last save
+        """
+        with self._lock:
+            return {
+                "pending": len(self.snapshot) if self.snapshot is not None else 0,
+                "restored": self.snapshot.restored if self.snapshot is not None else 0,
+                "last_save": self._last_snapshot
+            }
+    
+    def get_expiry_stats(self) -> dict:
+        """
+        Get session expiry statistics.
+        
+        Returns:
+            Dictionary with expiry counters and index size
+        """
+        with self._lock:
+            return {**self._stats, **self.expiry.get_stats(), "sessions": len(self.sessions)}
+    
+    def get_lock_stats(self) -> dict:
+        """
+        Get per-phone lock statistics.
+        
+        Returns:
+            Dictionary with lock acquisitions, contention and wait times
+        """
+        return self.locks.get_stats()
+    
+    def get_enrichment_stats(self) -> Optional[dict]:
+        """
+        Get answer enrichment statistics.
+        
+        Returns:
+            Enrichment queue statistics, or None when enrichment is disabled
+        """
+        if self.enrichment is None:
+            return None
+        return self.enrichment.get_stats()
+    
+    def get_store_stats(self) -> Optional[dict]:
+        """
+        Get durable store statistics.
+        
+        Returns:
+            Write-behind statistics, or None when sessions are memory-only
+        """
+        if self.store is None:
+            return None
+        return {"url": settings.SESSION_STORE_URL, **self.store.get_stats()}
     
     def get_session_info(self, phone_number: str) -> Optional[dict]:
         """
@@ -99,18 +649,19 @@ class SessionManager:
         Returns:
             Session info dictionary or None
         """
-        if phone_number in self.sessions:
-            data = self.sessions[phone_number]
-            assistant = data["assistant"]
+        with self._lock:
+            record = self._live_session(phone_number)
+            if record is None:
+                return None
+            assistant = self.peek_session(phone_number)
             
             return {
                 "phone_number": phone_number,
-                "created_at": data["created_at"],
-                "last_activity": data["last_activity"],
+                "created_at": datetime.fromtimestamp(record.created_at),
+                "last_activity": datetime.fromtimestamp(record.last_activity),
                 "is_completed": assistant.is_completed(),
                 "collected_data": assistant.get_collected_data()
             }
-        return None
     
     def is_new_session(self, phone_number: str) -> bool:
         """
@@ -119,12 +670,14 @@ class SessionManager:
         Returns:
             True if session was just created and welcome message hasn't been sent
         """
-        if phone_number not in self.sessions:
+        record = self.sessions.get(phone_number)
+        if record is None:
             return False
         
-        session_data = self.sessions[phone_number]
         # Check if assistant has only the initial welcome message (no user responses yet)
-        return len(session_data["assistant"].state.get("messages", [])) <= 1
+        if record.assistant is not None:
+            return len(record.assistant.state.get("messages", [])) <= 1
+        return record.message_count <= 1
 
 
 # Global instance
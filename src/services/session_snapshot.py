@@ -0,0 +1,200 @@
+"""
+Binary snapshots of in-memory sessions for fast restarts.
+"""
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import ormsgpack
+import zstandard
+from src.models.session_record import SessionRecord
+
+
+# File layout: header, one zstd frame per session, compression dictionary, index
+_MAGIC = b"RASNAP\x00\x01"
+_HEADER = struct.Struct("<8sQQQQ")  # magic, dict offset/length, index offset/length
+
+# A shared dictionary only pays off once there are enough sessions to train it on
+_DICT_MIN_SESSIONS = 256
+_DICT_SAMPLES = 4096
+_DICT_SIZE = 16 * 1024
+
+
+class SnapshotReader:
+    """
+    Lazily restore sessions from a snapshot file.
+
+    Opening maps the file and decodes only the index (phone number, frame
+    position and timestamps), so a restart with hundreds of thousands of
+    sessions is ready at once. A session's frame is decompressed the first
+    time it is taken; frames never taken can be copied into the next
+    snapshot without decoding.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a snapshot.
+
+        Args:
+            path: Snapshot file written by write_snapshot
+
+        Raises:
+            ValueError: If the file is not a session snapshot
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, dict_offset, dict_length, index_offset, index_length = _HEADER.unpack_from(self._map)
+        except struct.error:
+            magic = None
+        if magic != _MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a session snapshot")
+
+        self.dict_data = bytes(self._map[dict_offset:dict_offset + dict_length]) or None
+        dictionary = zstandard.ZstdCompressionDict(self.dict_data) if self.dict_data else None
+        self._decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+
+        index = ormsgpack.unpackb(
+            zstandard.ZstdDecompressor().decompress(self._map[index_offset:index_offset + index_length])
+        )
+        self._phones: List[str] = index[0]
+        self._offsets: List[int] = index[1]
+        self._lengths: List[int] = index[2]
+        self._created: List[float] = index[3]
+        self._activity: List[float] = index[4]
+        # phone number -> position in the index, for sessions not taken yet
+        self._pending: Dict[str, int] = dict(zip(self._phones, range(len(self._phones))))
+        self.restored = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, phone_number: str) -> bool:
+        return phone_number in self._pending
+
+    def last_activity(self) -> Iterable[Tuple[str, float]]:
+        """Yield (phone number, last activity) for every pending session."""
+        activity = self._activity
+        return ((phone, activity[i]) for phone, i in self._pending.items())
+
+    def take(self, phone_number: str) -> Optional[SessionRecord]:
+        """
+        Decode a pending session and stop tracking it.
+
+        Args:
+            phone_number: Session key
+
+        Returns:
+            SessionRecord, or None if the snapshot does not hold the session
+        """
+        i = self._pending.pop(phone_number, None)
+        if i is None:
+            return None
+        offset = self._offsets[i]
+        snapshot = ormsgpack.unpackb(self._decompressor.decompress(self._map[offset:offset + self._lengths[i]]))
+        self.restored += 1
+        return SessionRecord.from_snapshot(snapshot, self._created[i], self._activity[i])
+
+    def discard(self, phone_number: str):
+        """Forget a pending session (deleted or expired)."""
+        self._pending.pop(phone_number, None)
+
+    def pending_frames(self) -> Iterable[Tuple[str, bytes, float, float]]:
+        """Yield (phone number, compressed frame, created_at, last_activity) for pending sessions."""
+        for phone, i in self._pending.items():
+            offset = self._offsets[i]
+            yield phone, self._map[offset:offset + self._lengths[i]], self._created[i], self._activity[i]
+
+    def close(self):
+        """Unmap the file."""
+        self._pending.clear()
+        self._map.close()
+
+
+def train_dictionary(payloads: List[bytes]) -> Optional[bytes]:
+    """Train a zstd dictionary on serialized sessions, or None if there are too few."""
+    if len(payloads) < _DICT_MIN_SESSIONS:
+        return None
+    step = max(1, len(payloads) // _DICT_SAMPLES)
+    try:
+        return zstandard.train_dictionary(_DICT_SIZE, payloads[::step]).as_bytes()
+    except zstandard.ZstdError:
+        return None
+
+
+def write_snapshot(
+    path: str,
+    records: Iterable[Tuple[str, SessionRecord]],
+    previous: Optional[SnapshotReader] = None,
+    level: int = 3
+) -> dict:
+    """
+    Write sessions to a snapshot file, replacing it atomically.
+
+    Each session is its own zstd frame, so a reader can restore one without
+    touching the rest. Sessions still pending in ``previous`` are copied
+    over byte for byte, reusing its dictionary.
+
+    Args:
+        path: Destination file
+        records: (phone number, record) pairs, saved as last packed
+        previous: Snapshot the process was restored from
+        level: zstd compression level
+
+    Returns:
+        Dictionary with sessions written, bytes and seconds taken
+    """
+    started = time.perf_counter()
+    payloads = []
+    phones = []
+    created = []
+    activity = []
+    for phone, record in records:
+        payloads.append(ormsgpack.packb(record.to_snapshot()))
+        phones.append(phone)
+        created.append(record.created_at)
+        activity.append(record.last_activity)
+
+    dict_data = previous.dict_data if previous is not None else train_dictionary(payloads)
+    dictionary = zstandard.ZstdCompressionDict(dict_data) if dict_data else None
+    compressor = zstandard.ZstdCompressor(level=level, dict_data=dictionary, write_content_size=True)
+    frames = [compressor.compress(payload) for payload in payloads]
+
+    if previous is not None:
+        for phone, frame, created_at, last_activity in previous.pending_frames():
+            phones.append(phone)
+            frames.append(frame)
+            created.append(created_at)
+            activity.append(last_activity)
+
+    offsets = []
+    lengths = []
+    position = _HEADER.size
+    for frame in frames:
+        offsets.append(position)
+        lengths.append(len(frame))
+        position += len(frame)
+    dict_bytes = dict_data or b""
+    index = zstandard.ZstdCompressor(level=level).compress(
+        ormsgpack.packb([phones, offsets, lengths, created, activity])
+    )
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, position, len(dict_bytes), position + len(dict_bytes), len(index)))
+        f.writelines(frames)
+        f.write(dict_bytes)
+        f.write(index)
+        f.flush()
+        os.fsync(f.fileno())
+    # A reader mapping the old file keeps its inode, so replacing it is safe
+    os.replace(tmp_path, path)
+
+    return {
+        "sessions": len(phones),
+        "bytes": position + len(dict_bytes) + len(index),
+        "seconds": round(time.perf_counter() - started, 4)
+    }
@@ -0,0 +1,403 @@
+"""
+Durable session storage with write-behind batching.
+"""
+import atexit
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import (
+    BigInteger, Boolean, Column, Float, MetaData, String, Table, Text,
+    and_, bindparam, create_engine, delete, event, select, update
+)
+
+
+metadata = MetaData()
+
+sessions_table = Table(
+    "sessions",
+    metadata,
+    Column("phone_number", String, primary_key=True),
+    Column("snapshot", Text, nullable=False),
+    Column("created_at", Float, nullable=False),
+    Column("last_activity", Float, nullable=False, index=True),
+    Column("is_completed", Boolean, nullable=False, default=False),
+    Column("version", BigInteger),
+    Column("updated_at", Float, nullable=False)
+)
+
+# Which worker may change a session; see SessionLeases
+leases_table = Table(
+    "session_leases",
+    metadata,
+    Column("phone_number", String, primary_key=True),
+    Column("owner", String, nullable=False),
+    Column("token", String, nullable=False),
+    Column("expires_at", Float, nullable=False)
+)
+
+# (phone number, lease token) pairs
+LeaseRelease = Tuple[str, str]
+
+
+class SessionStore(ABC):
+    """
+    Backend interface for persisted sessions.
+
+    A record is a dict with phone_number, snapshot (JSON text), created_at
+    and last_activity (epoch seconds), is_completed and version (changes on
+    every save, so workers can tell whether their copy is current).
+    """
+
+    @abstractmethod
+    def load(self, phone_number: str) -> Optional[dict]:
+        """Get a stored record, or None."""
+
+    @abstractmethod
+    def write(self, upserts: List[dict], deletes: List[str], releases: Iterable[LeaseRelease] = ()):
+        """Apply a batch of upserts and deletes atomically, then release the given leases."""
+
+    @abstractmethod
+    def scan(self, after: Optional[str], limit: int) -> List[dict]:
+        """Get up to limit stored records by phone number, starting after the given one (None for the first page)."""
+
+    @abstractmethod
+    def claim_lease(self, phone_number: str, owner: str, token: str, expires_at: float) -> Tuple[bool, Optional[int]]:
+        """
+        Take or renew a session lease unless another owner holds an unexpired one.
+
+        Returns:
+            (claimed, version of the stored session or None)
+        """
+
+    def close(self):
+        """Release backend resources."""
+
+
+class SQLAlchemySessionStore(SessionStore):
+    """Session store on any SQLAlchemy database; SQLite files run in WAL mode."""
+
+    def __init__(self, url: str):
+        """
+        Connect and create the schema if needed.
+
+        Args:
+            url: SQLAlchemy database URL, e.g. sqlite:///sessions.db
+        """
+        self.url = url
+        self.engine = create_engine(url, future=True)
+        self.dialect = self.engine.dialect.name
+
+        if self.dialect == "sqlite":
+            @event.listens_for(self.engine, "connect")
+            def _configure_sqlite(dbapi_connection, _):
+                cursor = dbapi_connection.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.execute("PRAGMA busy_timeout=5000")
+                cursor.close()
+
+        metadata.create_all(self.engine)
+        self._upsert_statement = self._upsert()
+        # Only the holder's own token releases a lease, never a newer claim
+        self._release_statement = delete(leases_table).where(and_(
+            leases_table.c.phone_number == bindparam("phone"),
+            leases_table.c.token == bindparam("lease_token")
+        ))
+
+    def load(self, phone_number: str) -> Optional[dict]:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(sessions_table).where(sessions_table.c.phone_number == phone_number)
+            ).mappings().first()
+        return dict(row) if row is not None else None
+
+    def write(self, upserts: List[dict], deletes: List[str], releases: Iterable[LeaseRelease] = ()):
+        now = time.time()
+        rows = [{**record, "updated_at": now} for record in upserts]
+        releases = [{"phone": phone, "lease_token": token} for phone, token in releases]
+        with self.engine.begin() as conn:
+            if deletes:
+                conn.execute(delete(sessions_table).where(sessions_table.c.phone_number.in_(deletes)))
+            if rows and self._upsert_statement is not None:
+                conn.execute(self._upsert_statement, rows)
+            elif rows:
+                self._update_or_insert(conn, rows)
+            if releases:
+                conn.execute(self._release_statement, releases)
+
+    def scan(self, after: Optional[str], limit: int) -> List[dict]:
+        statement = select(sessions_table).order_by(sessions_table.c.phone_number).limit(limit)
+        if after is not None:
+            statement = statement.where(sessions_table.c.phone_number > after)
+        with self.engine.connect() as conn:
+            return [dict(row) for row in conn.execute(statement).mappings()]
+
+    def claim_lease(self, phone_number: str, owner: str, token: str, expires_at: float) -> Tuple[bool, Optional[int]]:
+        now = time.time()
+        with self.engine.begin() as conn:
+            if self.dialect in ("sqlite", "postgresql"):
+                statement = self._insert(leases_table).values(
+                    phone_number=phone_number, owner=owner, token=token, expires_at=expires_at
+                )
+                conn.execute(statement.on_conflict_do_update(
+                    index_elements=[leases_table.c.phone_number],
+                    set_={"owner": owner, "token": token, "expires_at": expires_at},
+                    where=(leases_table.c.expires_at <= now) | (leases_table.c.owner == owner)
+                ))
+            else:
+                claimed = conn.execute(
+                    update(leases_table)
+                    .where(leases_table.c.phone_number == phone_number)
+                    .where((leases_table.c.expires_at <= now) | (leases_table.c.owner == owner))
+                    .values(owner=owner, token=token, expires_at=expires_at)
+                ).rowcount
+                if not claimed and conn.execute(
+                    select(leases_table.c.token).where(leases_table.c.phone_number == phone_number)
+                ).first() is None:
+                    conn.execute(leases_table.insert().values(
+                        phone_number=phone_number, owner=owner, token=token, expires_at=expires_at
+                    ))
+
+            holder = conn.execute(
+                select(leases_table.c.token).where(leases_table.c.phone_number == phone_number)
+            ).scalar()
+            if holder != token:
+                return False, None
+            version = conn.execute(
+                select(sessions_table.c.version).where(sessions_table.c.phone_number == phone_number)
+            ).scalar()
+        return True, version
+
+    def _insert(self, table: Table):
+        """Dialect insert construct supporting ON CONFLICT."""
+        if self.dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        return insert(table)
+
+    def _upsert(self):
+        """INSERT ... ON CONFLICT DO UPDATE for dialects that support it, else None (see _update_or_insert)."""
+        if self.dialect in ("sqlite", "postgresql"):
+            statement = self._insert(sessions_table)
+            return statement.on_conflict_do_update(
+                index_elements=[sessions_table.c.phone_number],
+                set_={
+                    column.name: statement.excluded[column.name]
+                    for column in sessions_table.columns
+                    if column.name != "phone_number"
+                }
+            )
+        return None
+
+    def _update_or_insert(self, conn, rows: List[dict]):
+        """Dialect-neutral upsert: update the stored sessions, insert the rest, in the caller's transaction."""
+        stored = set(conn.execute(
+            select(sessions_table.c.phone_number)
+            .where(sessions_table.c.phone_number.in_([row["phone_number"] for row in rows]))
+        ).scalars())
+        updates = [{**row, "phone": row["phone_number"]} for row in rows if row["phone_number"] in stored]
+        inserts = [row for row in rows if row["phone_number"] not in stored]
+        if updates:
+            conn.execute(
+                update(sessions_table)
+                .where(sessions_table.c.phone_number == bindparam("phone"))
+                .values({
+                    column.name: bindparam(column.name)
+                    for column in sessions_table.columns
+                    if column.name != "phone_number"
+                }),
+                updates
+            )
+        if inserts:
+            conn.execute(sessions_table.insert(), inserts)
+
+    def close(self):
+        self.engine.dispose()
+
+
+class WriteBehindQueue:
+    """
+    Coalescing write-behind buffer in front of a SessionStore.
+
+    ``put`` and ``delete`` only update an in-memory map keyed by phone
+    number, so a turn never waits on disk and repeated updates to the same
+    session collapse into one row. A background thread commits the map in a
+    single transaction every ``flush_interval`` seconds, or sooner once
+    ``batch_size`` sessions are pending. Reads consult pending writes first.
+    With ``leases``, idle leases are released in the flush transaction.
+    """
+
+    def __init__(self, store: SessionStore, flush_interval: float = 0.2, batch_size: int = 500, leases=None):
+        """
+        Initialize the queue and start its flusher thread.
+
+        Args:
+            store: Backend receiving the batches
+            flush_interval: Seconds between flushes
+            batch_size: Pending sessions that trigger an early flush
+            leases: SessionLeases shared with other workers, if any
+        """
+        self.store = store
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.leases = leases
+        # phone number -> record to upsert, or None to delete
+        self._pending: Dict[str, Optional[dict]] = {}
+        self._in_flight: Dict[str, Optional[dict]] = {}
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            "writes": 0,
+            "coalesced": 0,
+            "batches": 0,
+            "rows_flushed": 0,
+            "errors": 0,
+            "last_flush_ms": 0.0
+        }
+
+        self._thread = threading.Thread(target=self._run, name="session-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, record: dict):
+        """Queue an upsert of a session record."""
+        self._enqueue(record["phone_number"], record)
+
+    def delete(self, phone_number: str):
+        """Queue the deletion of a session."""
+        self._enqueue(phone_number, None)
+
+    def _enqueue(self, phone_number: str, record: Optional[dict]):
+        with self._cond:
+            if phone_number in self._pending:
+                self._stats["coalesced"] += 1
+            self._pending[phone_number] = record
+            self._stats["writes"] += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def load(self, phone_number: str) -> Optional[dict]:
+        """
+        Read a session, honouring writes not yet flushed.
+
+        Args:
+            phone_number: Session key
+
+        Returns:
+            Stored record or None
+        """
+        found, record = self._pending_record(phone_number)
+        if found:
+            return record
+        return self.store.load(phone_number)
+
+    def _pending_record(self, phone_number: str) -> Tuple[bool, Optional[dict]]:
+        with self._cond:
+            for writes in (self._pending, self._in_flight):
+                if phone_number in writes:
+                    return True, writes[phone_number]
+        return False, None
+
+    def is_dirty(self, phone_number: str) -> bool:
+        """Whether this process has a write for the session that is not committed yet."""
+        return self._pending_record(phone_number)[0]
+
+    def flush(self):
+        """Commit every pending write now."""
+        with self._flush_lock:
+            # Leases first: a lease handed over here has its final write queued already
+            releases = self.leases.releasable() if self.leases is not None else []
+            with self._cond:
+                batch, self._pending = self._pending, {}
+                self._in_flight = batch
+            if not batch and not releases:
+                return
+
+            upserts = [record for record in batch.values() if record is not None]
+            deletes = [phone for phone, record in batch.items() if record is None]
+            started = time.perf_counter()
+            try:
+                self.store.write(upserts, deletes, releases)
+            except Exception as e:
+                print(f"Error flushing {len(batch)} sessions: {e}")
+                with self._cond:
+                    self._stats["errors"] += 1
+                    # Keep newer writes that arrived during the failed flush
+                    for phone, record in batch.items():
+                        self._pending.setdefault(phone, record)
+                    self._in_flight = {}
+                return
+
+            with self._cond:
+                self._in_flight = {}
+                self._stats["batches"] += 1
+                self._stats["rows_flushed"] += len(batch)
+                self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    def _run(self):
+        """Flush periodically until closed."""
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if self._closed:
+                    return
+            self.flush()
+
+    def close(self):
+        """Stop the flusher and commit what is left."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5)
+        self.flush()
+        self.store.close()
+
+    def get_stats(self) -> dict:
+        """
+        Get write-behind statistics.
+
+        Returns:
+            Dictionary with pending sessions, writes, coalesced writes and flush
+            counters, plus lease statistics when shared
+        """
+        with self._cond:
+            stats = {**self._stats, "pending": len(self._pending)}
+        if self.leases is not None:
+            stats["leases"] = self.leases.get_stats()
+        return stats
+
+
+def create_session_store(
+    url: str,
+    flush_interval: float,
+    batch_size: int,
+    shared: bool = False,
+    lease_ttl: float = 60,
+    lease_wait: float = 15
+) -> WriteBehindQueue:
+    """
+    Build the session store for a database URL.
+
+    Args:
+        url: SQLAlchemy database URL
+        flush_interval: Seconds between write-behind flushes
+        batch_size: Pending sessions that trigger an early flush
+        shared: Whether other worker processes use the same store
+        lease_ttl: Lease lifetime in seconds when shared
+        lease_wait: Longest wait for another worker's lease when shared
+
+    Returns:
+        Write-behind queue over the backend
+    """
+    store = SQLAlchemySessionStore(url)
+    leases = None
+    if shared:
+        from src.services.session_leases import SessionLeases
+        leases = SessionLeases(store, ttl=lease_ttl, wait=lease_wait)
+    return WriteBehindQueue(store, flush_interval, batch_size, leases=leases)
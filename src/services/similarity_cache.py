@@ -0,0 +1,228 @@
+"""
+Approximate-match cache for yes/no classification results.
+"""
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+import numpy as np
+
+
+# (answer, confidence) as returned by the LLM before thresholding
+CachedVerdict = Tuple[Optional[bool], float]
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def char_trigrams(normalized: str) -> FrozenSet[str]:
+    """Character trigrams of a normalized text, padded so short words count."""
+    padded = f" {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class SimilarityCache:
+    """
+    In-process near-duplicate cache keyed on character trigrams.
+
+    Each stored text gets a MinHash signature that is split into LSH bands,
+    so a lookup only compares against entries sharing at least one band.
+    Candidates are then verified with the exact trigram Jaccard similarity.
+    A verdict is reused only when the similarity clears ``threshold`` and
+    both texts carry the same polarity words (yes/no markers, negations,
+    hedges), so "I booked it" never answers for "I have not booked it".
+    Only confident yes/no verdicts are stored; the index is an LRU bounded
+    to ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        normalizer: Callable[[str], str],
+        polarity: Callable[[str], FrozenSet[str]],
+        threshold: float = 0.6,
+        min_confidence: float = 0.85,
+        max_entries: int = 5000,
+        ttl_seconds: float = 86400,
+        num_perm: int = 64,
+        bands: int = 16,
+        max_candidates: int = 32,
+        seed: int = 1
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            normalizer: Function applied to user text before shingling
+            polarity: Returns the polarity classes present in a normalized text
+            threshold: Minimum trigram Jaccard similarity for a hit
+            min_confidence: Minimum LLM confidence for a verdict to be stored
+            max_entries: Maximum number of indexed texts
+            ttl_seconds: Lifetime of an entry
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm must be divisible by it)
+            max_candidates: Candidates verified per lookup, most shared bands first
+            seed: Seed for the MinHash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.normalizer = normalizer
+        self.polarity = polarity
+        self.threshold = threshold
+        self.min_confidence = min_confidence
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_candidates = max_candidates
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+        # entry id -> (normalized text, trigrams, polarity, band keys, answer, confidence, created_at)
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._ids_by_text: Dict[str, int] = {}
+        self._tables: List[Dict[bytes, Set[int]]] = [{} for _ in range(bands)]
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "candidates_checked": 0,
+            "polarity_rejects": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+    def _band_keys(self, trigrams: FrozenSet[str]) -> List[bytes]:
+        """MinHash the trigrams and cut the signature into band keys."""
+        hashes = np.fromiter(
+            (zlib.crc32(gram.encode("utf-8")) for gram in trigrams),
+            dtype=np.uint64,
+            count=len(trigrams)
+        )
+        permuted = ((hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME) & _MAX_HASH
+        signature = permuted.min(axis=0)
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def get(self, user_text: str) -> Optional[CachedVerdict]:
+        """
+        Look up the verdict of the most similar stored text.
+
+        Args:
+            user_text: Raw user text
+
+        Returns:
+            (answer, confidence) or None when nothing similar enough is stored
+        """
+        normalized = self.normalizer(user_text)
+        if not normalized:
+            return None
+        trigrams = char_trigrams(normalized)
+        polarity = self.polarity(normalized)
+        band_keys = self._band_keys(trigrams)
+        now = time.time()
+
+        with self._lock:
+            # Sharing more bands means a higher estimated similarity
+            shared_bands: Counter = Counter()
+            for table, key in zip(self._tables, band_keys):
+                shared_bands.update(table.get(key, ()))
+
+            best_id, best_similarity, rejected = None, 0.0, False
+            for entry_id, _ in shared_bands.most_common(self.max_candidates):
+                _, entry_trigrams, entry_polarity, _, _, _, created_at = self._entries[entry_id]
+                if now - created_at > self.ttl_seconds:
+                    self._remove(entry_id)
+                    self._stats["expirations"] += 1
+                    continue
+                self._stats["candidates_checked"] += 1
+                similarity = len(trigrams & entry_trigrams) / len(trigrams | entry_trigrams)
+                if similarity < self.threshold or similarity <= best_similarity:
+                    continue
+                if entry_polarity != polarity:
+                    rejected = True
+                    continue
+                best_id, best_similarity = entry_id, similarity
+
+            if best_id is None:
+                self._stats["polarity_rejects" if rejected else "misses"] += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self._stats["hits"] += 1
+            entry = self._entries[best_id]
+            return entry[4], entry[5]
+
+    def set(self, user_text: str, answer: Optional[bool], confidence: float):
+        """
+        Index a verdict when it is a confident yes or no.
+
+        Args:
+            user_text: Raw user text
+            answer: True/False/None as returned by the classifier
+            confidence: Classifier confidence
+        """
+        if answer is None or confidence < self.min_confidence:
+            return
+        normalized = self.normalizer(user_text)
+        if not normalized:
+            return
+        trigrams = char_trigrams(normalized)
+        polarity = self.polarity(normalized)
+        band_keys = self._band_keys(trigrams)
+
+        with self._lock:
+            existing = self._ids_by_text.get(normalized)
+            if existing is not None:
+                self._remove(existing)
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (normalized, trigrams, polarity, band_keys, answer, confidence, time.time())
+            self._ids_by_text[normalized] = entry_id
+            for table, key in zip(self._tables, band_keys):
+                table.setdefault(key, set()).add(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._ids_by_text.clear()
+            for table in self._tables:
+                table.clear()
+
+    def _remove(self, entry_id: int):
+        """Unlink an entry from the LRU and every band table. Caller holds the lock."""
+        normalized, _, _, band_keys, _, _, _ = self._entries.pop(entry_id)
+        if self._ids_by_text.get(normalized) == entry_id:
+            del self._ids_by_text[normalized]
+        for table, key in zip(self._tables, band_keys):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del table[key]
+
+    def get_stats(self) -> dict:
+        """
+        Get similarity cache statistics.
+
+        Returns:
+            Dictionary with hit/miss/rejection counters, size and hit rate
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+
+        lookups = stats["hits"] + stats["misses"] + stats["polarity_rejects"]
+        stats["max_entries"] = self.max_entries
+        stats["threshold"] = self.threshold
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
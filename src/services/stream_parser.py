@@ -0,0 +1,66 @@
+"""
+Incremental parser for streamed yes/no classifier responses.
+"""
+import re
+from typing import Optional
+from src.models.state import YesNoIntent
+
+
+_ANSWER = re.compile(r'"answer"\s*:\s*(true|false|null)\b')
+# A number is only complete once a delimiter follows it ("0.9" may become "0.95")
+_CONFIDENCE = re.compile(r'"confidence"\s*:\s*"?(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)"?\s*[,}\n]')
+
+_LITERALS = {"true": True, "false": False, "null": None}
+
+
+class IncrementalIntentParser:
+    """
+    Parse a streamed classifier response as chunks arrive.
+
+    The classifier prompt asks for "answer" and "confidence" before the
+    free-text "reasoning", so the decision is usually known long before the
+    completion ends. ``feed`` returns a validated YesNoIntent as soon as
+    both fields are complete, letting the caller cancel the stream.
+    """
+
+    def __init__(self):
+        """Initialize an empty buffer."""
+        self.text = ""
+        self._answer_found = False
+        self._answer: Optional[bool] = None
+        self._confidence: Optional[float] = None
+
+    def feed(self, chunk: str) -> Optional[YesNoIntent]:
+        """
+        Append a chunk and try to decide.
+
+        Args:
+            chunk: Next piece of streamed content
+
+        Returns:
+            YesNoIntent once answer and confidence are known, otherwise None
+        """
+        self.text += chunk
+
+        if not self._answer_found:
+            match = _ANSWER.search(self.text)
+            if match:
+                self._answer_found = True
+                self._answer = _LITERALS[match.group(1)]
+
+        if self._confidence is None:
+            match = _CONFIDENCE.search(self.text)
+            if match:
+                self._confidence = float(match.group(1))
+
+        if not self._answer_found or self._confidence is None:
+            return None
+
+        try:
+            return YesNoIntent(
+                answer=self._answer,
+                confidence=self._confidence,
+                reasoning="(stream stopped before reasoning)"
+            )
+        except ValueError:
+            return None
@@ -0,0 +1,142 @@
+"""
+Striped per-key locks with FIFO ordering.
+"""
+import asyncio
+import threading
+import time
+import zlib
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, List, Optional
+
+
+class _TicketLock:
+    """A lock granted in arrival order, so queued requests keep their sequence."""
+
+    __slots__ = ("cond", "next_ticket", "serving")
+
+    def __init__(self):
+        self.cond = threading.Condition(threading.Lock())
+        self.next_ticket = 0
+        self.serving = 0
+
+
+class StripedLock:
+    """
+    Serialize work per key with a fixed pool of locks.
+
+    A key maps to one of ``stripes`` locks by hash, so memory stays bounded
+    however many keys exist and unrelated keys rarely share a lock. Threads
+    acquire ticket locks that are granted first come, first served; async
+    callers use one asyncio.Lock per stripe (also FIFO). The two families are
+    independent: a process serves either the sync or the async app.
+    """
+
+    def __init__(self, stripes: int = 1024):
+        """
+        Initialize the lock pool.
+
+        Args:
+            stripes: Number of locks keys are spread over
+        """
+        self.stripes = max(1, stripes)
+        self._locks = [_TicketLock() for _ in range(self.stripes)]
+        self._async_locks: List[Optional[asyncio.Lock]] = [None] * self.stripes
+        self._stats_lock = threading.Lock()
+        self._waiting = 0
+        self._stats = {
+            "acquisitions": 0,
+            "contended": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0
+        }
+
+    def _stripe(self, key: str) -> int:
+        return zlib.crc32(key.encode("utf-8")) % self.stripes
+
+    @contextmanager
+    def hold(self, key: str) -> Iterator[None]:
+        """
+        Hold the key's lock, waiting behind earlier holders.
+
+        Args:
+            key: Key to serialize on (e.g. phone number)
+        """
+        lock = self._locks[self._stripe(key)]
+        started = time.perf_counter()
+        with lock.cond:
+            ticket = lock.next_ticket
+            lock.next_ticket += 1
+            contended = ticket != lock.serving
+            if contended:
+                self._enter_wait()
+                try:
+                    while ticket != lock.serving:
+                        lock.cond.wait()
+                finally:
+                    self._leave_wait()
+        self._record(time.perf_counter() - started, contended)
+        try:
+            yield
+        finally:
+            with lock.cond:
+                lock.serving += 1
+                lock.cond.notify_all()
+
+    @asynccontextmanager
+    async def ahold(self, key: str) -> AsyncIterator[None]:
+        """Async variant of hold; waiting never blocks the event loop."""
+        stripe = self._stripe(key)
+        lock = self._async_locks[stripe]
+        if lock is None:
+            lock = self._async_locks[stripe] = asyncio.Lock()
+
+        started = time.perf_counter()
+        contended = lock.locked()
+        if contended:
+            self._enter_wait()
+        try:
+            await lock.acquire()
+        finally:
+            if contended:
+                self._leave_wait()
+        self._record(time.perf_counter() - started, contended)
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def _enter_wait(self):
+        with self._stats_lock:
+            self._waiting += 1
+
+    def _leave_wait(self):
+        with self._stats_lock:
+            self._waiting -= 1
+
+    def _record(self, waited: float, contended: bool):
+        with self._stats_lock:
+            self._stats["acquisitions"] += 1
+            if contended:
+                self._stats["contended"] += 1
+            self._stats["wait_seconds_total"] += waited
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+
+    def get_stats(self) -> dict:
+        """
+        Get lock wait and contention statistics.
+
+        Returns:
+            Dictionary with acquisitions, contended acquisitions and rate,
+            callers waiting now and wait times
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats["waiting"] = self._waiting
+
+        acquisitions = stats["acquisitions"]
+        stats["stripes"] = self.stripes
+        stats["contention_rate"] = round(stats["contended"] / acquisitions, 4) if acquisitions else 0.0
+        stats["wait_seconds_avg"] = round(stats["wait_seconds_total"] / acquisitions, 6) if acquisitions else 0.0
+        stats["wait_seconds_total"] = round(stats["wait_seconds_total"], 4)
+        stats["wait_seconds_max"] = round(stats["wait_seconds_max"], 4)
+        return stats
@@ -0,0 +1,248 @@
+"""
+Prompt token budgets and per-call token accounting.
+"""
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from config.settings import settings
+from src.services.turn_context import current_route, current_session
+
+
+# Share of the user-text budget kept from the start of the text
+HEAD_SHARE = 2 / 3
+TRUNCATION_MARKER = " [...] "
+# Rough characters per token when the tiktoken encoding is unavailable
+CHARS_PER_TOKEN = 4
+
+
+class PromptBuilder:
+    """
+    Fit user text into a prompt under a token budget.
+
+    Tokens are counted with tiktoken. Text over the budget keeps its head
+    and tail around a truncation marker, since a yes/no verdict is usually
+    at the start of a long paste and a closing question at its end. When the
+    encoding cannot be loaded (e.g. offline, its file is downloaded on first
+    use) counts fall back to a characters-per-token estimate.
+    """
+
+    def __init__(self, encoding_name: str, max_input_tokens: int):
+        """
+        Initialize the builder; the encoding is loaded by load or on first use.
+
+        Args:
+            encoding_name: tiktoken encoding name
+            max_input_tokens: Token budget for user text in one prompt (<= 0 disables truncation)
+        """
+        self.encoding_name = encoding_name
+        self.max_input_tokens = max_input_tokens
+        self._encoding = None
+        self._encoding_loaded = False
+        self._lock = threading.Lock()
+        self._stats = {"built": 0, "truncated": 0, "tokens_dropped": 0}
+
+    @property
+    def encoding(self):
+        """tiktoken encoding, or None when it could not be loaded."""
+        if not self._encoding_loaded:
+            with self._lock:
+                if not self._encoding_loaded:
+                    try:
+                        import tiktoken
+
+                        self._encoding = tiktoken.get_encoding(self.encoding_name)
+                    except Exception as e:
+                        print(f"Tokenizer '{self.encoding_name}' unavailable, estimating token counts: {e}")
+                    self._encoding_loaded = True
+        return self._encoding
+
+    def load(self):
+        """
+        Load the encoding now, at app startup.
+
+        The first load downloads the encoding file (or times out offline);
+        doing it before serving keeps that out of the first turn's budget.
+        """
+        return self.encoding
+
+    def count(self, text: str) -> int:
+        """
+        Count tokens in a text.
+
+        Args:
+            text: Any text
+
+        Returns:
+            Token count (estimated when the encoding is unavailable)
+        """
+        if not text:
+            return 0
+        encoding = self.encoding
+        if encoding is None:
+            return math.ceil(len(text) / CHARS_PER_TOKEN)
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def fit(self, user_text: str) -> str:
+        """
+        Truncate user text to the budget, keeping its head and tail.
+
+        Args:
+            user_text: Raw user text
+
+        Returns:
+            The text itself when it fits, otherwise head + marker + tail
+        """
+        budget = self.max_input_tokens
+        # Every token spans at least one byte, so short text always fits
+        if budget <= 0 or len(user_text.encode("utf-8")) <= budget:
+            self._count(built=1)
+            return user_text
+
+        encoding = self.encoding
+        keep = max(budget - self.count(TRUNCATION_MARKER), 2)
+        head = math.ceil(keep * HEAD_SHARE)
+        tail = keep - head
+
+        if encoding is None:
+            total = self.count(user_text)
+            if total <= budget:
+                self._count(built=1)
+                return user_text
+            head_text = user_text[:head * CHARS_PER_TOKEN]
+            tail_text = user_text[-tail * CHARS_PER_TOKEN:] if tail else ""
+        else:
+            tokens = encoding.encode(user_text, disallowed_special=())
+            total = len(tokens)
+            if total <= budget:
+                self._count(built=1)
+                return user_text
+            head_text = encoding.decode(tokens[:head])
+            tail_text = encoding.decode(tokens[-tail:]) if tail else ""
+
+        self._count(built=1, truncated=1, tokens_dropped=total - keep)
+        return f"{head_text.rstrip()}{TRUNCATION_MARKER}{tail_text.lstrip()}"
+
+    def build(self, template: str, user_text: str) -> str:
+        """
+        Format a prompt template with budgeted user text.
+
+        Args:
+            template: Template with a ``{user_text}`` placeholder
+            user_text: Raw user text
+
+        Returns:
+            Prompt ready to send
+        """
+        return template.format(user_text=self.fit(user_text))
+
+    def _count(self, **increments: int):
+        with self._lock:
+            for name, value in increments.items():
+                self._stats[name] += value
+
+    def get_stats(self) -> dict:
+        """
+        Get truncation counters.
+
+        Returns:
+            Dictionary with prompts built, truncated and tokens dropped
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["tokenizer"] = self.encoding_name if self._encoding is not None else "estimate"
+        stats["max_input_tokens"] = self.max_input_tokens
+        return stats
+
+
+def _usage_entry() -> dict:
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+
+class TokenLedger:
+    """
+    Prompt and completion token totals per call, session and route.
+
+    Session and route default to the labels of the current turn (see
+    turn_labels in src/services/turn_context.py). Per-session entries are
+    kept for the most recently active ``max_sessions`` sessions.
+    """
+
+    def __init__(self, max_sessions: int = 10000):
+        """
+        Initialize the ledger.
+
+        Args:
+            max_sessions: Sessions tracked before the least recent is dropped
+        """
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._total = _usage_entry()
+        self._routes: Dict[str, dict] = {}
+        self._sessions: "OrderedDict[str, dict]" = OrderedDict()
+
+    def record(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        session: Optional[str] = None,
+        route: Optional[str] = None
+    ):
+        """
+        Record one LLM call.
+
+        Args:
+            prompt_tokens: Tokens sent
+            completion_tokens: Tokens received
+            session: Session key (defaults to the current turn's session)
+            route: Route name (defaults to the current turn's route)
+        """
+        session = session or current_session()
+        route = route or current_route() or "unattributed"
+
+        with self._lock:
+            entries = [self._total, self._routes.setdefault(route, _usage_entry())]
+            if session is not None:
+                entry = self._sessions.pop(session, None) or _usage_entry()
+                self._sessions[session] = entry
+                entries.append(entry)
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+
+            for entry in entries:
+                entry["calls"] += 1
+                entry["prompt_tokens"] += prompt_tokens
+                entry["completion_tokens"] += completion_tokens
+
+    def get_session(self, session: str) -> Optional[dict]:
+        """Get token totals for one session, or None if it is not tracked."""
+        with self._lock:
+            entry = self._sessions.get(session)
+            return dict(entry) if entry is not None else None
+
+    def get_stats(self, top: int = 10) -> dict:
+        """
+        Get token totals.
+
+        Args:
+            top: Number of heaviest sessions to include
+
+        Returns:
+            Dictionary with overall, per-route and top per-session totals
+        """
+        with self._lock:
+            sessions = sorted(
+                self._sessions.items(),
+                key=lambda item: item[1]["prompt_tokens"] + item[1]["completion_tokens"],
+                reverse=True
+            )
+            return {
+                "total": dict(self._total),
+                "routes": {route: dict(entry) for route, entry in self._routes.items()},
+                "sessions_tracked": len(self._sessions),
+                "top_sessions": {session: dict(entry) for session, entry in sessions[:top]}
+            }
+
+
+# Global instance
+token_ledger = TokenLedger(max_sessions=settings.TOKEN_LEDGER_MAX_SESSIONS)
@@ -0,0 +1,205 @@
+"""
+Append-only conversation transcripts.
+"""
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from config.settings import settings
+
+
+class TranscriptLog:
+    """
+    Full conversation transcripts, kept out of the in-memory sessions.
+
+    Entries are queued by ``append`` and written by a background thread to
+    one append-only JSONL segment per day and process
+    (``<directory>/<YYYY-MM-DD>-<pid>.jsonl``), so several workers never
+    interleave writes in one file. Each flushed chunk (one phone's entries)
+    is indexed by phone number, segment, offset and length in a SQLite
+    file shared by all workers, and ``read`` seeks straight to a phone's
+    chunks.
+    """
+
+    def __init__(self, directory: str, flush_interval: float = 1.0):
+        """
+        Initialize the transcript log.
+
+        Args:
+            directory: Directory for segments and the index ("" disables transcripts)
+            flush_interval: Seconds between background flushes
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval
+        # (phone number, epoch seconds, entries) waiting for the writer
+        self._queue: List[Tuple[str, float, List[dict]]] = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_pid: Optional[int] = None
+        self._segment: Optional[Tuple[str, object]] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._stats = {"entries": 0, "chunks": 0, "bytes": 0, "errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def append(self, phone_number: str, messages: List[dict], log: List[str]):
+        """
+        Queue a turn's new messages and log events.
+
+        Args:
+            phone_number: Session key
+            messages: Message dicts (role, content) in order
+            log: Flow log entries added in the same turn
+        """
+        if not self.enabled or not (messages or log):
+            return
+        entries = list(messages) + [{"role": "event", "content": entry} for entry in log]
+        with self._cond:
+            self._queue.append((phone_number, time.time(), entries))
+        self._ensure_writer()
+
+    def read(self, phone_number: str, limit: Optional[int] = None) -> Optional[List[dict]]:
+        """
+        Get a phone number's transcript, oldest entry first.
+
+        Args:
+            phone_number: Session key
+            limit: Only return the last ``limit`` entries
+
+        Returns:
+            Entries with role, content and ts (ISO time), or None if nothing was recorded
+        """
+        if not self.enabled:
+            return None
+        self.flush()
+        with self._flush_lock:
+            rows = self._connect().execute(
+                "SELECT segment, offset, length FROM transcript_index"
+                " WHERE phone_number = ? ORDER BY ts, segment, offset",
+                (phone_number,)
+            ).fetchall()
+        if not rows:
+            return None
+
+        entries = []
+        handles: Dict[str, object] = {}
+        try:
+            for segment, offset, length in rows:
+                handle = handles.get(segment)
+                if handle is None:
+                    handle = handles[segment] = open(os.path.join(self.directory, segment), "rb")
+                handle.seek(offset)
+                entries.extend(json.loads(line) for line in handle.read(length).splitlines())
+        finally:
+            for handle in handles.values():
+                handle.close()
+        return entries[-limit:] if limit else entries
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the index (once per process). Caller holds the flush lock."""
+        if self._db is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"), check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS transcript_index ("
+                " phone_number TEXT NOT NULL,"
+                " ts REAL NOT NULL,"
+                " segment TEXT NOT NULL,"
+                " offset INTEGER NOT NULL,"
+                " length INTEGER NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS transcript_index_phone ON transcript_index (phone_number, ts)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _segment_file(self, day: str):
+        """Get the open segment for a day, rotating at midnight. Caller holds the flush lock."""
+        name = f"{day}-{os.getpid()}.jsonl"
+        if self._segment is None or self._segment[0] != name:
+            if self._segment is not None:
+                self._segment[1].close()
+            os.makedirs(self.directory, exist_ok=True)
+            self._segment = (name, open(os.path.join(self.directory, name), "ab"))
+        return self._segment
+
+    def flush(self):
+        """Write every queued entry and index it."""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._queue = self._queue, []
+            if not batch:
+                return
+
+            try:
+                index_rows = []
+                written = 0
+                for phone_number, ts, entries in batch:
+                    stamp = datetime.fromtimestamp(ts)
+                    name, handle = self._segment_file(stamp.strftime("%Y-%m-%d"))
+                    iso = stamp.isoformat(timespec="seconds")
+                    chunk = "".join(
+                        json.dumps({**entry, "ts": iso}, ensure_ascii=False) + "\n" for entry in entries
+                    ).encode("utf-8")
+                    offset = handle.tell()
+                    handle.write(chunk)
+                    index_rows.append((phone_number, ts, name, offset, len(chunk)))
+                    written += len(entries)
+                self._segment[1].flush()
+
+                db = self._connect()
+                db.executemany(
+                    "INSERT INTO transcript_index (phone_number, ts, segment, offset, length) VALUES (?, ?, ?, ?, ?)",
+                    index_rows
+                )
+                db.commit()
+            except Exception as e:
+                print(f"Error writing {len(batch)} transcript chunks: {e}")
+                self._stats["errors"] += 1
+                return
+
+            self._stats["entries"] += written
+            self._stats["chunks"] += len(index_rows)
+            self._stats["bytes"] += sum(row[4] for row in index_rows)
+
+    def _ensure_writer(self):
+        """Start the writer thread on first use (again after a fork)."""
+        pid = os.getpid()
+        if self._writer_pid == pid:
+            return
+        with self._cond:
+            if self._writer_pid != pid:
+                self._writer_pid = pid
+                self._writer = threading.Thread(target=self._write_loop, name="transcript-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _write_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def get_stats(self) -> dict:
+        """
+        Get transcript statistics.
+
+        Returns:
+            Dictionary with written entries, chunks, bytes, errors and queued chunks
+        """
+        with self._cond:
+            queued = len(self._queue)
+        return {**self._stats, "queued": queued, "directory": self.directory or None}
+
+
+# Global instance
+transcript_log = TranscriptLog(settings.TRANSCRIPT_DIR, settings.TRANSCRIPT_FLUSH_INTERVAL_SECONDS)
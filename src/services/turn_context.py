@@ -0,0 +1,82 @@
+"""
+Per-turn context shared by the services a conversation turn goes through.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+# Monotonic timestamp by which the current turn must have produced its reply
+_turn_deadline: ContextVar[Optional[float]] = ContextVar("turn_deadline", default=None)
+# Labels used to attribute LLM usage to a session and a conversation route
+_turn_session: ContextVar[Optional[str]] = ContextVar("turn_session", default=None)
+_turn_route: ContextVar[Optional[str]] = ContextVar("turn_route", default=None)
+
+
+@contextmanager
+def turn_budget(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Run the enclosed turn under a latency budget.
+
+    Nested budgets never extend an outer one.
+
+    Args:
+        seconds: Budget for the turn (None or <= 0 disables it)
+    """
+    deadline = None
+    if seconds and seconds > 0:
+        deadline = time.monotonic() + seconds
+        outer = _turn_deadline.get()
+        if outer is not None:
+            deadline = min(deadline, outer)
+
+    token = _turn_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _turn_deadline.reset(token)
+
+
+def turn_deadline() -> Optional[float]:
+    """Get the monotonic deadline of the current turn, if any."""
+    return _turn_deadline.get()
+
+
+def remaining_budget() -> Optional[float]:
+    """Get the seconds left in the current turn's budget, if any."""
+    deadline = _turn_deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+@contextmanager
+def turn_labels(session: Optional[str] = None, route: Optional[str] = None) -> Iterator[None]:
+    """
+    Label the LLM usage of the enclosed block.
+
+    Args:
+        session: Session key (None keeps the outer label)
+        route: Conversation route, e.g. "meeting" or "questions:location" (None keeps the outer label)
+    """
+    tokens = []
+    if session is not None:
+        tokens.append((_turn_session, _turn_session.set(session)))
+    if route is not None:
+        tokens.append((_turn_route, _turn_route.set(route)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def current_session() -> Optional[str]:
+    """Get the session key of the current turn, if labelled."""
+    return _turn_session.get()
+
+
+def current_route() -> Optional[str]:
+    """Get the conversation route of the current turn, if labelled."""
+    return _turn_route.get()
@@ -1,20 +1,56 @@
 """
 Twilio service for sending WhatsApp messages.
 """
-from twilio.rest import Client
 from config.settings import settings
+from src.services.cassette import twilio_cassette
+from src.services.http_transport import http_transport
 
 
 class TwilioService:
     """Service for sending WhatsApp messages via Twilio."""
     
     def __init__(self):
-        """Initialize Twilio client."""
-        self.client = Client(
-            settings.TWILIO_ACCOUNT_SID,
-            settings.TWILIO_AUTH_TOKEN
-        )
+        """Initialize the service; Twilio clients are built on first use."""
         self.from_number = settings.TWILIO_WHATSAPP_NUMBER
+        self._client = None
+        self._async_client = None
+    
+    @property
+    def client(self):
+        """Twilio client over the shared pooled HTTP transport."""
+        if self._client is None:
+            from twilio.rest import Client
+            
+            self._client = Client(
+                settings.TWILIO_ACCOUNT_SID,
+                settings.TWILIO_AUTH_TOKEN,
+                http_client=http_transport.twilio_http_client()
+            )
+        return self._client
+    
+    @property
+    def async_client(self):
+        """Twilio client backed by aiohttp, created on first async send."""
+        if self._async_client is None:
+            from twilio.rest import Client
+            
+            self._async_client = Client(
+                settings.TWILIO_ACCOUNT_SID,
+                settings.TWILIO_AUTH_TOKEN,
+                http_client=http_transport.twilio_async_http_client()
+            )
+        return self._async_client
+    
+    @staticmethod
+    def _format_number(to_number: str) -> str:
+        """Ensure number has whatsapp: prefix."""
+        if not to_number.startswith("whatsapp:"):
+            to_number = f"whatsapp:{to_number}"
+        return to_number
+    
+    def _request(self, to_number: str, message: str) -> dict:
+        """Describe an outbound message for the cassette."""
+        return {"from": self.from_number, "to": to_number, "body": message}
     
     def send_message(self, to_number: str, message: str) -> dict:
         """
@@ -27,22 +63,51 @@ class TwilioService:
         Returns:
             Dictionary with message SID and status
         """
-        try:
-            # Ensure number has whatsapp: prefix
-            if not to_number.startswith("whatsapp:"):
-                to_number = f"whatsapp:{to_number}"
-            
+        to_number = self._format_number(to_number)
+        
+        def create():
             message_obj = self.client.messages.create(
                 from_=self.from_number,
                 body=message,
                 to=to_number
             )
-            
+            return {"sid": message_obj.sid, "status": message_obj.status}
+        
+        try:
+            result = twilio_cassette.call(self._request(to_number, message), create)
+            return {"success": True, **result}
+        
+        except Exception as e:
+            print(f"Error sending WhatsApp message: {e}")
             return {
-                "success": True,
-                "sid": message_obj.sid,
-                "status": message_obj.status
+                "success": False,
+                "error": str(e)
             }
+    
+    async def asend_message(self, to_number: str, message: str) -> dict:
+        """
+        Async variant of send_message.
+        
+        Args:
+            to_number: Recipient's WhatsApp number (format: whatsapp:+1234567890)
+            message: Message content to send
+            
+        Returns:
+            Dictionary with message SID and status
+        """
+        to_number = self._format_number(to_number)
+        
+        async def create():
+            message_obj = await self.async_client.messages.create_async(
+                from_=self.from_number,
+                body=message,
+                to=to_number
+            )
+            return {"sid": message_obj.sid, "status": message_obj.status}
+        
+        try:
+            result = await twilio_cassette.acall(self._request(to_number, message), create)
+            return {"success": True, **result}
         
         except Exception as e:
             print(f"Error sending WhatsApp message: {e}")
@@ -1,12 +1,9 @@
-from typing import Dict
+
 from src.main import RecruiterAssistant
+from src.services.session_manager import session_manager
 
-# Simple in-memory store (OK for MVP)
-SESSIONS: Dict[str, RecruiterAssistant] = {}
+# Kept for old callers: sessions live in the shared registry (session_manager)
 
 def get_assistant(phone_number: str, first_name: str | None = None) -> RecruiterAssistant:
-    if phone_number not in SESSIONS:
-        assistant = RecruiterAssistant(first_name or "Candidate")
-        assistant.start()
-        SESSIONS[phone_number] = assistant
-    return SESSIONS[phone_number]
+    """Get or create a session; call session_manager.save_session(phone_number) after changing it."""
+    return session_manager.get_or_create_session(phone_number, first_name)